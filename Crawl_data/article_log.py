@@ -0,0 +1,218 @@
+"""
+Append-only storage for the CoinDesk crawler.
+
+Layout:
+    <root>/articles.jsonl   one article per line, appended as it is crawled
+    <root>/seen_urls.txt    every processed URL, appended once
+    <root>/state.json       small counters (articles_count, daily_counts, last_run)
+
+Saving an article or a URL appends one line and a checkpoint rewrites only
+state.json (tmp file + fsync + os.replace), so neither cost grows with the
+corpus. A line cut short by a crash is dropped on open. Appends and
+checkpoints may come from several threads (the pool's writer and its
+discovery thread); they are serialized by one lock. The consolidated
+coindesk_raw.json / coindesk_filtered.csv are produced on demand by
+`export()` (duplicate URLs keep their latest record):
+
+    python article_log.py export [root] [out.json] [out.csv]
+"""
+
+import csv
+import json
+import os
+import sys
+import threading
+from datetime import datetime
+
+PAYWALL_TEXT = "Already have an account? Sign in"
+CSV_FIELDS = ['title', 'url', 'date', 'publication_datetime', 'content', 'is_paywalled']
+
+
+def _fsync_replace(tmp, path):
+    with open(tmp, "rb+") as f:
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+def _drop_partial_line(path):
+    """Truncate a trailing line without newline (interrupted append)."""
+    if not os.path.exists(path) or os.path.getsize(path) == 0:
+        return
+    with open(path, "rb+") as f:
+        f.seek(-1, os.SEEK_END)
+        if f.read(1) == b"\n":
+            return
+        size = f.seek(0, os.SEEK_END)
+        step = min(size, 1 << 16)
+        while True:
+            f.seek(size - step)
+            chunk = f.read(step)
+            cut = chunk.rfind(b"\n")
+            if cut >= 0:
+                f.truncate(size - step + cut + 1)
+                return
+            if step == size:
+                f.truncate(0)
+                return
+            step = min(size, step * 2)
+
+
+def mark_content_flags(article):
+    """The paywall / short-content flags save_data used to set."""
+    content = article.get('content', '')
+    if content == PAYWALL_TEXT:
+        article['is_paywalled'] = True
+    elif content and len(content) < 100 and not content.startswith("[PAYWALLED]"):
+        article['has_short_content'] = True
+    return article
+
+
+class ArticleLog:
+    def __init__(self, root="coindesk_store", seen=None):
+        self.root = root
+        self.articles_path = os.path.join(root, "articles.jsonl")
+        self.seen_path = os.path.join(root, "seen_urls.txt")
+        self.state_path = os.path.join(root, "state.json")
+        os.makedirs(root, exist_ok=True)
+
+        _drop_partial_line(self.articles_path)
+        _drop_partial_line(self.seen_path)
+
+        # `seen` may be an existing set (crawl_coindesk_data.processed_urls) to fill in place
+        self.seen = seen if seen is not None else set()
+        if os.path.exists(self.seen_path):
+            with open(self.seen_path, "r", encoding="utf-8") as f:
+                self.seen.update(line.rstrip("\n") for line in f if line.strip())
+
+        self.state = {"articles_count": 0, "daily_counts": {}, "last_run": None}
+        if os.path.exists(self.state_path):
+            with open(self.state_path, "r", encoding="utf-8") as f:
+                self.state.update(json.load(f))
+
+        self._articles = open(self.articles_path, "a", encoding="utf-8")
+        self._seen = open(self.seen_path, "a", encoding="utf-8")
+        self._lock = threading.RLock()
+
+    # ------------------------------------------------------------------
+    # Append
+    # ------------------------------------------------------------------
+    def mark_seen(self, url):
+        """Record a processed URL; False if it was already known."""
+        with self._lock:
+            if not url or url in self.seen:
+                return False
+            self.seen.add(url)
+            self._seen.write(url + "\n")
+            self._seen.flush()
+            return True
+
+    def append(self, article):
+        """Append one article record (and its URL to the seen index)."""
+        line = json.dumps(mark_content_flags(article), ensure_ascii=False) + "\n"
+        with self._lock:
+            self._articles.write(line)
+            self._articles.flush()
+            os.fsync(self._articles.fileno())
+            self.mark_seen(article.get('url'))
+            self.state["articles_count"] += 1
+
+    def __len__(self):
+        return self.state["articles_count"]
+
+    # ------------------------------------------------------------------
+    # Checkpoint
+    # ------------------------------------------------------------------
+    def checkpoint(self, daily_count=None):
+        """Rewrite the small state file; cost independent of the number of articles."""
+        with self._lock:
+            if daily_count is not None:
+                today = datetime.now().strftime('%Y-%m-%d')
+                counts = self.state["daily_counts"]
+                counts[today] = max(counts.get(today, 0), daily_count)
+            self.state["last_run"] = datetime.now().isoformat()
+            os.fsync(self._seen.fileno())
+            tmp = f"{self.state_path}.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(self.state, f, ensure_ascii=False, indent=2)
+            _fsync_replace(tmp, self.state_path)
+
+    def close(self):
+        self.checkpoint()
+        self._articles.close()
+        self._seen.close()
+
+    # ------------------------------------------------------------------
+    # Read / export
+    # ------------------------------------------------------------------
+    def iter_articles(self):
+        with open(self.articles_path, "r", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+    def import_legacy(self, json_path, checkpoint_path=None):
+        """One-off migration of the old coindesk_raw.json / checkpoint processed_urls; returns articles imported."""
+        imported = 0
+        if os.path.exists(json_path):
+            with open(json_path, "r", encoding="utf-8") as f:
+                for article in json.load(f):
+                    if article.get('url') not in self.seen:
+                        self.append(article)
+                        imported += 1
+        if checkpoint_path and os.path.exists(checkpoint_path):
+            with open(checkpoint_path, "r", encoding="utf-8") as f:
+                old = json.load(f)
+            for url in old.get('processed_urls', []):
+                self.mark_seen(url)
+            for day, n in old.get('daily_counts', {}).items():
+                self.state["daily_counts"][day] = max(self.state["daily_counts"].get(day, 0), n)
+        self.checkpoint()
+        return imported
+
+    def export(self, json_path, csv_path):
+        """Consolidated JSON array + CSV (old save_data format), streamed; latest record per URL wins."""
+        offsets = {}
+        with open(self.articles_path, "rb") as f:
+            pos = 0
+            for line in f:
+                if line.strip():
+                    offsets[json.loads(line).get('url')] = pos
+                pos += len(line)
+
+        tmp_json, tmp_csv = f"{json_path}.tmp", f"{csv_path}.tmp"
+        with open(self.articles_path, "rb") as src, \
+                open(tmp_json, "w", encoding="utf-8") as fj, \
+                open(tmp_csv, "w", encoding="utf-8", newline="") as fc:
+            writer = csv.writer(fc)
+            writer.writerow(CSV_FIELDS)
+            fj.write("[\n")
+            for i, pos in enumerate(sorted(offsets.values())):
+                src.seek(pos)
+                article = json.loads(src.readline())
+                fj.write((",\n" if i else "") + json.dumps(article, ensure_ascii=False, indent=2))
+                date = article.get('date', '')
+                writer.writerow([
+                    article.get('title', ''),
+                    article.get('url', ''),
+                    date,
+                    article.get('publication_datetime', date.split('T')[0] if 'T' in date else date),
+                    article.get('content', ''),
+                    article.get('is_paywalled', False),
+                ])
+            fj.write("\n]\n")
+        _fsync_replace(tmp_json, json_path)
+        _fsync_replace(tmp_csv, csv_path)
+        return len(offsets)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) >= 2 and sys.argv[1] == "export":
+        root = sys.argv[2] if len(sys.argv) > 2 else "coindesk_store"
+        out_json = sys.argv[3] if len(sys.argv) > 3 else "coindesk_raw.json"
+        out_csv = sys.argv[4] if len(sys.argv) > 4 else "coindesk_filtered.csv"
+        log = ArticleLog(root)
+        n = log.export(out_json, out_csv)
+        log.close()
+        print(f"✅ Exported {n} articles to {out_json} and {out_csv}")
+    else:
+        print(__doc__)
@@ -0,0 +1,116 @@
+"""
+Offline benchmark of the crawlers against the local API stand-in.
+
+Every crawler is run unmodified against a fresh StandInServer per scenario
+(clean, added latency, bursts of 429, truncated JSON bodies) and reports rows,
+rows/sec, retries and wall time, so changes to pagination, pacing or retry
+logic can be compared without network access or API keys:
+
+    python bench_crawlers.py
+"""
+
+import contextlib
+import io
+import time
+from datetime import datetime, timedelta, timezone
+
+import crawl_x_data
+import crawl_x_windows
+from binance_client import BinanceClient
+from crawl_btc_data import crawl_orderbook_over_period, fetch_ohlcv_binance, fetch_ohlcv_binance_parallel
+from offline_server import SEARCH_PATH, StandInServer
+
+SCENARIOS = {
+    "clean": {},
+    "latency_20ms": {"latency": 0.02},
+    "429_bursts": {"burst_every": 10, "burst_length": 2, "retry_after": 1},
+    "malformed": {"malformed_every": 15},
+}
+
+OHLCV_START = datetime(2025, 7, 1, tzinfo=timezone.utc)
+OHLCV_END = datetime(2025, 7, 14, 23, 59, tzinfo=timezone.utc)   # 14 pages of 1m bars
+ORDERBOOK_START = datetime(2025, 7, 1, tzinfo=timezone.utc)
+ORDERBOOK_END = datetime(2025, 7, 1, 4, 0, tzinfo=timezone.utc)  # 49 snapshots
+TWEET_DAYS = [datetime(2025, 7, 1) + timedelta(days=i) for i in range(3)]
+
+
+def _ohlcv(client):
+    return len(fetch_ohlcv_binance("BTCUSDT", "1m", OHLCV_START, OHLCV_END, client=client))
+
+
+def _ohlcv_parallel(client):
+    return len(fetch_ohlcv_binance_parallel("BTCUSDT", "1m", OHLCV_START, OHLCV_END,
+                                            max_workers=4, client=client))
+
+
+def _orderbook(client):
+    return len(crawl_orderbook_over_period("BTCUSDT", ORDERBOOK_START, ORDERBOOK_END,
+                                           freq_minutes=5, client=client))
+
+
+def _tweets(client):
+    return sum(len(crawl_x_data.fetch_tweets_for_day(day)) for day in TWEET_DAYS)
+
+
+def _tweets_windows(client):
+    per_day, _ = crawl_x_windows.crawl_range(TWEET_DAYS[0], TWEET_DAYS[-1], rate_per_second=50, burst=50)
+    return sum(per_day.values())
+
+
+CRAWLERS = {
+    "fetch_ohlcv_binance": _ohlcv,
+    "fetch_ohlcv_binance_parallel": _ohlcv_parallel,
+    "crawl_orderbook_over_period": _orderbook,
+    "fetch_tweets_for_day": _tweets,
+    "crawl_x_windows": _tweets_windows,
+}
+
+
+def run_one(name, scenario):
+    """Run one crawler against a fresh stand-in; return its result row."""
+    with StandInServer(**SCENARIOS[scenario]) as server:
+        client = BinanceClient(base_url=server.base_url)
+        saved = crawl_x_data.BASE_URL, crawl_x_data.HEADERS, crawl_x_data.RATE_LIMIT_WAIT
+        crawl_x_data.BASE_URL = server.base_url + SEARCH_PATH
+        crawl_x_data.HEADERS = {"X-API-Key": "offline"}  # the placeholder key is not a valid header
+        crawl_x_data.RATE_LIMIT_WAIT = 1
+        try:
+            started = time.perf_counter()
+            # The crawlers print per page; keep the report readable
+            with contextlib.redirect_stdout(io.StringIO()):
+                rows = CRAWLERS[name](client)
+            wall = time.perf_counter() - started
+        finally:
+            crawl_x_data.BASE_URL, crawl_x_data.HEADERS, crawl_x_data.RATE_LIMIT_WAIT = saved
+            client.close()
+
+        counts = server.state.counts
+        return {
+            "crawler": name,
+            "scenario": scenario,
+            "rows": rows,
+            "rows_per_s": rows / wall if wall else 0.0,
+            "wall_s": wall,
+            "requests": server.state.request_no,
+            "client_retries": client.stats["retries"],
+            "server_429": counts["rate_limited"] + counts["injected_429"],
+            "malformed": counts["malformed"],
+        }
+
+
+def run_benchmark(crawlers=None, scenarios=None):
+    results = []
+    for name in crawlers or CRAWLERS:
+        for scenario in scenarios or SCENARIOS:
+            result = run_one(name, scenario)
+            results.append(result)
+            print(f"{result['crawler']:<30} {result['scenario']:<13} {result['rows']:>7} rows "
+                  f"{result['rows_per_s']:>10.1f} rows/s {result['wall_s']:>7.2f}s  "
+                  f"req {result['requests']:>4}  retries {result['client_retries']:>3}  "
+                  f"429 {result['server_429']:>3}  malformed {result['malformed']:>3}")
+    return results
+
+
+if __name__ == "__main__":
+    print("🚀 Crawler benchmark against the offline stand-in")
+    run_benchmark()
@@ -0,0 +1,154 @@
+"""
+Offline benchmark of the CoinDesk article extraction against the saved HTML
+corpus (coindesk_fixtures.py), no browser or network needed.
+
+For every page it times the lxml parse, each publication-time strategy of
+coindesk_http.TIME_STRATEGIES on its own, and the full parse_article_html,
+and checks the results against the recorded publication_datetime, title and
+content. Reported per strategy: how often it finds a time, how often that
+time is right, mean latency; for the full parse: p50/p95 latency, time
+accuracy, which strategy won, title/content match. The URL strategy only
+knows the day, so it is never "correct" to the minute. Exits non-zero when the
+full-parse time accuracy is under --min-accuracy, so it can gate CI. On the
+committed corpus every layout but url_only (day only, 6 of 51 pages) must be
+exact, i.e. 88%; the sidebar_* layouts fail when the time lookup leaks out of
+the <article>:
+
+    python bench_extraction.py --min-accuracy 0.88      # Sample_data/coindesk_html
+    python bench_extraction.py --corpus DIR --min-accuracy 0.95 --json report.json
+"""
+
+import argparse
+import json
+import statistics
+import sys
+import time
+from datetime import datetime
+
+from lxml import html as lxml_html
+
+from coindesk_fixtures import CORPUS_DIR, load_corpus
+from coindesk_http import TIME_STRATEGIES, parse_article_html
+
+TOLERANCE_S = 60   # a time within a minute of the recorded one counts as correct
+
+
+def _normalize(text):
+    return " ".join((text or "").split())
+
+
+def _percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))] if values else 0.0
+
+
+def check_page(entry, page):
+    """Result row for one page: per-strategy times/hits and the full parse outcome."""
+    expected = datetime.strptime(entry["publication_datetime"], "%Y-%m-%d %H:%M:%S")
+    url = entry["url"]
+
+    started = time.perf_counter()
+    doc = lxml_html.fromstring(page)
+    parse_ms = (time.perf_counter() - started) * 1000
+
+    strategies = {}
+    for name, strategy in TIME_STRATEGIES:
+        started = time.perf_counter()
+        found = strategy(doc, url)
+        strategies[name] = {
+            "ms": (time.perf_counter() - started) * 1000,
+            "found": found is not None,
+            "correct": found is not None and abs((found - expected).total_seconds()) <= TOLERANCE_S,
+        }
+
+    started = time.perf_counter()
+    article = parse_article_html(page, url)
+    full_ms = (time.perf_counter() - started) * 1000
+    got = datetime.strptime(article["publication_datetime"], "%Y-%m-%d %H:%M:%S")
+    winner = next((name for name, s in strategies.items() if s["found"]), None)
+    return {
+        "file": entry["file"],
+        "layout": entry.get("layout"),
+        "parse_ms": parse_ms,
+        "strategies": strategies,
+        "full_ms": full_ms,
+        "winner": winner,
+        "time_correct": winner is not None and abs((got - expected).total_seconds()) <= TOLERANCE_S,
+        "day_correct": winner is not None and got.date() == expected.date(),
+        "title_ok": _normalize(article["title"]) == _normalize(entry["title"]),
+        "content_ok": _normalize(article["content"]) == _normalize(entry["content"]),
+    }
+
+
+def run_benchmark(corpus_dir=CORPUS_DIR, repeat=3):
+    """Check every page `repeat` times (latencies are the best run); returns (rows, summary)."""
+    pages = load_corpus(corpus_dir)
+    rows = []
+    for entry, page in pages:
+        runs = [check_page(entry, page) for _ in range(repeat)]
+        best = min(runs, key=lambda r: r["full_ms"])
+        for name in best["strategies"]:
+            best["strategies"][name]["ms"] = min(r["strategies"][name]["ms"] for r in runs)
+        rows.append(best)
+
+    n = len(rows)
+    summary = {"pages": n, "strategies": {}, "winners": {}, "by_layout": {}}
+    for name, _ in TIME_STRATEGIES:
+        found = sum(r["strategies"][name]["found"] for r in rows)
+        correct = sum(r["strategies"][name]["correct"] for r in rows)
+        summary["strategies"][name] = {
+            "found": found,
+            "correct": correct,
+            "precision": correct / found if found else 0.0,
+            "mean_ms": statistics.mean(r["strategies"][name]["ms"] for r in rows) if rows else 0.0,
+        }
+    for r in rows:
+        summary["winners"][r["winner"]] = summary["winners"].get(r["winner"], 0) + 1
+        layout = summary["by_layout"].setdefault(r["layout"], {"pages": 0, "time_correct": 0})
+        layout["pages"] += 1
+        layout["time_correct"] += r["time_correct"]
+    full = [r["full_ms"] for r in rows]
+    summary.update({
+        "parse_ms_mean": statistics.mean(r["parse_ms"] for r in rows) if rows else 0.0,
+        "full_ms_p50": _percentile(full, 0.5),
+        "full_ms_p95": _percentile(full, 0.95),
+        "time_accuracy": sum(r["time_correct"] for r in rows) / n if n else 0.0,
+        "day_accuracy": sum(r["day_correct"] for r in rows) / n if n else 0.0,
+        "title_accuracy": sum(r["title_ok"] for r in rows) / n if n else 0.0,
+        "content_accuracy": sum(r["content_ok"] for r in rows) / n if n else 0.0,
+    })
+    return rows, summary
+
+
+def print_report(summary):
+    print(f"{'strategy':<10} {'found':>6} {'correct':>8} {'precision':>10} {'mean ms':>9}")
+    for name, s in summary["strategies"].items():
+        print(f"{name:<10} {s['found']:>6} {s['correct']:>8} {s['precision']:>10.0%} {s['mean_ms']:>9.3f}")
+    print(f"\nparse_article_html over {summary['pages']} pages: "
+          f"p50 {summary['full_ms_p50']:.2f} ms, p95 {summary['full_ms_p95']:.2f} ms "
+          f"(lxml parse alone {summary['parse_ms_mean']:.2f} ms)")
+    print(f"  time accuracy {summary['time_accuracy']:.0%}, same day {summary['day_accuracy']:.0%}, "
+          f"title {summary['title_accuracy']:.0%}, content {summary['content_accuracy']:.0%}")
+    print(f"  winning strategy: {summary['winners']}")
+    for layout, s in sorted(summary["by_layout"].items(), key=lambda kv: str(kv[0])):
+        print(f"  {str(layout):<17} {s['time_correct']:>3}/{s['pages']:<3} correct")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark CoinDesk extraction on the offline HTML corpus")
+    parser.add_argument("--corpus", default=CORPUS_DIR)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--min-accuracy", type=float, default=0.0,
+                        help="fail (exit 1) when the full-parse time accuracy is below this")
+    parser.add_argument("--json", help="also write per-page rows + summary here")
+    args = parser.parse_args()
+
+    print(f"🚀 Extraction benchmark on {args.corpus}")
+    rows, summary = run_benchmark(args.corpus, args.repeat)
+    print_report(summary)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"summary": summary, "pages": rows}, f, indent=2, default=str)
+    if summary["time_accuracy"] < args.min_accuracy:
+        print(f"❌ Time accuracy {summary['time_accuracy']:.0%} below {args.min_accuracy:.0%}")
+        sys.exit(1)
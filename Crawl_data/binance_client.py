@@ -0,0 +1,169 @@
+"""
+Shared Binance REST client.
+
+One pooled requests.Session keeps TLS connections alive across calls and
+threads. Pacing is driven by the exchange itself: every response carries
+X-MBX-USED-WEIGHT-1M, which the client uses to run close to the per-minute
+REQUEST_WEIGHT limit, and 418/429 answers are retried after Retry-After (or an
+exponential backoff with full jitter when the header is missing).
+"""
+
+import os
+import random
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+BASE_URL = os.environ.get("BINANCE_BASE_URL", "https://api.binance.com")
+WEIGHT_LIMIT_PER_MINUTE = 6000  # REQUEST_WEIGHT limit per IP
+WEIGHT_HEADER = "X-MBX-USED-WEIGHT-1M"
+
+RETRY_STATUSES = {418, 429, 500, 502, 503, 504}
+
+
+def depth_weight(limit):
+    """Request weight of /api/v3/depth for a given `limit` (Binance docs)."""
+    if limit <= 100:
+        return 5
+    if limit <= 500:
+        return 25
+    if limit <= 1000:
+        return 50
+    return 250
+
+
+class BinanceClient:
+    """Thread-safe keep-alive client with weight-header rate control."""
+
+    def __init__(self, base_url=BASE_URL, weight_limit=WEIGHT_LIMIT_PER_MINUTE, safety=0.9,
+                 window_seconds=60, pool_size=16, max_retries=8, backoff_base=0.5,
+                 backoff_cap=60.0, timeout=10):
+        self.base_url = base_url.rstrip("/")
+        self.weight_budget = weight_limit * safety
+        self.window_seconds = window_seconds
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.timeout = timeout
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+        self.lock = threading.Lock()
+        self.window = None
+        self.used_weight = 0
+        self.paused_until = 0.0
+
+        self.stats = {"requests": 0, "retries": 0, "rate_limited": 0, "backoff_seconds": 0.0}
+
+    # ------------------------------------------------------------------
+    # Weight accounting
+    # ------------------------------------------------------------------
+    def _reserve(self, weight):
+        """Block until `weight` fits in the current window, then reserve it."""
+        while True:
+            with self.lock:
+                now = time.time()
+                window = int(now // self.window_seconds)
+                if window != self.window:
+                    # The exchange resets the counter on window boundaries
+                    self.window = window
+                    self.used_weight = 0
+
+                if now < self.paused_until:
+                    wait = self.paused_until - now
+                elif self.used_weight + weight <= self.weight_budget:
+                    self.used_weight += weight
+                    return
+                else:
+                    wait = (window + 1) * self.window_seconds - now
+            time.sleep(wait + random.uniform(0, 0.05))
+
+    def _observe(self, response):
+        used = response.headers.get(WEIGHT_HEADER)
+        if used is None:
+            return
+        with self.lock:
+            # Our count includes in-flight reservations; the server also sees
+            # other processes on this IP. Trust whichever is higher.
+            self.used_weight = max(self.used_weight, int(used))
+
+    def _pause(self, seconds):
+        with self.lock:
+            self.paused_until = max(self.paused_until, time.time() + seconds)
+            self.stats["backoff_seconds"] += seconds
+
+    def _count(self, key):
+        with self.lock:
+            self.stats[key] += 1
+
+    def _backoff(self, attempt):
+        """Exponential backoff with full jitter."""
+        return random.uniform(0, min(self.backoff_cap, self.backoff_base * 2 ** attempt))
+
+    # ------------------------------------------------------------------
+    # Requests
+    # ------------------------------------------------------------------
+    def get(self, path, params=None, weight=1):
+        """
+        GET `path` and return the decoded JSON.
+
+        Retries 418/429/5xx, connection errors and truncated/undecodable
+        bodies up to `max_retries` times, then re-raises. Other HTTP errors
+        are raised immediately.
+        """
+        url = f"{self.base_url}{path}"
+        for attempt in range(self.max_retries + 1):
+            self._reserve(weight)
+            try:
+                response = self.session.get(url, params=params, timeout=self.timeout)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+                if attempt == self.max_retries:
+                    raise
+                self._count("retries")
+                self._pause(self._backoff(attempt))
+                continue
+
+            self._count("requests")
+            self._observe(response)
+
+            if response.status_code in RETRY_STATUSES and attempt < self.max_retries:
+                self._count("retries")
+                retry_after = response.headers.get("Retry-After")
+                if response.status_code in (418, 429):
+                    self._count("rate_limited")
+                    if retry_after is not None:
+                        self._pause(float(retry_after) + random.uniform(0, 1))
+                        continue
+                self._pause(self._backoff(attempt))
+                continue
+
+            response.raise_for_status()
+            try:
+                return response.json()
+            except ValueError:
+                # A body cut off mid-transfer decodes as invalid JSON
+                if attempt == self.max_retries:
+                    raise
+                self._count("retries")
+                self._pause(self._backoff(attempt))
+
+    def close(self):
+        self.session.close()
+
+
+_default_client = None
+_default_lock = threading.Lock()
+
+
+def get_client():
+    """Process-wide shared client, created on first use."""
+    global _default_client
+    with _default_lock:
+        if _default_client is None:
+            _default_client = BinanceClient()
+        return _default_client
@@ -0,0 +1,163 @@
+"""
+Memory / latency watchdog for long-running Selenium crawls.
+
+A Chrome that has been clicking "Load More" for hours keeps growing: its
+RSS climbs and every page load / DOM scan gets slower. BrowserHealth
+tracks both and says when the browser should be recycled:
+
+- rss       resident memory of chromedriver + all its Chrome children
+            (psutil when installed, /proc otherwise; None when neither works)
+- latency   per operation name ("page", "links", ...), the median of the last
+            `window` timings against the median of the first `window` timings
+            of a fresh browser
+- pages     pages loaded since the last recycle
+
+    health = BrowserHealth(max_rss_mb=1500, latency_factor=3.0, max_pages=500)
+    with health.track("page"):
+        driver.get(url)
+    reason = health.check(driver)      # None, or why the browser should go
+    ...
+    health.recycled()                  # after replacing the driver
+"""
+
+import os
+import statistics
+import time
+from collections import deque
+from contextlib import contextmanager
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+def _proc_children():
+    """ppid -> [pid] from /proc (Linux)."""
+    children = {}
+    for name in os.listdir("/proc"):
+        if not name.isdigit():
+            continue
+        try:
+            with open(f"/proc/{name}/stat", "rb") as f:
+                stat = f.read()
+        except OSError:
+            continue
+        # the command name may contain spaces; fields after the closing paren are fixed
+        ppid = int(stat[stat.rindex(b")") + 2:].split()[1])
+        children.setdefault(ppid, []).append(int(name))
+    return children
+
+
+def process_tree_rss_mb(pid):
+    """RSS in MB of `pid` and all its descendants, or None if it cannot be measured."""
+    if psutil is not None:
+        try:
+            root = psutil.Process(pid)
+            procs = [root] + root.children(recursive=True)
+            total = 0
+            for p in procs:
+                try:
+                    total += p.memory_info().rss
+                except psutil.Error:
+                    pass
+            return total / 2**20
+        except psutil.Error:
+            return None
+    if not os.path.isdir("/proc"):
+        return None
+
+    children = _proc_children()
+    total, stack = 0, [pid]
+    while stack:
+        p = stack.pop()
+        try:
+            with open(f"/proc/{p}/statm") as f:
+                total += int(f.read().split()[1]) * _PAGE_SIZE
+        except OSError:
+            continue
+        stack.extend(children.get(p, []))
+    return total / 2**20 if total else None
+
+
+def driver_rss_mb(driver):
+    """RSS of a Selenium Chrome driver (chromedriver process tree)."""
+    try:
+        pid = driver.service.process.pid
+    except AttributeError:
+        return None
+    return process_tree_rss_mb(pid)
+
+
+class BrowserHealth:
+    def __init__(self, max_rss_mb=1500, latency_factor=3.0, max_pages=500, window=20, min_latency_s=1.0):
+        self.max_rss_mb = max_rss_mb
+        self.latency_factor = latency_factor
+        self.max_pages = max_pages
+        self.window = window
+        self.min_latency_s = min_latency_s   # never recycle for latencies below this
+        self.baseline = {}                   # op -> list of first timings of a fresh browser
+        self.recent = {}                     # op -> deque of the last `window` timings
+        self.pages = 0
+        self.recycles = 0
+        self.last_rss_mb = None
+        self.reasons = {}
+
+    @contextmanager
+    def track(self, op):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(op, time.perf_counter() - started)
+
+    def record(self, op, seconds):
+        base = self.baseline.setdefault(op, [])
+        if len(base) < self.window:
+            base.append(seconds)
+        self.recent.setdefault(op, deque(maxlen=self.window)).append(seconds)
+        if op == "page":
+            self.pages += 1
+
+    def slow_ops(self):
+        """{op: (recent median, baseline median)} for the ops over the latency threshold."""
+        slow = {}
+        for op, recent in self.recent.items():
+            base = self.baseline.get(op, [])
+            if len(base) < self.window or len(recent) < self.window:
+                continue
+            now, then = statistics.median(recent), statistics.median(base)
+            if now > self.min_latency_s and now > self.latency_factor * then:
+                slow[op] = (now, then)
+        return slow
+
+    def check(self, driver):
+        """None if the browser is fine, else a short reason ("rss 1650MB", "latency links 4.10s", "pages 500")."""
+        if self.max_rss_mb:
+            self.last_rss_mb = driver_rss_mb(driver)
+            if self.last_rss_mb is not None and self.last_rss_mb > self.max_rss_mb:
+                return f"rss {self.last_rss_mb:.0f}MB"
+        if self.latency_factor:
+            for op, (now, then) in self.slow_ops().items():
+                return f"latency {op} {now:.2f}s (fresh {then:.2f}s)"
+        if self.max_pages and self.pages >= self.max_pages:
+            return f"pages {self.pages}"
+        return None
+
+    def recycled(self, reason=None):
+        """Call after replacing the driver: recent timings and page count start over, baselines stay."""
+        self.recent.clear()
+        self.pages = 0
+        self.recycles += 1
+        if reason:
+            kind = reason.split()[0]
+            self.reasons[kind] = self.reasons.get(kind, 0) + 1
+
+    def report(self):
+        medians = {op: statistics.median(t) for op, t in self.recent.items() if t}
+        rss = f"{self.last_rss_mb:.0f}MB" if self.last_rss_mb is not None else "n/a"
+        timings = ", ".join(f"{op} {m:.2f}s" for op, m in sorted(medians.items())) or "no timings"
+        print(f"🩺 Browser: RSS {rss}, {self.pages} pages since restart, {timings} | "
+              f"{self.recycles} recycles {self.reasons or ''}")
@@ -0,0 +1,200 @@
+"""
+Offline HTML corpus of CoinDesk article pages for the extraction benchmark.
+
+    <corpus>/manifest.jsonl   one line per page: file, url, title, content,
+                              publication_datetime (expected), layout, origin
+    <corpus>/<NNN>-<slug>.html
+
+Pages come from the articles recorded in Sample_data/coindesk_raw.json:
+
+    python coindesk_fixtures.py render     # deterministic, no network (the committed corpus)
+    python coindesk_fixtures.py record     # live pages of the same URLs -> coindesk_html_live (needs network)
+
+`render` rebuilds every STEP-th article as a page in one of the layouts the
+parser has to handle (LAYOUTS, cycled), each carrying the recorded
+publication time in a different place and with the usual noise around it
+(header, ticker, related-articles sidebar with other dates, an "Updated"
+time before the "Published" one). The sidebar_time / sidebar_datetime
+layouts carry the article's time only in its byline and put a related story's
+<time> / <time datetime> in a rail before the article, so a time lookup that
+is not scoped to the <article> picks the wrong story. Recorded times are UTC; byline text is
+written in coindesk_http.SITE_TZ like the live site. `record` stores the real HTML with
+origin "live"; both kinds are read the same way by bench_extraction.py.
+"""
+
+import html
+import json
+import os
+import re
+import sys
+from datetime import datetime, timedelta, timezone
+from zoneinfo import ZoneInfo
+
+from coindesk_http import SITE_TZ
+
+RAW_JSON = os.path.normpath(os.path.join(os.path.dirname(__file__), "..", "Sample_data", "coindesk_raw.json"))
+CORPUS_DIR = os.path.normpath(os.path.join(os.path.dirname(__file__), "..", "Sample_data", "coindesk_html"))
+STEP = 15   # every 15th recorded article -> ~50 pages
+LAYOUTS = ["byline", "byline_updated", "meta", "json_ld", "time_tag", "url_only",
+           "sidebar_time", "sidebar_datetime"]
+
+
+def load_articles(path=RAW_JSON):
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _slug(url):
+    return re.sub(r"[^a-z0-9]+", "-", url.rstrip("/").rsplit("/", 1)[-1].lower())[:60].strip("-")
+
+
+def _byline_time(dt):
+    """'Oct 7, 2025, 10:45 p.m.' as shown under CoinDesk headlines, for a naive UTC `dt`."""
+    dt = dt.replace(tzinfo=timezone.utc).astimezone(ZoneInfo(SITE_TZ))
+    hour = dt.hour % 12 or 12
+    return f"{dt.strftime('%b')} {dt.day}, {dt.year}, {hour}:{dt.minute:02d} {'a.m.' if dt.hour < 12 else 'p.m.'}"
+
+
+def render_page(article, layout):
+    """HTML page for one recorded article, with its publication time where `layout` puts it."""
+    published = datetime.strptime(article["publication_datetime"], "%Y-%m-%d %H:%M:%S")
+    iso = published.strftime("%Y-%m-%dT%H:%M:%S.000Z")
+    updated = published + timedelta(minutes=16)
+    title = html.escape(article["title"])
+
+    head = [f"<title>{title} - CoinDesk</title>",
+            f'<meta property="og:title" content="{title}">',
+            '<meta property="og:site_name" content="CoinDesk">']
+    byline = ['<div class="at-authors">By <a href="/author/staff">CoinDesk Staff</a></div>']
+    sidebar_day = published - timedelta(days=3)
+    sidebar_time = f"<span>{_byline_time(sidebar_day)}</span>"
+    rail = ""
+    if layout in ("sidebar_time", "sidebar_datetime"):
+        # Only the byline dates the article; the related stories use <time>
+        byline.append(f'<div class="at-created"><span>{_byline_time(published)}</span></div>')
+        attr = f' datetime="{sidebar_day:%Y-%m-%dT%H:%M:%S.000Z}"' if layout == "sidebar_datetime" else ""
+        sidebar_time = f"<time{attr}>{_byline_time(sidebar_day)}</time>"
+        trending = published - timedelta(hours=5)
+        trending_attr = f' datetime="{trending:%Y-%m-%dT%H:%M:%S.000Z}"' if layout == "sidebar_datetime" else ""
+        rail = (f'<aside class="trending"><h3>Trending</h3><ul><li><a href="/markets/{trending:%Y/%m/%d}/trending-story">'
+                f'Trending story</a> <time{trending_attr}>{_byline_time(trending)}</time></li></ul></aside>\n')
+    if layout == "byline":
+        byline.append(f'<div class="at-created"><span>{_byline_time(published)}</span></div>')
+    elif layout == "byline_updated":
+        byline.append(f'<div class="at-created"><span>Updated {_byline_time(updated)}</span> '
+                      f'<span>Published {_byline_time(published)}</span></div>')
+    elif layout == "meta":
+        head.append(f'<meta property="article:published_time" content="{iso}">')
+        head.append(f'<meta property="article:modified_time" '
+                    f'content="{updated.strftime("%Y-%m-%dT%H:%M:%S.000Z")}">')
+    elif layout == "json_ld":
+        ld = {"@context": "https://schema.org", "@graph": [
+            {"@type": "WebPage", "url": article["url"]},
+            {"@type": "NewsArticle", "headline": article["title"], "datePublished": iso,
+             "dateModified": updated.strftime("%Y-%m-%dT%H:%M:%S.000Z")},
+        ]}
+        head.append(f'<script type="application/ld+json">{json.dumps(ld)}</script>')
+    elif layout == "time_tag":
+        byline.append(f'<time datetime="{iso}">{published.strftime("%b %d, %Y")}</time>')
+
+    paragraphs = [p for p in article.get("content", "").split("\n\n") if p.strip()]
+    body = "\n".join(f"<p>{html.escape(p)}</p>" for p in paragraphs)
+    return f"""<!DOCTYPE html>
+<html lang="en"><head><meta charset="utf-8">
+{chr(10).join(head)}
+</head><body>
+<header><nav><a href="/markets/">Markets</a> <a href="/business/">Business</a>
+<span class="ticker">BTC $121,950.12 +1.2%</span> <button>Sign in</button></nav></header>
+<main>
+{rail}<article>
+<h1>{title}</h1>
+{chr(10).join(byline)}
+<div class="at-text">
+{body}
+</div>
+</article>
+<aside class="related"><h3>More For You</h3>
+<ul><li><a href="/markets/{sidebar_day:%Y/%m/%d}/older-story">Older story</a>
+{sidebar_time}</li></ul></aside>
+</main>
+<footer><p>&copy; 2025 CoinDesk, Inc.</p></footer>
+</body></html>
+"""
+
+
+def _expected(article, layout):
+    return {
+        "url": article["url"],
+        "title": article["title"],
+        "content": article.get("content", ""),
+        "publication_datetime": article["publication_datetime"],
+        "layout": layout,
+    }
+
+
+def render_corpus(out_dir=CORPUS_DIR, step=STEP, articles=None):
+    """Write the rendered corpus + manifest; returns the number of pages."""
+    articles = articles if articles is not None else load_articles()
+    os.makedirs(out_dir, exist_ok=True)
+    picked = [a for a in articles[::step] if a.get("publication_datetime") and a.get("content")]
+    with open(os.path.join(out_dir, "manifest.jsonl"), "w", encoding="utf-8") as manifest:
+        for i, article in enumerate(picked):
+            layout = LAYOUTS[i % len(LAYOUTS)]
+            name = f"{i:03d}-{_slug(article['url'])}.html"
+            with open(os.path.join(out_dir, name), "w", encoding="utf-8") as f:
+                f.write(render_page(article, layout))
+            manifest.write(json.dumps({"file": name, **_expected(article, layout), "origin": "rendered"},
+                                      ensure_ascii=False) + "\n")
+    return len(picked)
+
+
+def record_corpus(out_dir=CORPUS_DIR, step=STEP, articles=None):
+    """Save the live HTML of the same articles (needs network); returns the number of pages saved."""
+    from coindesk_http import make_session
+
+    articles = articles if articles is not None else load_articles()
+    session = make_session()
+    os.makedirs(out_dir, exist_ok=True)
+    saved = 0
+    with open(os.path.join(out_dir, "manifest.jsonl"), "w", encoding="utf-8") as manifest:
+        for i, article in enumerate(articles[::step]):
+            try:
+                resp = session.get(article["url"], timeout=30)
+            except Exception as e:
+                print(f"⚠️ {article['url']}: {e}")
+                continue
+            if resp.status_code != 200:
+                print(f"⚠️ {article['url']}: HTTP {resp.status_code}")
+                continue
+            name = f"{i:03d}-{_slug(article['url'])}.html"
+            with open(os.path.join(out_dir, name), "w", encoding="utf-8") as f:
+                f.write(resp.text)
+            manifest.write(json.dumps({"file": name, **_expected(article, "live"), "origin": "live"},
+                                      ensure_ascii=False) + "\n")
+            saved += 1
+    return saved
+
+
+def load_corpus(corpus_dir=CORPUS_DIR):
+    """[(manifest entry, html text)] of a corpus directory."""
+    pages = []
+    with open(os.path.join(corpus_dir, "manifest.jsonl"), "r", encoding="utf-8") as manifest:
+        for line in manifest:
+            if not line.strip():
+                continue
+            entry = json.loads(line)
+            with open(os.path.join(corpus_dir, entry["file"]), "r", encoding="utf-8") as f:
+                pages.append((entry, f.read()))
+    return pages
+
+
+if __name__ == "__main__":
+    command = sys.argv[1] if len(sys.argv) > 1 else "render"
+    # live pages go next to the rendered corpus, not over it
+    out = sys.argv[2] if len(sys.argv) > 2 else (CORPUS_DIR + "_live" if command == "record" else CORPUS_DIR)
+    if command == "render":
+        print(f"✅ Rendered {render_corpus(out)} pages into {out}")
+    elif command == "record":
+        print(f"✅ Recorded {record_corpus(out)} live pages into {out}")
+    else:
+        print(__doc__)
@@ -0,0 +1,326 @@
+"""
+Static-HTML fast path for CoinDesk articles.
+
+Public article pages carry the title, body paragraphs and publication time
+in the server-rendered HTML, so most articles need no browser at all: one
+GET on a pooled requests.Session and an lxml parse. The Selenium path
+(crawl_coindesk_data.extract_article_content) runs the same
+`parse_article_html` on one `page_source` snapshot of the rendered page, so
+both paths extract the same fields. `is_complete` tells the crawler when the
+static page was not enough (no body, paywall text, no title) and the browser
+is needed.
+
+Publication time is read in order of reliability:
+    meta article:published_time / datePublished, JSON-LD datePublished,
+    <time datetime>, the "Oct 1, 2025, 9:43 p.m." byline text, the URL date.
+Times with an offset are converted to UTC. The byline has no offset: it is
+read in SITE_TZ for server-rendered HTML, or in the zone the browser rendered
+it in (byline_tz, see crawl_coindesk_data.browser_timezone), and converted to
+UTC too, so publication_datetime is naive UTC whatever the source. The URL
+date is the day only. `time_source` records which source won.
+"""
+
+import json
+import re
+import threading
+import time
+from datetime import datetime, timezone
+from zoneinfo import ZoneInfo
+
+import requests
+from lxml import html as lxml_html
+from requests.adapters import HTTPAdapter
+
+USER_AGENT = ("Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+              "(KHTML, like Gecko) Chrome/119.0.0.0 Safari/537.36")
+MIN_CONTENT_CHARS = 200   # shorter static bodies go to the browser
+SITE_TZ = "America/New_York"   # zone of the byline time in CoinDesk's server-rendered HTML
+PAYWALL_MARKERS = ("Already have an account? Sign in",
+                   "Sign in to continue reading",
+                   "Subscribe to continue reading")
+
+
+def _has_class(name):
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+
+# Article body selectors, most specific first, as XPath (no cssselect dependency)
+CONTENT_XPATHS = [
+    "//article//p",
+    f"//*[{_has_class('at-text')}]//p",
+    f"//*[{_has_class('main-body-content')}]//p",
+    f"//*[{_has_class('article-body')}]//p",
+    "//*[@itemprop='articleBody']//p",
+    f"//*[{_has_class('content-article')}]//p",
+    f"//*[{_has_class('article-content')}]//p",
+    f"//*[{_has_class('at-content-section')}]//p",
+    f"//*[{_has_class('story-text')}]//p",
+    f"//*[{_has_class('article')}]//p",
+    f"//*[{_has_class('post-content')}]//p",
+    f"//*[{_has_class('content')}]//p",
+    "//main//p",
+]
+META_TIME_XPATHS = [
+    "//meta[@property='article:published_time']/@content",
+    "//meta[@itemprop='datePublished']/@content",
+    "//meta[@name='publication_date']/@content",
+    "//meta[@name='publish-date']/@content",
+    "//meta[@name='pubdate']/@content",
+    "//meta[@name='date']/@content",
+]
+BYLINE_PATTERN = re.compile(
+    r"(Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)[a-z]*\.?\s+\d{1,2},\s+\d{4},?\s+\d{1,2}:\d{2}\s*(a\.m\.|p\.m\.|AM|PM|am|pm)"
+)
+URL_DATE_PATTERN = re.compile(r"/(\d{4})/(\d{1,2})/(\d{1,2})/")
+
+
+def make_session(pool_size=8):
+    """requests.Session with a browser User-Agent and a connection pool."""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers.update({"User-Agent": USER_AGENT, "Accept-Language": "en-US,en;q=0.9"})
+    return session
+
+
+def copy_browser_cookies(session, driver):
+    """Reuse the Selenium login for plain HTTP requests."""
+    for cookie in driver.get_cookies():
+        session.cookies.set(cookie["name"], cookie["value"], domain=cookie.get("domain"), path=cookie.get("path", "/"))
+
+
+# ==============================
+# 🕒 Publication time
+# ==============================
+def _parse_iso(value):
+    try:
+        dt = datetime.fromisoformat(value.strip().replace("Z", "+00:00"))
+    except (AttributeError, ValueError):
+        return None
+    if dt.tzinfo is not None:
+        dt = dt.astimezone(timezone.utc).replace(tzinfo=None)
+    return dt
+
+
+def _json_ld_dates(doc):
+    for script in doc.xpath("//script[@type='application/ld+json']/text()"):
+        try:
+            data = json.loads(script)
+        except ValueError:
+            continue
+        stack = [data]
+        while stack:
+            item = stack.pop()
+            if isinstance(item, list):
+                stack.extend(item)
+            elif isinstance(item, dict):
+                if "datePublished" in item:
+                    yield item["datePublished"]
+                stack.extend(v for v in item.values() if isinstance(v, (list, dict)))
+
+
+def _to_utc(dt, tz):
+    """Naive wall-clock time in zone `tz` -> naive UTC."""
+    return dt.replace(tzinfo=ZoneInfo(tz)).astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def _parse_byline(text):
+    # "Updated Oct 8, ... Published Oct 7, ..." - the publication time is the one after "Published"
+    published = text.find("Published")
+    match = BYLINE_PATTERN.search(text, published if published >= 0 else 0) or BYLINE_PATTERN.search(text)
+    if not match:
+        return None
+    value = match.group(0).replace("a.m.", "AM").replace("p.m.", "PM").replace("am", "AM").replace("pm", "PM")
+    value = re.sub(r"^(\w{3})[a-z]*\.?", r"\1", value).replace(",", "")
+    value = re.sub(r"(\d)(AM|PM)$", r"\1 \2", value)
+    try:
+        return datetime.strptime(value, "%b %d %Y %I:%M %p")
+    except ValueError:
+        return None
+
+
+def time_from_meta(doc, url):
+    for xpath in META_TIME_XPATHS:
+        for value in doc.xpath(xpath):
+            dt = _parse_iso(value)
+            if dt:
+                return dt
+    return None
+
+
+def time_from_json_ld(doc, url):
+    for value in _json_ld_dates(doc):
+        dt = _parse_iso(value) if isinstance(value, str) else None
+        if dt:
+            return dt
+    return None
+
+
+def _article_scope(doc):
+    """The first <article> (the story itself), or the whole document when there is none.
+    Related-story lists around it carry other stories' times."""
+    articles = doc.xpath("(//article)[1]")
+    return articles[0] if articles else doc
+
+
+def time_from_time_tag(doc, url):
+    for value in _article_scope(doc).xpath(".//time/@datetime"):
+        dt = _parse_iso(value)
+        if dt:
+            return dt
+    return None
+
+
+def time_from_byline(doc, url, tz=None):
+    scope = _article_scope(doc)
+    for text in scope.xpath(".//time/text()") + [scope.text_content()]:
+        dt = _parse_byline(text)
+        if dt:
+            return _to_utc(dt, tz or SITE_TZ)
+    return None
+
+
+def time_from_url(doc, url):
+    match = URL_DATE_PATTERN.search(url)
+    if match:
+        try:
+            return datetime(*map(int, match.groups()))
+        except ValueError:
+            pass
+    return None
+
+
+# Tried in this order; the first one that finds a time wins
+TIME_STRATEGIES = [
+    ("meta", time_from_meta),
+    ("json_ld", time_from_json_ld),
+    ("time_tag", time_from_time_tag),
+    ("byline", time_from_byline),
+    ("url", time_from_url),
+]
+
+
+def extract_publication_time(doc, url, byline_tz=None):
+    """(datetime or None, source) with source one of meta / json_ld / time_tag / byline / url."""
+    for source, strategy in TIME_STRATEGIES:
+        dt = strategy(doc, url, byline_tz) if source == "byline" else strategy(doc, url)
+        if dt:
+            return dt, source
+    return None, None
+
+
+# ==============================
+# 📰 Article
+# ==============================
+def _paragraphs(doc):
+    for xpath in CONTENT_XPATHS:
+        texts = [" ".join(p.text_content().split()) for p in doc.xpath(xpath)]
+        texts = [t for t in texts if t]
+        if texts:
+            return texts
+    return []
+
+
+def parse_article_html(page, url, byline_tz=None):
+    """
+    Article dict (extract_article_content fields) from the raw HTML of an article page.
+    `byline_tz` is the zone the byline time is written in (SITE_TZ when None).
+    """
+    doc = lxml_html.fromstring(page)
+
+    title = ""
+    for value in doc.xpath("//h1//text()"):
+        title += value
+    title = " ".join(title.split())
+    if not title:
+        og = doc.xpath("//meta[@property='og:title']/@content")
+        title = og[0].strip() if og else ""
+
+    content = "\n\n".join(_paragraphs(doc))
+    paywalled = any(marker in page for marker in PAYWALL_MARKERS) and (
+        not content or content in PAYWALL_MARKERS)
+
+    published, source = extract_publication_time(doc, url, byline_tz)
+    now = datetime.now()
+    published = published or datetime.now(timezone.utc).replace(tzinfo=None)
+    return {
+        "title": title or "Unknown Title",
+        "content": content,
+        "url": url,
+        "date": published.isoformat(),
+        "publication_datetime": published.strftime("%Y-%m-%d %H:%M:%S"),
+        "time_source": source,
+        "has_time": source in ("meta", "json_ld", "time_tag", "byline"),
+        "url_extracted": source == "url",
+        "meta_extracted": source in ("meta", "json_ld", "time_tag"),
+        "coindesk_format_extracted": source == "byline",
+        "is_paywalled": paywalled,
+        "crawled_at": now.isoformat(),
+        "fetched_via": "http",
+    }
+
+
+def is_complete(article):
+    """True when the static page gave everything the browser path would."""
+    return (article is not None
+            and article["title"] != "Unknown Title"
+            and not article["is_paywalled"]
+            and len(article["content"]) >= MIN_CONTENT_CHARS
+            and (article["has_time"] or article["url_extracted"]))
+
+
+def fetch_article_http(session, url, timeout=30):
+    """(article or None, reason). reason is "ok", "incomplete", "http_<status>" or "error"."""
+    try:
+        resp = session.get(url, timeout=timeout)
+    except requests.RequestException:
+        return None, "error"
+    if resp.status_code != 200:
+        return None, f"http_{resp.status_code}"
+    article = parse_article_html(resp.text, url)
+    return article, "ok" if is_complete(article) else "incomplete"
+
+
+class FetchStats:
+    """Articles/min and browser fallback rate of the article fetcher (thread-safe)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.started = time.perf_counter()
+        self.http = 0
+        self.fallback = 0
+        self.failed = 0
+        self.reasons = {}
+        self.last_via = None
+
+    def record(self, via, reason=None):
+        with self._lock:
+            self.last_via = via
+            if via == "http":
+                self.http += 1
+            elif via == "selenium":
+                self.fallback += 1
+            else:
+                self.failed += 1
+            if reason and reason != "ok":
+                self.reasons[reason] = self.reasons.get(reason, 0) + 1
+
+    def summary(self):
+        done = self.http + self.fallback
+        minutes = (time.perf_counter() - self.started) / 60
+        return {
+            "articles": done,
+            "articles_per_min": done / minutes if minutes else 0.0,
+            "http": self.http,
+            "fallback": self.fallback,
+            "failed": self.failed,
+            "fallback_rate": self.fallback / done if done else 0.0,
+            "fallback_reasons": dict(self.reasons),
+        }
+
+    def report(self):
+        s = self.summary()
+        print(f"📈 {s['articles']} articles, {s['articles_per_min']:.1f}/min | HTTP {s['http']}, "
+              f"browser fallback {s['fallback']} ({s['fallback_rate']:.0%}), failed {s['failed']} "
+              f"{s['fallback_reasons'] or ''}")
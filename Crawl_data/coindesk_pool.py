@@ -0,0 +1,362 @@
+"""
+Worker-pool mode for the CoinDesk crawler.
+
+    discovery (sitemaps or listing page + Load More) ──► URL queue ──► N workers ──► result queue ──► writer
+
+- the discovery producer (sitemaps, or the listing page with its own browser)
+  runs on the calling thread and only enqueues URLs not yet in the shared
+  SeenURLs set,
+- every worker owns its driver (created on first browser fallback, so HTTP
+  fast-path fetches need no Chrome at all),
+- HostBudget spaces requests to one host across all workers (the static GET
+  and a browser fallback each take a slot), so adding workers raises
+  throughput until the per-host budget is reached,
+- each worker's browser is recycled when its RSS or page latency passes the
+  crawl_coindesk_data thresholds (browser_health.py); in Load More mode the
+  discovery browser drops the cards of queued links from the listing page and
+  is recycled (and fast-forwarded back) on the same thresholds,
+- a fetch that raises (driver crash, timeout) quits that worker's driver and
+  puts the URL back on the queue, up to max_attempts; a worker thread that
+  dies is replaced by the supervisor and its in-flight URL re-queued,
+- one writer thread owns the article list and all appends to the article store.
+
+`CrawlPool` only needs callables, so it runs without Selenium; `run_pool`
+wires it to crawl_coindesk_data (set WORKERS > 1 there to use it).
+"""
+
+import logging
+import queue
+import threading
+import time
+from datetime import datetime
+from urllib.parse import urlparse
+
+_STOP = object()
+
+
+class SeenURLs:
+    """Thread-safe set of URLs already queued or crawled."""
+
+    def __init__(self, urls=()):
+        self._urls = set(urls)
+        self._lock = threading.Lock()
+
+    def add(self, url):
+        """Add url; False if it was already there."""
+        with self._lock:
+            if url in self._urls:
+                return False
+            self._urls.add(url)
+            return True
+
+    def __contains__(self, url):
+        with self._lock:
+            return url in self._urls
+
+    def __len__(self):
+        with self._lock:
+            return len(self._urls)
+
+
+class HostBudget:
+    """At most `per_minute` requests per host, evenly spaced, shared by all workers."""
+
+    def __init__(self, per_minute):
+        self.interval = 60.0 / per_minute if per_minute else 0.0
+        self.next_slot = {}
+        self._lock = threading.Lock()
+
+    def wait(self, url):
+        host = urlparse(url).netloc
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self.next_slot.get(host, 0.0))
+            self.next_slot[host] = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+class Worker(threading.Thread):
+    def __init__(self, pool, index):
+        super().__init__(name=f"coindesk-worker-{index}", daemon=True)
+        self.pool = pool
+        self.index = index
+        self.driver = None
+        self.current = None
+        self.done = 0
+
+    def get_driver(self):
+        if self.driver is None:
+            self.driver = self.pool.make_driver()
+        return self.driver
+
+    def reset_driver(self):
+        if self.driver is not None:
+            try:
+                self.driver.quit()
+            except Exception:
+                pass
+            self.driver = None
+
+    def run(self):
+        while True:
+            item = self.pool.urls.get()
+            if item is _STOP:
+                self.pool.urls.task_done()
+                break
+            self.current = item
+            url, attempt = item
+            try:
+                self.pool.budget.wait(url)
+                article = self.pool.fetch(self, url)
+            except Exception as e:
+                logging.error(f"Worker {self.index} failed on {url}: {e}")
+                print(f"⚠️ Worker {self.index}: {str(e)[:100]} - restarting its browser, re-queueing {url}")
+                self.reset_driver()
+                self.pool.requeue(url, attempt)
+            else:
+                if article:
+                    self.pool.results.put(article)
+                    self.done += 1
+                else:
+                    self.pool.count("failed")
+            self.current = None
+            self.pool.urls.task_done()
+        self.reset_driver()
+
+
+class CrawlPool:
+    """
+    fetch(worker, url) -> article dict or None (may raise)
+    write(article)     called on the writer thread only
+    flush()            called on the writer thread after the last article
+    make_driver()      new browser for a worker
+    """
+
+    def __init__(self, fetch, write, flush=None, make_driver=None, workers=4, per_host_per_minute=60,
+                 max_attempts=3, seen=()):
+        self.fetch = fetch
+        self.write = write
+        self.flush = flush
+        self.make_driver = make_driver
+        self.n_workers = workers
+        self.max_attempts = max_attempts
+        self.budget = HostBudget(per_host_per_minute)
+        self.seen = SeenURLs(seen)
+        self.urls = queue.Queue()
+        self.results = queue.Queue()
+        self.workers = []
+        self.stats = {"queued": 0, "written": 0, "failed": 0, "retried": 0, "gave_up": 0, "restarts": 0}
+        self._stats_lock = threading.Lock()
+
+    def count(self, key, n=1):
+        with self._stats_lock:
+            self.stats[key] += n
+
+    # ------------------------------------------------------------------
+    # Queue
+    # ------------------------------------------------------------------
+    def submit(self, urls):
+        """Queue the URLs not seen before; returns how many were new."""
+        new = 0
+        for url in urls:
+            if self.seen.add(url):
+                self.urls.put((url, 0))
+                new += 1
+        self.count("queued", new)
+        return new
+
+    def requeue(self, url, attempt):
+        if attempt + 1 < self.max_attempts:
+            self.count("retried")
+            self.urls.put((url, attempt + 1))
+        else:
+            self.count("gave_up")
+            logging.error(f"Giving up on {url} after {self.max_attempts} attempts")
+
+    # ------------------------------------------------------------------
+    # Threads
+    # ------------------------------------------------------------------
+    def _writer(self):
+        while True:
+            article = self.results.get()
+            if article is _STOP:
+                break
+            try:
+                self.write(article)
+                self.count("written")
+            except Exception as e:
+                logging.error(f"Writer failed on {article.get('url')}: {e}")
+                print(f"❌ Writer error: {e}")
+        if self.flush:
+            self.flush()
+
+    def supervise(self):
+        """Replace dead workers; their in-flight URL goes back on the queue."""
+        for i, worker in enumerate(self.workers):
+            if worker.is_alive():
+                continue
+            if worker.current is not None:
+                self.requeue(*worker.current)
+                self.urls.task_done()
+            worker.reset_driver()
+            self.workers[i] = Worker(self, worker.index)
+            self.workers[i].start()
+            self.count("restarts")
+            print(f"🔄 Restarted worker {worker.index}")
+
+    def run(self, discover):
+        """Feed every batch of links from the discover() iterable to the workers; returns stats."""
+        started = time.perf_counter()
+        writer = threading.Thread(target=self._writer, name="coindesk-writer", daemon=True)
+        writer.start()
+        self.workers = [Worker(self, i) for i in range(self.n_workers)]
+        for worker in self.workers:
+            worker.start()
+
+        try:
+            for links in discover:
+                new = self.submit(links)
+                print(f"🔗 Discovery: +{new} new links ({self.urls.qsize()} queued, {self.stats['written']} written)")
+                self.supervise()
+            while self.urls.unfinished_tasks:
+                self.supervise()
+                time.sleep(0.2)
+        finally:
+            for _ in self.workers:
+                self.urls.put(_STOP)
+            for worker in self.workers:
+                worker.join(timeout=60)
+            self.results.put(_STOP)
+            writer.join()
+
+        elapsed = time.perf_counter() - started
+        self.stats["elapsed_s"] = elapsed
+        self.stats["articles_per_min"] = self.stats["written"] / elapsed * 60 if elapsed else 0.0
+        return self.stats
+
+
+# ==============================
+# 🔌 crawl_coindesk_data wiring
+# ==============================
+def run_pool(workers):
+    import crawl_coindesk_data as cd
+    from browser_health import BrowserHealth
+    from coindesk_http import copy_browser_cookies, make_session
+    from coindesk_sitemap import discover_article_urls, http_fetcher
+
+    cd.load_checkpoint()
+    total = cd.load_existing_data()
+    kept = 0   # articles written this run (they go to the store, none are held in memory)
+    discovery_driver = cd.setup_browser()
+    try:
+        cd.login_to_coindesk(discovery_driver)
+        cookies = discovery_driver.get_cookies()
+        cd.http_session = make_session(pool_size=workers)
+        copy_browser_cookies(cd.http_session, discovery_driver)
+
+        def make_driver():
+            driver = cd.setup_browser()
+            driver.get("https://www.coindesk.com/")
+            for cookie in cookies:
+                try:
+                    driver.add_cookie(cookie)
+                except Exception:
+                    pass
+            return driver
+
+        health = {}
+
+        def fetch(worker, url):
+            started = time.perf_counter()
+
+            def before_browser():
+                # The fallback is a second request to the host: it needs its own budget slot,
+                # and the wait for it is not page latency
+                nonlocal started
+                worker.pool.budget.wait(url)
+                started = time.perf_counter()
+
+            article = cd.fetch_article(None, url, get_driver=worker.get_driver, before_request=before_browser)
+            if worker.driver is not None:
+                # Per-worker RSS / latency watchdog; the next browser fallback starts a fresh driver
+                h = health.setdefault(worker.index, BrowserHealth(cd.MAX_BROWSER_RSS_MB, cd.MAX_LATENCY_FACTOR,
+                                                                   cd.MAX_PAGES_PER_BROWSER))
+                h.record("page", time.perf_counter() - started)
+                reason = h.check(worker.driver)
+                if reason:
+                    print(f"♻️ Worker {worker.index}: recycling browser ({reason})")
+                    worker.reset_driver()
+                    h.recycled(reason)
+            return article
+
+        def write(article):
+            nonlocal kept
+            cd.mark_processed(article['url'])
+            try:
+                when = datetime.fromisoformat(article['date'].replace('Z', '+00:00')).replace(tzinfo=None)
+                keep = cd.start_date <= when <= cd.end_date or not (article.get('has_time') or article.get('url_extracted'))
+            except ValueError:
+                keep = True
+            if not keep:
+                print(f"⏭️ Skipped: {article['title']} - Date {when.strftime('%Y-%m-%d')} outside range")
+                return
+            cd.save_article(article)
+            kept += 1
+            print(f"✅ [{kept}] Got: {article['title']} - {article.get('publication_datetime')}")
+            if kept % 5 == 0:
+                cd.save_checkpoint(total + kept)
+
+        def flush():
+            cd.save_checkpoint(total + kept)
+
+        # The listing page's own watchdog: cd.browser_health also sees the workers' page loads
+        discovery_health = BrowserHealth(cd.MAX_BROWSER_RSS_MB, cd.MAX_LATENCY_FACTOR, 0)
+
+        def listing_links():
+            started = time.perf_counter()
+            links = cd.get_article_links(discovery_driver, track=False)
+            discovery_health.record("links", time.perf_counter() - started)
+            return links
+
+        def discover():
+            nonlocal discovery_driver
+            if cd.DISCOVERY == "sitemap":
+                urls = discover_article_urls(cd.START_DATE, cd.END_DATE, http_fetcher(cd.http_session))
+                if urls:
+                    for i in range(0, len(urls), 50):
+                        yield urls[i:i + 50]
+                    return
+            if not cd.get_page_with_retry(discovery_driver, cd.BASE_URL):
+                return
+            links = listing_links()
+            for clicks in range(cd.MAX_LOAD_MORE_CLICKS):
+                yield links
+                # Queued by now: drop their cards so the listing DOM stays bounded
+                cd.prune_handled_links(discovery_driver, links)
+                resume = 0
+                reason = discovery_health.check(discovery_driver)
+                if reason:
+                    # Fresh browser, fast-forwarded (and pruned) back to this click
+                    discovery_driver = cd.restart_browser(discovery_driver, reason)
+                    discovery_health.recycled(reason)
+                    if not cd.get_page_with_retry(discovery_driver, cd.BASE_URL):
+                        return
+                    resume = clicks
+                if not cd.click_load_more(discovery_driver, max_clicks=resume + 1, resume_clicks=resume):
+                    break
+                links = listing_links()
+
+        pool = CrawlPool(fetch, write, flush, make_driver, workers=workers,
+                         per_host_per_minute=cd.HOST_REQUESTS_PER_MIN, max_attempts=cd.MAX_RETRIES,
+                         seen=cd.processed_urls)
+        stats = pool.run(discover())
+    finally:
+        try:
+            discovery_driver.quit()
+        except Exception:
+            pass
+
+    print(f"\n✅ Pool crawl complete: {stats}")
+    cd.fetch_stats.report()
+    return stats
@@ -3,69 +3,216 @@ import requests
 import pandas as pd
 import time
 import os
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
 
-def fetch_ohlcv_binance(symbol="BTCUSDT", interval="1m", start_time=None, end_time=None):
-    base_url = "https://api.binance.com/api/v3/klines"
-    limit = 1000  # Max records per request
-    all_data = []
+from binance_client import depth_weight, get_client
+from kline_columns import KlineAccumulator
+from ohlcv_store import OHLCVStore
 
-    while start_time < end_time:
-        try:
-            params = {
-                "symbol": symbol,
-                "interval": interval,
-                "startTime": int(start_time.timestamp() * 1000),
-                "limit": limit
-            }
+KLINES_LIMIT = 1000  # Max records per request
+KLINES_WEIGHT = 2  # Request weight of one klines call
 
-            response = requests.get(base_url, params=params, timeout=10)
-            response.raise_for_status()
-            data = response.json()
+INTERVAL_MS = {
+    "1m": 60_000, "3m": 180_000, "5m": 300_000, "15m": 900_000, "30m": 1_800_000,
+    "1h": 3_600_000, "2h": 7_200_000, "4h": 14_400_000, "6h": 21_600_000,
+    "8h": 28_800_000, "12h": 43_200_000, "1d": 86_400_000,
+}
 
-            if not data:
-                print("✅ Finished crawling — no more data.")
-                break
+def _to_ms(dt):
+    return int(dt.timestamp() * 1000)
 
-            if isinstance(data, dict) and data.get("code"):
-                print("⚠️ API Error:", data)
-                break
 
-            all_data += data
+def _iter_kline_pages(symbol, interval, start_ms, end_ms, client=None, raise_errors=False):
+    """
+    Yield raw kline pages with open_time in [start_ms, end_ms], one request at a time.
 
-            # Move to next batch
-            last_time = int(data[-1][0]) / 1000
-            start_time = datetime.fromtimestamp(last_time + 60, tz=timezone.utc)  # +1m, aware timestamp
+    Pacing and retries are left to the BinanceClient, which follows the
+    exchange's used-weight and Retry-After headers. A request that still fails
+    (or an API error body) ends the range early, or is raised as
+    requests.exceptions.RequestException when `raise_errors` is set.
+    """
+    client = client or get_client()
+    step_ms = INTERVAL_MS[interval]
 
-            time.sleep(0.5)  # polite delay
+    while start_ms <= end_ms:
+        params = {
+            "symbol": symbol,
+            "interval": interval,
+            "startTime": start_ms,
+            "endTime": end_ms,
+            "limit": KLINES_LIMIT
+        }
 
+        try:
+            data = client.get("/api/v3/klines", params, weight=KLINES_WEIGHT)
         except requests.exceptions.RequestException as e:
-            print("⚠️ Request error, waiting 10s:", e)
-            time.sleep(10)
-            continue
+            # The client already retried; leave the rest of the range for the next run
+            if raise_errors:
+                raise
+            print(f"⚠️ Request failed for {symbol} at {start_ms}, stopping this range:", e)
+            break
+
+        if not data:
+            break
+
+        if isinstance(data, dict) and data.get("code"):
+            if raise_errors:
+                raise requests.exceptions.RequestException(f"API error for {symbol} at {start_ms}: {data}")
+            print("⚠️ API Error:", data)
+            break
+
+        yield data
+
+        # Move to next batch
+        start_ms = int(data[-1][0]) + step_ms
+
+
+def _fetch_klines_range(symbol, interval, start_ms, end_ms, client=None):
+    """
+    Crawl [start_ms, end_ms] into a KlineAccumulator sized for the whole range.
+
+    A request that still fails after the client's retries is raised, never
+    returned as a range with a hole in it.
+    """
+    expected = (end_ms - start_ms) // INTERVAL_MS[interval] + 1
+    acc = KlineAccumulator(capacity=min(expected, 1_000_000))
+    for page in _iter_kline_pages(symbol, interval, start_ms, end_ms, client, raise_errors=True):
+        acc.append_page(page)
+    return acc
+
+
+def fetch_ohlcv_binance(symbol="BTCUSDT", interval="1m", start_time=None, end_time=None, client=None):
+    """
+    Serial crawl of klines with open_time in [start_time, end_time].
+    Raises requests.exceptions.RequestException when a page cannot be fetched.
+    """
+    acc = _fetch_klines_range(symbol, interval, _to_ms(start_time), _to_ms(end_time), client)
+    print(f"✅ Finished crawling {symbol} — {len(acc)} rows.")
+    return acc.to_frame(symbol)
+
+
+def split_kline_windows(start_ms, end_ms, interval="1m", n_windows=8):
+    """
+    Split [start_ms, end_ms] into at most `n_windows` inclusive windows.
+
+    Window edges are aligned to whole pages (KLINES_LIMIT bars) so no window
+    wastes a request on a short trailing page except the last one.
+    """
+    step_ms = INTERVAL_MS[interval]
+    page_ms = KLINES_LIMIT * step_ms
+    n_pages = (end_ms - start_ms) // page_ms + 1
+    pages_per_window = -(-n_pages // max(1, n_windows))
+
+    windows = []
+    lo = start_ms
+    while lo <= end_ms:
+        hi = min(lo + pages_per_window * page_ms - step_ms, end_ms)
+        windows.append((lo, hi))
+        lo = hi + step_ms
+    return windows
+
+
+def fetch_ohlcv_binance_parallel(symbol="BTCUSDT", interval="1m", start_time=None, end_time=None,
+                                 max_workers=8, client=None):
+    """
+    Backfill mode of fetch_ohlcv_binance.
+
+    The range is sharded into page-aligned windows that are crawled concurrently
+    through one shared BinanceClient (one weight budget, one connection pool),
+    then stitched into a single frame sorted and de-duplicated on open_time.
+    Returns the same rows as the serial path; a window whose request still fails
+    after the client's retries raises (requests.exceptions.RequestException)
+    instead of leaving a hole in the frame.
+    """
+    client = client or get_client()
+    # More windows than workers keeps the pool busy when one window is slow
+    windows = split_kline_windows(_to_ms(start_time), _to_ms(end_time), interval, n_windows=max_workers * 4)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        parts = list(pool.map(lambda w: _fetch_klines_range(symbol, interval, w[0], w[1], client), windows))
+
+    acc = KlineAccumulator(capacity=sum(len(part) for part in parts))
+    for part in parts:
+        acc.extend(part)
+    acc.sort_dedup()
+    print(f"✅ Finished backfill of {symbol} — {len(acc)} rows from {len(windows)} windows.")
+
+    return acc.to_frame(symbol)
+
+def last_closed_open_ms(step_ms):
+    """Open time (ms) of the most recent fully closed candle of a `step_ms` interval."""
+    return (int(time.time() * 1000) // step_ms - 1) * step_ms
+
+def fill_store_range(store, symbol, interval, lo_ms, hi_ms, client=None):
+    """
+    Fetch [lo_ms, hi_ms] into an OHLCVStore page by page.
+
+    Every page is written to its day partitions as soon as it arrives and the
+    manifest is advanced past it, so a crash loses at most one page. Returns the
+    number of rows written, or None if the request failed (range stays a gap).
+    """
+    step_ms = INTERVAL_MS[interval]
+    # Never mark the still-open candle as fetched, it has to be refreshed next run
+    last_closed_ms = last_closed_open_ms(step_ms)
+
+    rows = 0
+    covered_lo = lo_ms
+    try:
+        for page in _iter_kline_pages(symbol, interval, lo_ms, hi_ms, client, raise_errors=True):
+            acc = KlineAccumulator(capacity=len(page))
+            acc.append_page(page)
+            store.write_page(symbol, interval, acc.to_frame(symbol).drop(columns=["symbol"]))
+            rows += len(page)
+
+            covered_hi = min(int(page[-1][0]), last_closed_ms)
+            if covered_hi >= covered_lo:
+                store.mark_fetched(symbol, interval, covered_lo, covered_hi, step_ms)
+            covered_lo = covered_hi + step_ms
+    except requests.exceptions.RequestException as e:
+        print(f"⚠️ {symbol}: request failed, range kept as a gap:", e)
+        return None
 
-    # Format to DataFrame
-    columns = ["open_time", "open", "high", "low", "close", "volume",
-               "close_time", "quote_asset_volume", "num_trades",
-               "taker_buy_base", "taker_buy_quote", "ignore"]
+    # The exchange has nothing more up to hi_ms (not listed yet, or downtime)
+    covered_hi = min(hi_ms, last_closed_ms)
+    if covered_hi >= covered_lo:
+        store.mark_fetched(symbol, interval, covered_lo, covered_hi, step_ms)
+    return rows
 
-    df = pd.DataFrame(all_data, columns=columns)
 
-    # Format types
-    df["open_time"] = pd.to_datetime(df["open_time"], unit="ms")
-    df["symbol"] = symbol
+def crawl_ohlcv_to_store(store, symbol="BTCUSDT", interval="1m", start_time=None, end_time=None,
+                         client=None):
+    """
+    Fill an OHLCVStore for [start_time, end_time], fetching only the gaps.
 
-    float_cols = ["open", "high", "low", "close", "volume"]
-    df[float_cols] = df[float_cols].astype(float)
+    Returns the coverage bitmap (True = no stored bar for that minute) of the
+    requested range.
+    """
+    step_ms = INTERVAL_MS[interval]
+    start_ms, end_ms = _to_ms(start_time), _to_ms(end_time)
+
+    gaps = store.missing_ranges(symbol, interval, start_ms, end_ms, step_ms)
+    print(f"📥 {symbol} {interval}: {len(gaps)} gap(s) to fetch")
+
+    for lo, hi in gaps:
+        fill_store_range(store, symbol, interval, lo, hi, client)
+
+    missing = store.coverage_bitmap(symbol, interval, start_ms, end_ms, step_ms)
+    print(f"✅ {symbol} {interval}: {len(missing) - missing.sum()}/{len(missing)} bars stored, "
+          f"{missing.sum()} missing")
+    return missing
 
-    return df[["open_time", "symbol", "open", "high", "low", "close", "volume"]]
 
 if __name__ == "__main__":
     # Define time range (timezone-aware)
     start_dt = datetime(2025, 7, 1, tzinfo=timezone.utc)
     end_dt = datetime(2025, 9, 30, 23, 59, tzinfo=timezone.utc)
 
-    df = fetch_ohlcv_binance("BTCUSDT", "1m", start_dt, end_dt)
+    # Resumable: only the minutes missing from the store are requested
+    store = OHLCVStore("ohlcv_store")
+    crawl_ohlcv_to_store(store, "BTCUSDT", "1m", start_dt, end_dt)
+    df = store.read("BTCUSDT", "1m", _to_ms(start_dt), _to_ms(end_dt))
+    df.insert(1, "symbol", "BTCUSDT")
 
     # Save
     out_file = "btc_ohlcv_1m_2025_Q3.csv"
@@ -74,23 +221,23 @@ if __name__ == "__main__":
 
 
 
-def fetch_orderbook_snapshot(symbol="BTCUSDT", limit=5):
-    url = "https://api.binance.com/api/v3/depth"
+def fetch_orderbook_snapshot(symbol="BTCUSDT", limit=5, client=None, keep_levels=False):
+    # keep_levels=True also returns every level as "bids"/"asks" [[price, qty], ...],
+    # the input of depth_store.DepthStore / Prepare_data/depth_features.py
+    client = client or get_client()
     params = {
         "symbol": symbol.upper(),
         "limit": limit
     }
     try:
-        response = requests.get(url, params=params, timeout=10)
-        response.raise_for_status()  # phát hiện lỗi HTTP
-        data = response.json()
+        data = client.get("/api/v3/depth", params, weight=depth_weight(limit))
 
         bid_price, bid_qty = map(float, data["bids"][0])
         ask_price, ask_qty = map(float, data["asks"][0])
         spread = ask_price - bid_price
         bid_ask_ratio = bid_qty / ask_qty if ask_qty != 0 else 0
 
-        return {
+        snapshot = {
             "timestamp": datetime.now(timezone.utc),   # dùng timezone-aware
             "symbol": symbol,
             "top_bid_price": bid_price,
@@ -98,23 +245,29 @@ def fetch_orderbook_snapshot(symbol="BTCUSDT", limit=5):
             "spread": spread,
             "bid_ask_ratio": bid_ask_ratio
         }
+        if keep_levels:
+            snapshot["bids"] = [[float(p), float(q)] for p, q in data["bids"]]
+            snapshot["asks"] = [[float(p), float(q)] for p, q in data["asks"]]
+        return snapshot
     except Exception as e:
         print("⚠️ Error fetching snapshot:", e)
         return None
 
-def crawl_orderbook_over_period(symbol="BTCUSDT", start_dt=None, end_dt=None, freq_minutes=5):
+def crawl_orderbook_over_period(symbol="BTCUSDT", start_dt=None, end_dt=None, freq_minutes=5, client=None):
+    # ⚠️ /api/v3/depth only serves the live book: every row is a snapshot of *now*
+    # labelled with a stepped snapshot_time. Real snapshots: orderbook_recorder.py
     current = start_dt
     records = []
 
     while current <= end_dt:
         print(f"📥 Fetching {symbol} OrderBook snapshot at {current}")
-        snapshot = fetch_orderbook_snapshot(symbol)
+        # Pacing comes from the client's weight budget, no fixed sleep
+        snapshot = fetch_orderbook_snapshot(symbol, client=client)
         if snapshot:
             snapshot["snapshot_time"] = current
             records.append(snapshot)
 
         current += timedelta(minutes=freq_minutes)
-        time.sleep(0.5)  # tăng delay để tránh bị block
 
     return pd.DataFrame(records)
 
@@ -128,133 +281,16 @@ if __name__ == "__main__":
     print(f"✅ Saved {len(df)} rows to btc_orderbook_snapshot_5m_2025_Q3.csv")
 
 
-def clean_csv_remove_symbol(input_path, output_path):
-    try:
-        df = pd.read_csv(input_path)
-
-        if "symbol" in df.columns:
-            df = df.drop(columns=["symbol"])
-            df.to_csv(output_path, index=False)
-            print(f"✅ Cleaned file saved as: {output_path}")
-        else:
-            print(f"⚠️ Column 'symbol' not found in: {input_path}")
-    except Exception as e:
-        print(f"❌ Failed to process {input_path}: {e}")
-
 if __name__ == "__main__":
-    # File OHLCV
-    clean_csv_remove_symbol(
-        input_path="/Users/tavantai/Developer/codepy/btc_ohlcv_1m_2025_10_11.csv",
-        output_path="btc_ohlcv_new.csv"
-    )
-
-    # File OrderBook
-    clean_csv_remove_symbol(
-        input_path="/Users/tavantai/Developer/codepy/btc_orderbook_snapshot_5m_2025_10_11.csv",
-        output_path="btc_orderbook_new.csv"
-    )
-
-# Đọc file CSV gốc
-df = pd.read_csv("/Users/tavantai/Developer/codepy/btc_orderbook_snapshot_5m_2025_10_11.csv")
-
-# Xoá cột 'timestamp' nếu tồn tại
-if "timestamp" in df.columns:
-    df.drop(columns=["timestamp"], inplace=True)
-
-# Ghi đè lại file gốc
-df.to_csv("/Users/tavantai/Developer/codepy/btc_orderbook_snapshot_5m_2025_10_11.csv", index=False)
-
-print("✅ Đã xóa 'timestamp' và ghi đè file btc_orderbook.csv")
-
-
-# Đọc file gốc
-df = pd.read_csv("/Users/tavantai/Developer/codepy/btc_orderbook_snapshot_5m_2025_10_11.csv")
-
-# Chuyển snapshot_time về dạng chuỗi ISO không chứa offset +00:00
-if "snapshot_time" in df.columns:
-    df["snapshot_time"] = pd.to_datetime(df["snapshot_time"]).dt.strftime("%Y-%m-%d %H:%M:%S")
-
-# Ghi đè file
-df.to_csv("/Users/tavantai/Developer/codepy/btc_orderbook_snapshot_5m_2025_10_11.csv", index=False)
-
-print("✅ Đã chuẩn hóa snapshot_time và ghi đè file btc_orderbook.csv")
+    # Ghép OHLCV với snapshot order book gần nhất trước đó: một lần đọc, một file Parquet
+    # (thay chuỗi clean/drop/normalize/merge_asof ghi đè CSV nhiều lần trước đây)
+    from merge_market_data import merge_ohlcv_orderbook
 
+    _, report = merge_ohlcv_orderbook("btc_ohlcv_1m_2025_Q3.csv", "btc_orderbook_snapshot_5m_2025_Q3.csv",
+                                      "merged_btc_ohlcv_orderbook_2025_Q3.parquet")
+    print(f"✅ Merged {report['rows']} rows in {report['seconds']:.2f}s "
+          f"(read {report['bytes_read']:,} B, wrote {report['bytes_written']:,} B)")
 
-# Đọc dữ liệu
-ohlcv = pd.read_csv("/Users/tavantai/Developer/codepy/cleandata/btc_ohlcv_new.csv", parse_dates=["open_time"])
-orderbook = pd.read_csv("/Users/tavantai/Developer/codepy/cleandata/btc_orderbook_new.csv", parse_dates=["snapshot_time"])
-
-# Gắn mỗi dòng OHLCV với snapshot gần nhất trước đó (hoặc đúng bằng snapshot_time)
-merged = pd.merge_asof(
-    ohlcv.sort_values("open_time"),
-    orderbook.sort_values("snapshot_time"),
-    left_on="open_time",
-    right_on="snapshot_time",
-    direction="backward"  # ghép với snapshot gần nhất trước đó
-)
-
-# Lưu file mới
-merged.to_csv("merged_btc_ohlcv_orderbook_new.csv", index=False)
-print("✅ Đã lưu merged_btc_ohlcv_orderbook.csv")
-
-
-# Đọc file CSV gốc
-df = pd.read_csv("/Users/tavantai/Developer/codepy/merged_btc_ohlcv_orderbook_new.csv")
-
-# Xoá cột 'snapshot_time' nếu tồn tại
-if "snapshot_time" in df.columns:
-    df.drop(columns=["snapshot_time"], inplace=True)
-
-# Ghi ra một file mới (đổi tên)
-output_path = "/Users/tavantai/Developer/codepy/cleandata/merged_btc_ohlcv_orderbook_official_new.csv"
-df.to_csv(output_path, index=False)
-
-print(f"✅ Đã tạo file mới: {output_path}")
-
-
-def fetch_orderbook_snapshot(symbol="BTCUSDT", limit=5):
-    url = "https://api.binance.com/api/v3/depth"
-    params = {
-        "symbol": symbol.upper(),
-        "limit": limit
-    }
-    try:
-        response = requests.get(url, params=params, timeout=10)
-        response.raise_for_status()
-        data = response.json()
-
-        bid_price, bid_qty = map(float, data["bids"][0])
-        ask_price, ask_qty = map(float, data["asks"][0])
-        spread = ask_price - bid_price
-        bid_ask_ratio = bid_qty / ask_qty if ask_qty != 0 else 0
-
-        return {
-            "timestamp": datetime.now(timezone.utc),
-            "symbol": symbol,
-            "top_bid_price": bid_price,
-            "top_ask_price": ask_price,
-            "spread": spread,
-            "bid_ask_ratio": bid_ask_ratio
-        }
-    except Exception as e:
-        print("⚠️ Error fetching snapshot:", e)
-        return None
-
-def crawl_orderbook_over_period(symbol="BTCUSDT", start_dt=None, end_dt=None, freq_minutes=5):
-    current = start_dt
-    records = []
-
-    while current <= end_dt:
-        print(f"📥 Fetching {symbol} OrderBook snapshot at {current}")
-        snapshot = fetch_orderbook_snapshot(symbol)
-        if snapshot:
-            snapshot["snapshot_time"] = current
-            records.append(snapshot)
-
-        current += timedelta(minutes=freq_minutes)
-        time.sleep(0.5)
-
-    return pd.DataFrame(records)
 
 if __name__ == "__main__":
     # Crawl 1 day only: 11 October 2025
@@ -267,72 +303,13 @@ if __name__ == "__main__":
     df.to_csv(out_file, index=False)
     print(f"✅ Saved {len(df)} rows to {out_file}")
 
-import requests
-import pandas as pd
-import time
-from datetime import datetime, timedelta, timezone
-
-def fetch_ohlcv_binance(symbol="BTCUSDT", interval="1m", start_time=None, end_time=None):
-    base_url = "https://api.binance.com/api/v3/klines"
-    limit = 1000  # Max records per request
-    all_data = []
-
-    while start_time < end_time:
-        try:
-            params = {
-                "symbol": symbol,
-                "interval": interval,
-                "startTime": int(start_time.timestamp() * 1000),
-                "limit": limit
-            }
-
-            response = requests.get(base_url, params=params, timeout=10)
-            response.raise_for_status()
-            data = response.json()
-
-            if not data:
-                print("✅ Finished crawling — no more data.")
-                break
-
-            if isinstance(data, dict) and data.get("code"):
-                print("⚠️ API Error:", data)
-                break
-
-            all_data += data
-
-            # Move to next batch
-            last_time = int(data[-1][0]) / 1000
-            start_time = datetime.fromtimestamp(last_time + 60, tz=timezone.utc)  # move +1 minute
-
-            time.sleep(0.5)  # polite delay
-
-        except requests.exceptions.RequestException as e:
-            print("⚠️ Request error, waiting 10s:", e)
-            time.sleep(10)
-            continue
-
-    # Format to DataFrame
-    columns = ["open_time", "open", "high", "low", "close", "volume",
-               "close_time", "quote_asset_volume", "num_trades",
-               "taker_buy_base", "taker_buy_quote", "ignore"]
-
-    df = pd.DataFrame(all_data, columns=columns)
-
-    # Format types
-    df["open_time"] = pd.to_datetime(df["open_time"], unit="ms")
-    df["symbol"] = symbol
-
-    float_cols = ["open", "high", "low", "close", "volume"]
-    df[float_cols] = df[float_cols].astype(float)
-
-    return df[["open_time", "symbol", "open", "high", "low", "close", "volume"]]
-
 if __name__ == "__main__":
     # Crawl 1 day only: 11 October 2025 (UTC)
     start_dt = datetime(2025, 1, 7, 0, 0, tzinfo=timezone.utc)
     end_dt = datetime(2025, 9, 30, 23, 59, tzinfo=timezone.utc)
 
-    df = fetch_ohlcv_binance("BTCUSDT", "1m", start_dt, end_dt)
+    # 9 months of 1m bars: use the sharded backfill instead of the serial crawl
+    df = fetch_ohlcv_binance_parallel("BTCUSDT", "1m", start_dt, end_dt, max_workers=8)
 
     # Save
     out_file = "btc_ohlcv_1m_2025_10_11.csv"
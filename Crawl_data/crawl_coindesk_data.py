@@ -1,10 +1,9 @@
 import time
 import random
-import json
-import csv
 import os
 import re
 import logging
+import sys
 from datetime import datetime, timedelta
 from selenium import webdriver
 from selenium.webdriver.chrome.service import Service
@@ -15,14 +14,21 @@ from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.common.action_chains import ActionChains
 from selenium.webdriver.common.keys import Keys
 from webdriver_manager.chrome import ChromeDriverManager
-from selenium.common.exceptions import TimeoutException, NoSuchElementException, WebDriverException
+from selenium.common.exceptions import TimeoutException, WebDriverException
+
+from article_log import ArticleLog
+from browser_health import BrowserHealth
+from coindesk_http import (PAYWALL_MARKERS, FetchStats, copy_browser_cookies, fetch_article_http, make_session,
+                           parse_article_html)
+from coindesk_sitemap import discover_article_urls, http_fetcher
 
 # Configuration
 BASE_URL = "https://www.coindesk.com/latest-crypto-news/"
-OUTPUT_CSV = "coindesk_filtered.csv"
-OUTPUT_JSON = "coindesk_raw.json"
+OUTPUT_CSV = "coindesk_filtered.csv"  # export only: python crawl_coindesk_data.py compact
+OUTPUT_JSON = "coindesk_raw.json"  # export only
+ARTICLE_STORE = "coindesk_store"  # append-only articles.jsonl + seen_urls.txt + state.json (article_log.py)
 ERROR_LOG = "coindesk_errors.log"
-CHECKPOINT_FILE = "coindesk_checkpoint.json"
+CHECKPOINT_FILE = "coindesk_checkpoint.json"  # old format, imported once into ARTICLE_STORE
 
 # Authentication - fill these with your CoinDesk credentials
 USE_AUTH = True  # Set to True to enable authentication
@@ -42,6 +48,21 @@ MAX_WAIT = 6  # seconds between article requests (reduced for efficiency)
 BATCH_WAIT_MIN = 15  # minimum seconds between batch runs
 BATCH_WAIT_MAX = 30  # maximum seconds between batch runs
 
+# Static HTML fast path (coindesk_http.py): plain GET + lxml, browser only when the page lacks content
+USE_HTTP_FAST_PATH = True
+HTTP_MIN_WAIT = 1  # seconds between articles fetched over HTTP
+HTTP_MAX_WAIT = 2
+
+# Worker-pool mode (coindesk_pool.py): WORKERS > 1 runs discovery + N browser workers + one writer
+WORKERS = 1
+HOST_REQUESTS_PER_MIN = 30  # politeness budget per host, shared by all workers
+
+# Browser recycling (browser_health.py): restart Chrome when it gets heavy or slow, so long runs keep a flat pace
+MAX_BROWSER_RSS_MB = 1500  # chromedriver + Chrome resident memory
+MAX_LATENCY_FACTOR = 3.0  # recycle when the recent median page load / link scan is this much slower than on a fresh browser
+MAX_PAGES_PER_BROWSER = 500  # recycle after this many article pages anyway
+PRUNE_LOADED_ARTICLES = True  # drop already-handled cards from the 'Load More' page so its DOM (and RSS) stays bounded
+
 # Retry and targets
 MAX_RETRIES = 3  # Maximum number of retries for a page
 DAILY_TARGET = 100000  # Set to a very high number since we're using continuous mode
@@ -53,6 +74,11 @@ TEST_MODE = False  # Set to True for initial testing
 MAX_TEST_ARTICLES = 3  # Reduced to minimize load during testing
 MAX_LOAD_MORE_CLICKS = 1000  # Increased to allow more "Load More" clicks during testing
 
+# URL discovery: "sitemap" lists the START_DATE..END_DATE articles from the XML sitemaps (coindesk_sitemap.py)
+# in a few requests; "load_more" pages through the latest-news page. Sitemap mode falls back to
+# load_more when the sitemaps yield nothing.
+DISCOVERY = "sitemap"
+
 # Set up logging
 logging.basicConfig(
     filename=ERROR_LOG,
@@ -64,8 +90,15 @@ logging.basicConfig(
 start_date = datetime.strptime(START_DATE, '%Y-%m-%d')
 end_date = datetime.strptime(END_DATE, '%Y-%m-%d') + timedelta(days=1) - timedelta(seconds=1)  # End of the day
 
-# Track processed URLs to avoid duplicates
+# Track processed URLs to avoid duplicates (filled from / persisted to the article store's seen index)
 processed_urls = set()
+article_log = None
+
+browser_health = BrowserHealth(MAX_BROWSER_RSS_MB, MAX_LATENCY_FACTOR, MAX_PAGES_PER_BROWSER)
+
+# Pooled HTTP session for the fast path and its counters
+http_session = None
+fetch_stats = FetchStats()
 
 def login_to_coindesk(driver, max_retries=3, use_google=False):
     """Login to CoinDesk with provided credentials and retry if needed"""
@@ -442,149 +475,109 @@ def setup_browser():
     
     return driver
 
-def load_existing_data():
-    """Load existing crawled data if available"""
-    global processed_urls
-    articles = []
-    if os.path.exists(OUTPUT_JSON):
-        try:
-            with open(OUTPUT_JSON, 'r', encoding='utf-8') as f:
-                articles = json.load(f)
-            # Track URLs of already processed articles
-            for article in articles:
-                if 'url' in article:
-                    processed_urls.add(article['url'])
-            print(f"ℹ️ Found {len(processed_urls)} already processed URLs")
-        except json.JSONDecodeError:
-            print("⚠️ Error loading existing JSON data. Starting with empty dataset.")
+def restart_browser(driver, reason=None):
+    """Replace a heavy/slow browser with a fresh one that keeps the login cookies"""
+    print(f"♻️ Recycling browser ({reason or 'requested'})")
+    logging.info(f"Recycling browser: {reason}")
+    cookies = []
+    try:
+        cookies = driver.get_cookies()
+    except Exception:
+        pass
+    try:
+        driver.quit()
+    except Exception:
+        pass
     
-    # Return articles and count
-    return articles, len(articles)
+    driver = setup_browser()
+    driver.get("https://www.coindesk.com/")
+    for cookie in cookies:
+        try:
+            driver.add_cookie(cookie)
+        except Exception:
+            pass
+    browser_health.recycled(reason)
+    return driver
 
-def save_data(articles):
-    """Save data to CSV and JSON files, including all articles"""
-    # Save all articles, even those with little content
-    filtered_articles = []
-    paywalled_count = 0
-    short_content_count = 0
-    
-    for article in articles:
-        content = article.get('content', '')
-        is_paywalled = article.get('is_paywalled', False)
-        
-        # Mark paywall status for statistics but include all articles
-        if content == "Already have an account? Sign in":
-            paywalled_count += 1
-            article['is_paywalled'] = True
-        elif content and len(content) < 100 and not content.startswith("[PAYWALLED]"):
-            short_content_count += 1
-            article['has_short_content'] = True
-        
-        filtered_articles.append(article)
-    
-    if paywalled_count > 0:
-        print(f"ℹ️ Found {paywalled_count} paywalled articles (will be included in output)")
-    if short_content_count > 0:
-        print(f"ℹ️ Found {short_content_count} articles with short content (will be included in output)")
-    
-    # Save to JSON
-    with open(OUTPUT_JSON, 'w', encoding='utf-8') as f:
-        json.dump(filtered_articles, f, ensure_ascii=False, indent=2)
-    
-    # Save to CSV (only selected fields)
-    with open(OUTPUT_CSV, 'w', encoding='utf-8', newline='') as f:
-        writer = csv.writer(f)
-        writer.writerow(['title', 'url', 'date', 'publication_datetime', 'content', 'is_paywalled'])
-        
-        for article in filtered_articles:
-            writer.writerow([
-                article.get('title', ''),
-                article.get('url', ''),
-                article.get('date', ''),
-                article.get('publication_datetime', article.get('date', '').split('T')[0] if 'T' in article.get('date', '') else article.get('date', '')),
-                article.get('content', ''),
-                article.get('is_paywalled', False)
-            ])
+def recycle_if_needed(driver):
+    """Check the browser's RSS / latency and recycle it when over the thresholds; returns the driver to use"""
+    reason = browser_health.check(driver)
+    if reason:
+        return restart_browser(driver, reason)
+    return driver
+
+def open_article_log():
+    """Open the append-only article store once (importing the old JSON/checkpoint files on first use)"""
+    global article_log
+    if article_log is None:
+        article_log = ArticleLog(ARTICLE_STORE, seen=processed_urls)
+        if len(article_log) == 0 and not article_log.seen and (os.path.exists(OUTPUT_JSON) or os.path.exists(CHECKPOINT_FILE)):
+            imported = article_log.import_legacy(OUTPUT_JSON, CHECKPOINT_FILE)
+            print(f"♻️ Imported {imported} articles from {OUTPUT_JSON} into {ARTICLE_STORE}/")
+    return article_log
+
+def load_existing_data():
+    """Open the article store; returns the stored article count - articles stay on disk, none are kept in memory"""
+    log = open_article_log()
+    print(f"ℹ️ Found {len(processed_urls)} already processed URLs, {len(log)} stored articles")
+    return len(log)
+
+def save_article(article):
+    """Append one article to the store (O(1), the full corpus is never rewritten)"""
+    open_article_log().append(article)
+    if article.get('is_paywalled'):
+        print("ℹ️ Paywalled article (included in output)")
+    elif article.get('has_short_content'):
+        print("ℹ️ Article with short content (included in output)")
+
+def mark_processed(url):
+    """Record a processed URL in the incremental seen index"""
+    open_article_log().mark_seen(url)
+
+def export_data():
+    """Compaction: write the consolidated JSON and CSV exports from the article store"""
+    n = open_article_log().export(OUTPUT_JSON, OUTPUT_CSV)
+    print(f"✅ Exported {n} articles to {OUTPUT_JSON} and {OUTPUT_CSV}")
+    return n
 
 def save_checkpoint(daily_count=0):
-    """Save checkpoint information for resuming later"""
-    # Get today's date for daily tracking
+    """Save checkpoint information for resuming later (small state file only)"""
+    log = open_article_log()
+    log.checkpoint(daily_count)
     today = datetime.now().strftime('%Y-%m-%d')
-    
-    # Try to load existing checkpoint first to preserve daily counts
-    daily_counts = {}
-    if os.path.exists(CHECKPOINT_FILE):
-        try:
-            with open(CHECKPOINT_FILE, 'r', encoding='utf-8') as f:
-                existing = json.load(f)
-                if 'daily_counts' in existing:
-                    daily_counts = existing['daily_counts']
-        except:
-            pass
-    
-    # Update today's count
-    if today in daily_counts:
-        daily_counts[today] = max(daily_counts[today], daily_count)
-    else:
-        daily_counts[today] = daily_count
-    
-    checkpoint = {
-        'processed_urls': list(processed_urls),
-        'last_run': datetime.now().isoformat(),
-        'articles_count': len(processed_urls),
-        'daily_counts': daily_counts
-    }
-    
-    with open(CHECKPOINT_FILE, 'w', encoding='utf-8') as f:
-        json.dump(checkpoint, f, ensure_ascii=False, indent=2)
     print(f"✅ Checkpoint saved with {len(processed_urls)} processed URLs")
-    print(f"📊 Today's count: {daily_counts.get(today, 0)}/{DAILY_TARGET} articles")
+    print(f"📊 Today's count: {log.state['daily_counts'].get(today, 0)}/{DAILY_TARGET} articles")
 
 def load_checkpoint():
     """Load checkpoint information if available"""
-    global processed_urls
+    log = open_article_log()
+    if not processed_urls:
+        return False
     
-    if os.path.exists(CHECKPOINT_FILE):
-        try:
-            with open(CHECKPOINT_FILE, 'r', encoding='utf-8') as f:
-                checkpoint = json.load(f)
-                
-            if 'processed_urls' in checkpoint:
-                processed_urls.update(checkpoint['processed_urls'])
-                print(f"✅ Loaded checkpoint with {len(processed_urls)} processed URLs")
-                print(f"📅 Last run: {checkpoint.get('last_run', 'unknown')}")
-                
-                # Show daily count information
-                if 'daily_counts' in checkpoint:
-                    today = datetime.now().strftime('%Y-%m-%d')
-                    today_count = checkpoint['daily_counts'].get(today, 0)
-                    print(f"📊 Today's progress: {today_count}/{DAILY_TARGET} articles")
-                    
-                    # Check if we've hit our daily quota
-                    if today_count >= DAILY_TARGET:
-                        print(f"🎯 Daily target of {DAILY_TARGET} articles already reached for today!")
-                
-                return True
-        except Exception as e:
-            print(f"⚠️ Error loading checkpoint: {str(e)}")
+    print(f"✅ Loaded checkpoint with {len(processed_urls)} processed URLs")
+    print(f"📅 Last run: {log.state.get('last_run') or 'unknown'}")
     
-    return False
+    # Show daily count information
+    today_count = get_daily_count()
+    print(f"📊 Today's progress: {today_count}/{DAILY_TARGET} articles")
+    
+    # Check if we've hit our daily quota
+    if today_count >= DAILY_TARGET:
+        print(f"🎯 Daily target of {DAILY_TARGET} articles already reached for today!")
+    return True
+
+def get_discovery_position():
+    """Number of 'Load More' clicks reached before the last recycle / stop (0 = start from the top)"""
+    return open_article_log().state.get('load_more_clicks', 0)
+
+def set_discovery_position(clicks):
+    """Remember how deep into the 'Load More' feed we are (saved with the next checkpoint)"""
+    open_article_log().state['load_more_clicks'] = clicks
 
 def get_daily_count():
     """Get the count of articles collected today"""
     today = datetime.now().strftime('%Y-%m-%d')
-    
-    if os.path.exists(CHECKPOINT_FILE):
-        try:
-            with open(CHECKPOINT_FILE, 'r', encoding='utf-8') as f:
-                checkpoint = json.load(f)
-                
-            if 'daily_counts' in checkpoint:
-                return checkpoint['daily_counts'].get(today, 0)
-        except:
-            pass
-    
-    return 0
+    return open_article_log().state['daily_counts'].get(today, 0)
 
 def get_page_with_retry(driver, url, max_retries=MAX_RETRIES):
     """Attempt to get a page with retries"""
@@ -637,181 +630,22 @@ def extract_date_from_url(url):
         pass
     return None
 
-def extract_date_directly_from_page(driver):
-    """Extract the publication date directly from the page content"""
-    try:
-        # Try to find the date directly in the page content
-        page_source = driver.page_source
-        
-        # Pattern to match dates like "Oct 1, 2025, 9:43 p.m."
-        pattern = r'(Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)\s+\d{1,2},\s+\d{4},\s+\d{1,2}:\d{2}\s+(a\.m\.|p\.m\.)'
-        match = re.search(pattern, page_source)
-        
-        if match:
-            date_string = match.group(0)
-            print(f"✅ Found date string in page: {date_string}")
-            
-            # Fix the format to be parseable
-            date_string = date_string.replace('a.m.', 'AM').replace('p.m.', 'PM')
-            
-            try:
-                date_obj = datetime.strptime(date_string, '%b %d, %Y, %I:%M %p')
-                print(f"✅ Parsed date with time: {date_obj.strftime('%Y-%m-%d %H:%M:%S')}")
-                return date_obj
-            except Exception as e:
-                print(f"⚠️ Error parsing direct date: {e}")
-    
-    except Exception as e:
-        print(f"⚠️ Error in direct page date extraction: {e}")
-    
-    return None
-
-def extract_coindesk_timestamp(driver):
-    """Extract the CoinDesk specific timestamp format (e.g., 'Oct 1, 2025, 9:43 p.m.')"""
-    try:
-        # First try the exact format seen in the screenshot
+def browser_timezone(driver):
+    """IANA zone the browser renders local times in (read once per driver); None if it cannot be read"""
+    if not hasattr(driver, '_coindesk_tz'):
         try:
-            # Look for the text directly after the "Edited by" part
-            article_content = driver.find_element(By.TAG_NAME, "body").get_attribute("innerHTML")
-            
-            # Pattern for something like "Oct 1, 2025, 9:43 p.m." near the author section
-            timestamp_pattern = r'(Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)\s+\d{1,2},\s+\d{4},\s+\d{1,2}:\d{2}\s+(a\.m\.|p\.m\.)|\d{1,2}:\d{2}(AM|PM)'
-            
-            match = re.search(timestamp_pattern, article_content)
-            if match:
-                timestamp_text = match.group(0)
-                print(f"✅ Found CoinDesk timestamp with regex: {timestamp_text}")
-                
-                # Fix common issues in the text before parsing
-                timestamp_text = timestamp_text.replace('a.m.', 'AM').replace('p.m.', 'PM')
-                
-                # Try different formats
-                formats = [
-                    '%b %d, %Y, %I:%M %p',   # Oct 1, 2025, 9:43 PM
-                    '%B %d, %Y, %I:%M %p',   # October 1, 2025, 9:43 PM
-                    '%b %d, %Y, %I:%M%p',    # Oct 1, 2025, 9:43PM
-                    '%B %d, %Y, %I:%M%p'     # October 1, 2025, 9:43PM
-                ]
-                
-                for fmt in formats:
-                    try:
-                        date_obj = datetime.strptime(timestamp_text, fmt)
-                        print(f"✅ Successfully parsed CoinDesk timestamp: {date_obj.strftime('%Y-%m-%d %H:%M:%S')}")
-                        return date_obj
-                    except ValueError:
-                        continue
-        except Exception as e:
-            print(f"⚠️ Error in regex timestamp extraction: {str(e)[:100]}")
-        
-        # Look for timestamp elements - CoinDesk typically shows these below the author
-        timestamp_selectors = [
-            "time",  # Most common timestamp tag
-            ".timestamp",
-            ".article-datetime",
-            ".published-datetime",
-            ".article-info time",
-            ".at-created",
-            ".article-meta",  # The container that often holds the time
-            ".article-date"  # Another common class for date display
-        ]
-        
-        for selector in timestamp_selectors:
-            try:
-                elements = driver.find_elements(By.CSS_SELECTOR, selector)
-                for element in elements:
-                    text = element.text.strip()
-                    if text and (',' in text) and any(month in text.lower() for month in ['jan', 'feb', 'mar', 'apr', 'may', 'jun', 'jul', 'aug', 'sep', 'oct', 'nov', 'dec']):
-                        print(f"✅ Found CoinDesk timestamp: {text}")
-                        
-                        # Parse formats like "Oct 1, 2025, 9:43 p.m."
-                        try:
-                            # Handle various CoinDesk date formats
-                            date_formats = [
-                                '%b %d, %Y, %I:%M %p',  # Oct 1, 2025, 9:43 p.m.
-                                '%b %d, %Y, %I:%M%p',   # Oct 1, 2025, 9:43pm
-                                '%B %d, %Y, %I:%M %p',  # October 1, 2025, 9:43 p.m.
-                                '%B %d, %Y, %I:%M%p',   # October 1, 2025, 9:43pm
-                                '%b %d, %Y %I:%M %p',    # Oct 1, 2025 9:43 p.m.
-                                '%b %d, %Y %I:%M%p'      # Oct 1, 2025 9:43pm
-                            ]
-                            
-                            # Fix common issues in the text before parsing
-                            text = text.replace('a.m.', 'AM').replace('p.m.', 'PM')
-                            text = text.replace('am', 'AM').replace('pm', 'PM')
-                            
-                            # Try each format
-                            for fmt in date_formats:
-                                try:
-                                    date_obj = datetime.strptime(text, fmt)
-                                    print(f"✅ Successfully parsed CoinDesk timestamp: {date_obj.strftime('%Y-%m-%d %H:%M:%S')}")
-                                    return date_obj
-                                except ValueError:
-                                    continue
-                        except Exception as e:
-                            print(f"⚠️ Error parsing CoinDesk timestamp: {e}")
-            except Exception:
-                continue
-                
-        return None
-    except Exception as e:
-        print(f"⚠️ Error in CoinDesk timestamp extraction: {e}")
-        return None
-
-def extract_date_from_meta(driver):
-    """Try to extract date from meta tags"""
-    try:
-        # Try to find meta tags with date information
-        meta_selectors = [
-            "meta[property='article:published_time']",
-            "meta[name='publication_date']",
-            "meta[name='date']",
-            "meta[name='publish-date']",
-            "meta[name='pubdate']",
-            "meta[itemprop='datePublished']"
-        ]
-        
-        for selector in meta_selectors:
-            try:
-                meta = driver.find_element(By.CSS_SELECTOR, selector)
-                content = meta.get_attribute("content")
-                if content:
-                    # Try different date formats that include time
-                    try:
-                        # ISO format (most common in meta tags)
-                        date_obj = datetime.fromisoformat(content.replace('Z', '+00:00'))
-                        print(f"✅ Found date+time in meta tag: {date_obj.strftime('%Y-%m-%d %H:%M:%S')}")
-                        return date_obj
-                    except:
-                        try:
-                            # RFC 3339 format
-                            date_obj = datetime.strptime(content, '%Y-%m-%dT%H:%M:%S%z')
-                            print(f"✅ Found date+time in RFC 3339 format: {date_obj.strftime('%Y-%m-%d %H:%M:%S')}")
-                            return date_obj
-                        except:
-                            try:
-                                # Common format with timezone
-                                date_obj = datetime.strptime(content, '%Y-%m-%d %H:%M:%S %z')
-                                print(f"✅ Found date+time with timezone: {date_obj.strftime('%Y-%m-%d %H:%M:%S')}")
-                                return date_obj
-                            except:
-                                try:
-                                    # Try without timezone
-                                    date_obj = datetime.strptime(content, '%Y-%m-%d %H:%M:%S')
-                                    print(f"✅ Found date+time without timezone: {date_obj.strftime('%Y-%m-%d %H:%M:%S')}")
-                                    return date_obj
-                                except:
-                                    pass
-            except NoSuchElementException:
-                continue
-    except Exception:
-        pass
-    return None
+            driver._coindesk_tz = driver.execute_script("return Intl.DateTimeFormat().resolvedOptions().timeZone;")
+        except Exception:
+            driver._coindesk_tz = None
+    return driver._coindesk_tz
 
 def extract_article_content(driver, url):
     """Extract content from a Coindesk article page"""
     try:
         print(f"🔍 Loading article page: {url}")
-        if not get_page_with_retry(driver, url):
+        with browser_health.track("page"):
+            loaded = get_page_with_retry(driver, url)
+        if not loaded:
             return None
             
         # Wait a bit for JavaScript to load content (especially important for timestamps)
@@ -824,23 +658,20 @@ def extract_article_content(driver, url):
         except:
             pass
             
+        # One snapshot of the rendered page; everything below is parsed locally (lxml)
+        # instead of one WebDriver round-trip per selector / attribute
+        page = driver.page_source
+        
         # Check if this might be premium content
         premium_indicators = ["Premium", "Pro", "Subscriber", "Member"]
-        is_premium = any(indicator in driver.page_source for indicator in premium_indicators)
+        is_premium = any(indicator in page for indicator in premium_indicators)
         
         if is_premium:
             print("💎 Accessing premium content article")
             logging.info(f"Accessing premium content: {url}")
-            
-            # Try scrolling to help with premium content visibility
-            driver.execute_script("window.scrollTo(0, document.body.scrollHeight/4);")
-            time.sleep(1)
         
         # Check if we have a paywall despite being logged in
-        paywall_detected = any(text in driver.page_source for text in 
-                              ["Already have an account? Sign in", 
-                               "Sign in to continue reading",
-                               "Subscribe to continue reading"])
+        paywall_detected = any(text in page for text in PAYWALL_MARKERS)
         
         if paywall_detected:
             print("⚠️ Still encountering a paywall after login attempt")
@@ -865,69 +696,21 @@ def extract_article_content(driver, url):
                     print(f"⚠️ Error dismissing popups: {str(e)[:100]}")
             except Exception as e:
                 print(f"⚠️ Error during paywall bypass attempts: {str(e)[:100]}")
+            # The page may have changed - take a fresh snapshot
+            page = driver.page_source
         
-        # Extract title
-        try:
-            title_elem = driver.find_element(By.TAG_NAME, "h1")
-            title = title_elem.text.strip()
+        # Title, content and publication time from the snapshot; a byline time is in the browser's zone
+        parsed = parse_article_html(page, url, byline_tz=browser_timezone(driver))
+        title = parsed['title']
+        content = parsed['content']
+        if title != "Unknown Title":
             print(f"✅ Found title: {title}")
-        except NoSuchElementException:
-            title = "Unknown Title"
+        else:
             print("⚠️ Could not find article title")
-        
-        # Extract content - try multiple selectors until we find content
-        content = ""
-        try:
-            # Try several possible content selectors
-            content_selectors = [
-                "article p", 
-                ".at-text p", 
-                ".main-body-content p", 
-                ".article-body p",
-                "[itemprop='articleBody'] p",
-                ".content-article p",
-                ".article-content p",
-                ".at-content-section p",
-                ".story-text p"
-            ]
-            
-            for selector in content_selectors:
-                try:
-                    content_elems = driver.find_elements(By.CSS_SELECTOR, selector)
-                    if content_elems:
-                        content = "\n\n".join([elem.text.strip() for elem in content_elems if elem.text.strip()])
-                        if content:
-                            break
-                except Exception as e:
-                    continue
-            
-            # If still no content, try broader selectors
-            if not content:
-                broader_selectors = ["article", ".article", ".post-content", ".content", "main"]
-                for selector in broader_selectors:
-                    try:
-                        elem = driver.find_element(By.CSS_SELECTOR, selector)
-                        # Extract all paragraph text
-                        paragraphs = elem.find_elements(By.TAG_NAME, "p")
-                        content = "\n\n".join([p.text.strip() for p in paragraphs if p.text.strip()])
-                        if content:
-                            break
-                    except Exception:
-                        continue
-            
-            if content:
-                print(f"✅ Found content: {len(content)} characters")
-            else:
-                # Try to get any text content as a last resort
-                try:
-                    main_content = driver.find_element(By.TAG_NAME, "main")
-                    paragraphs = main_content.find_elements(By.TAG_NAME, "p")
-                    content = "\n\n".join([p.text.strip() for p in paragraphs if p.text.strip()])
-                    print(f"⚠️ Used fallback content extraction: {len(content)} characters")
-                except:
-                    print("⚠️ Could not find article content")
-        except Exception as e:
-            print(f"⚠️ Error extracting content: {str(e)}")
+        if content:
+            print(f"✅ Found content: {len(content)} characters")
+        else:
+            print("⚠️ Could not find article content")
         
         # Set a flag if the content is just the paywall text
         is_paywalled = False
@@ -944,21 +727,20 @@ def extract_article_content(driver, url):
         elif content and len(content) < 100:
             print(f"⚠️ Article has very short content ({len(content)} chars) - keeping but might need verification")
         
-        # Extract date using existing methods
-        # (Only the extract_article_content function has been modified)
-
-        # Placeholder for date extraction
-        date_str = datetime.now().isoformat()
-        publication_datetime = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-        has_time = True
+        if parsed['has_time'] or parsed['url_extracted']:
+            print(f"✅ Publication time: {parsed['publication_datetime']}")
 
         return {
             'title': title,
             'content': content,
             'url': url,
-            'date': date_str,  # Keep ISO format for parsing
-            'publication_datetime': publication_datetime,  # Human-readable format
-            'has_time': has_time,  # Flag indicating if we have actual time information
+            'date': parsed['date'],  # Keep ISO format for parsing
+            'publication_datetime': parsed['publication_datetime'],  # Human-readable format, UTC
+            'time_source': parsed['time_source'],  # meta / json_ld / time_tag / byline / url, None if not found
+            'has_time': parsed['has_time'],  # Flag indicating if we have actual time information
+            'url_extracted': parsed['url_extracted'],
+            'meta_extracted': parsed['meta_extracted'],
+            'coindesk_format_extracted': parsed['coindesk_format_extracted'],
             'is_paywalled': is_paywalled,  # Flag indicating if this article is paywalled
             'crawled_at': datetime.now().isoformat()
         }
@@ -967,8 +749,73 @@ def extract_article_content(driver, url):
         print(f"❌ Error processing article {url}: {str(e)}")
         return None
 
-def get_article_links(driver):
-    """Get article links from the main page"""
+def fetch_article(driver, url, get_driver=None, before_request=None):
+    """
+    Fetch an article over plain HTTP first and fall back to extract_article_content when the static page is not enough.
+    Pool workers pass driver=None and get_driver, so a browser is only started for a fallback, and before_request,
+    which is called before the fallback's page load when the static GET already went to the same host.
+    """
+    global http_session
+    static, reason = None, None
+    if USE_HTTP_FAST_PATH:
+        if http_session is None:
+            http_session = make_session()
+        static, reason = fetch_article_http(http_session, url, timeout=REQUEST_TIMEOUT)
+        if reason == "ok":
+            print(f"⚡ Fetched over HTTP: {static['title']} ({len(static['content'])} chars)")
+            fetch_stats.record("http")
+            return static
+        print(f"↪️ Static HTML not enough ({reason}), falling back to browser")
+        if before_request is not None:
+            before_request()
+
+    article = extract_article_content(driver if driver is not None else get_driver(), url)
+    if article is None:
+        fetch_stats.record("failed", reason)
+        return None
+    article['fetched_via'] = "selenium"
+    # Keep the time found in the static page when the rendered page had none
+    if static is not None and not article['has_time'] and (static['has_time'] or static['url_extracted']):
+        for key in ('date', 'publication_datetime', 'time_source', 'has_time', 'url_extracted', 'meta_extracted',
+                    'coindesk_format_extracted'):
+            article[key] = static[key]
+    fetch_stats.record("selenium", reason)
+    return article
+
+def article_wait():
+    """Pause before the next article: short after an HTTP fetch, the usual browser pacing otherwise"""
+    if fetch_stats.last_via == "http":
+        return random.uniform(HTTP_MIN_WAIT, HTTP_MAX_WAIT)
+    return random.uniform(MIN_WAIT, MAX_WAIT)
+
+COLLECT_HREFS_JS = """
+const out = [];
+for (const selector of arguments[0]) {
+    for (const a of document.querySelectorAll(selector)) out.push(a.href);
+}
+return out;
+"""
+
+# Remove the cards of already-handled links (closest <article>/<li>, or just the link when that would
+# take the 'Load More' button with it); returns how many were removed
+PRUNE_LINKS_JS = """
+const done = new Set(arguments[0]);
+const keep = arguments[1];
+let removed = 0;
+for (const a of Array.from(document.querySelectorAll('a[href]'))) {
+    if (!a.isConnected || !done.has(a.href)) continue;
+    let node = a.closest('article, li') || a;
+    if (keep.some(selector => node.querySelector(selector))) node = a;
+    node.remove();
+    removed++;
+}
+return removed;
+"""
+LOAD_MORE_CONTAINERS = [".more-link", ".load-more", ".load-more-button", "[data-testid='load-more']",
+                        ".at-load-more-button", "button"]
+
+def get_article_links(driver, track=True):
+    """Get article links from the main page (`track=False` keeps the scan out of browser_health's timings)"""
     article_links = []
     # Include all major sections and prioritize links with dates in the URL
     section_selectors = [
@@ -981,12 +828,13 @@ def get_article_links(driver):
         'a[href^="/layer2/"]'
     ]
     
-    for selector in section_selectors:
-        elements = driver.find_elements(By.CSS_SELECTOR, selector)
-        for element in elements:
-            href = element.get_attribute("href")
-            if href and href not in article_links:
-                article_links.append(href)
+    # All hrefs in one script call instead of one get_attribute round-trip per element
+    if track:
+        with browser_health.track("links"):
+            hrefs = driver.execute_script(COLLECT_HREFS_JS, section_selectors) or []
+    else:
+        hrefs = driver.execute_script(COLLECT_HREFS_JS, section_selectors) or []
+    article_links = [href for href in hrefs if href]
     
     # Remove duplicates while preserving order
     seen = set()
@@ -994,14 +842,33 @@ def get_article_links(driver):
     
     return article_links
 
-def click_load_more(driver, max_clicks=MAX_LOAD_MORE_CLICKS, articles=None, articles_count=0, process_after_click=False):
-    """Try to click the 'Load More' button to get more stories and optionally process articles after each click"""
+def prune_handled_links(driver, links):
+    """Drop the cards of `links` from the page; they are never looked at again"""
+    if not PRUNE_LOADED_ARTICLES or not links:
+        return 0
+    try:
+        return driver.execute_script(PRUNE_LINKS_JS, list(links), LOAD_MORE_CONTAINERS) or 0
+    except Exception as e:
+        logging.info(f"Could not prune loaded articles: {e}")
+        return 0
+
+def click_load_more(driver, max_clicks=MAX_LOAD_MORE_CLICKS, articles_count=0, process_after_click=False,
+                    resume_clicks=0):
+    """
+    Try to click the 'Load More' button to get more stories and optionally process articles after each click.
+    The first `resume_clicks` clicks only fast-forward to where the previous browser stopped (no processing,
+    short waits, not timed by browser_health). Cards already handled are pruned after every click, so a resumed
+    browser does not rebuild the DOM the previous one was recycled for. Stops early when browser_health says the
+    browser should be recycled; the position is kept.
+    """
     clicks = 0
     new_links_found = 0
     initial_links = get_article_links(driver)
-    initial_count = len(initial_links)
+    initial_link_set = set(initial_links)  # left on the page for the caller's final pass, never pruned
+    seen_links = set(initial_links)  # pruned cards are gone from the page, so new links are found by set, not count
     consecutive_failures = 0  # Track consecutive failures to prevent infinite loops
     processed_batch_urls = set()  # Track URLs processed in this batch
+    stopped_for_recycle = False
     
     # Process all articles from initial page first
     print(f"📋 Will process all visible articles first before clicking 'Load More'")
@@ -1019,8 +886,10 @@ def click_load_more(driver, max_clicks=MAX_LOAD_MORE_CLICKS, articles=None, arti
     
     print(f"🔍 Looking for 'Load More' button...")
     for clicks in range(max_clicks):
+        fast_forward = clicks < resume_clicks
+        
         # Check if we've reached our test limit
-        if TEST_MODE and len(get_article_links(driver)) > initial_count + 20:
+        if TEST_MODE and len(set(get_article_links(driver)) - seen_links) > 20:
             print(f"✅ Found enough new links in test mode, stopping load more clicks")
             # Save checkpoint before exiting in test mode
             print("💾 Saving checkpoint before exiting test mode load more...")
@@ -1031,7 +900,7 @@ def click_load_more(driver, max_clicks=MAX_LOAD_MORE_CLICKS, articles=None, arti
         
         # Try scrolling to bottom first to reveal any lazy-loaded buttons
         driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-        time.sleep(2)
+        time.sleep(0.5 if fast_forward else 2)
         
         # Try each selector
         for selector in load_more_selectors:
@@ -1047,14 +916,14 @@ def click_load_more(driver, max_clicks=MAX_LOAD_MORE_CLICKS, articles=None, arti
                     if button.is_displayed() and button.is_enabled():
                         # Scroll the button into view
                         driver.execute_script("arguments[0].scrollIntoView(true);", button)
-                        time.sleep(1)
+                        time.sleep(0.2 if fast_forward else 1)
                         
                         try:
                             print(f"✅ Found 'Load More' button, clicking... (Attempt {clicks+1}/{max_clicks})")
                             # Try using JavaScript click which is more reliable
                             driver.execute_script("arguments[0].click();", button)
                             button_found = True
-                            time.sleep(5)  # Wait for new content to load
+                            time.sleep(1.5 if fast_forward else 5)  # Wait for new content to load
                             break
                         except Exception as e:
                             print(f"⚠️ Error clicking button: {str(e)}")
@@ -1069,24 +938,29 @@ def click_load_more(driver, max_clicks=MAX_LOAD_MORE_CLICKS, articles=None, arti
         if not button_found:
             print("⚠️ No 'Load More' button found or it's not clickable")
             break
+        
+        if fast_forward:
+            # Everything up to here was handled before the last recycle / stop: only keep the DOM small
+            loaded = [link for link in get_article_links(driver, track=False) if link not in initial_link_set]
+            seen_links.update(loaded)
+            prune_handled_links(driver, loaded)
+            if clicks + 1 == resume_clicks:
+                print(f"⏩ Resumed 'Load More' position after {resume_clicks} clicks ({len(seen_links)} links seen)")
+            continue
             
         # Check if we got new links
         try:
             current_links = get_article_links(driver)
-            new_count = len(current_links)
+            new_link_list = [link for link in current_links if link not in seen_links]
             
-            if new_count > initial_count:
-                new_links = new_count - initial_count
+            if new_link_list:
+                new_links = len(new_link_list)
                 new_links_found += new_links
                 print(f"✅ Found {new_links} new article links after clicking 'Load More'")
                 
                 # Process new articles if requested
-                if process_after_click and articles is not None:
+                if process_after_click:
                     print(f"🔍 Processing {new_links} new articles from this batch...")
-                    # Get only the new links that weren't in initial_links
-                    current_link_set = set(current_links)
-                    initial_link_set = set(initial_links)
-                    new_link_list = list(current_link_set - initial_link_set)
                     
                     # Process each new link
                     for i, link in enumerate(new_link_list):
@@ -1096,31 +970,40 @@ def click_load_more(driver, max_clicks=MAX_LOAD_MORE_CLICKS, articles=None, arti
                         # Process the article (simplified version of the main processing loop)
                         try:
                             print(f"🔍 Processing article {i+1}/{len(new_link_list)}: {link}")
-                            article_data = extract_article_content(driver, link)
+                            article_data = fetch_article(driver, link)
                             if article_data:
-                                articles.append(article_data)
                                 articles_count += 1
                                 processed_batch_urls.add(link)
-                                processed_urls.add(link)
+                                mark_processed(link)
                                 
                                 # Save after each article
-                                save_data(articles)
+                                save_article(article_data)
                                 
                                 # Wait between articles
                                 if i < len(new_link_list) - 1:
-                                    wait_time = random.uniform(MIN_WAIT, MAX_WAIT)
+                                    wait_time = article_wait()
                                     print(f"💤 Sleeping {wait_time:.1f}s before next article...")
                                     time.sleep(wait_time)
                         except Exception as e:
                             print(f"❌ Error processing article {link}: {str(e)}")
                 
-                initial_count = new_count
-                initial_links = current_links
+                seen_links.update(new_link_list)
+                if process_after_click:
+                    # Handled above; the caller's final pass only needs what is still on the page
+                    prune_handled_links(driver, new_link_list)
                 
                 # Save checkpoint after successful Load More click and processing
                 print("💾 Saving checkpoint after successful 'Load More' click...")
+                set_discovery_position(clicks + 1)
                 save_checkpoint()
                 
+                # A browser that got too heavy / slow is recycled by the caller; the next batch resumes here
+                reason = browser_health.check(driver)
+                if reason:
+                    print(f"🩺 Browser needs recycling ({reason}) - pausing 'Load More' at click {clicks + 1}")
+                    stopped_for_recycle = True
+                    break
+                
                 # Wait longer to avoid rate limiting
                 wait_time = random.uniform(5, 8)
                 print(f"⏳ Waiting {wait_time:.1f}s before next action (avoiding rate limits)...")
@@ -1147,6 +1030,10 @@ def click_load_more(driver, max_clicks=MAX_LOAD_MORE_CLICKS, articles=None, arti
                 save_checkpoint()
                 break
     
+    if not stopped_for_recycle:
+        # Reached the end of the feed (or gave up): the next batch starts from the top again
+        set_discovery_position(0)
+    
     if process_after_click:
         return new_links_found, articles_count, list(processed_batch_urls)
     else:
@@ -1154,10 +1041,15 @@ def click_load_more(driver, max_clicks=MAX_LOAD_MORE_CLICKS, articles=None, arti
 
 def main():
     """Main crawler function"""
+    global http_session
+    if WORKERS > 1:
+        from coindesk_pool import run_pool
+        return run_pool(WORKERS)
+    
     print("🚀 Coindesk Crawler v1.0 (Selenium Enhanced Edition)")
     print("👤 Using Chrome browser in headless mode")
     print(f"📅 Time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-    print(f"💾 Output: CSV ({OUTPUT_CSV}) and JSON ({OUTPUT_JSON})")
+    print(f"💾 Output: append-only store ({ARTICLE_STORE}/), JSON/CSV exports via 'compact'")
     print(f"🔍 Article date range: {START_DATE} to {END_DATE} (for filtering only)")
     print(f"🔄 Full Crawl Mode: Will crawl ALL articles regardless of date")
     
@@ -1169,7 +1061,7 @@ def main():
     
     # Load existing data and checkpoints
     load_checkpoint()
-    articles, articles_count = load_existing_data()
+    articles_count = load_existing_data()
     
     print("🌐 Initializing browser...")
     driver = None
@@ -1194,6 +1086,10 @@ def main():
         else:
             print("⚠️ Could not login but will try to continue anyway")
             logging.warning("Login failed - attempting to crawl without authentication")
+        
+        # Share the browser session cookies with the HTTP fast path
+        http_session = make_session()
+        copy_browser_cookies(http_session, driver)
             
         print(f"📊 Previously crawled {articles_count} articles")
         
@@ -1213,52 +1109,62 @@ def main():
             print(f"📊 Current progress: {articles_count} articles collected so far (collecting all available articles)")
             
             # Get article links
-            print(f"🔍 Loading Coindesk latest news page...")
+            print(f"🔍 Discovering article links ({DISCOVERY})...")
             
             try:
-                if not get_page_with_retry(driver, BASE_URL):
-                    print("❌ Failed to load main page. Retrying in 30 seconds...")
-                    time.sleep(30)
-                    continue
+                processed_during_load_more = []
+                article_links = []
+                if DISCOVERY == "sitemap" and batch_num == 1:
+                    # Article URLs of the date range straight from the sitemaps, oldest first
+                    article_links = discover_article_urls(START_DATE, END_DATE, http_fetcher(http_session))
+                    if not article_links:
+                        print("⚠️ Sitemap discovery found nothing - falling back to the latest-news page")
+                from_sitemap = bool(article_links)
                 
-                print(f"✅ Page loaded successfully")
+                if not article_links:
+                    if not get_page_with_retry(driver, BASE_URL):
+                        print("❌ Failed to load main page. Retrying in 30 seconds...")
+                        time.sleep(30)
+                        continue
                 
-                # Find initial article links
-                article_links = get_article_links(driver)
-                print(f"✅ Found {len(article_links)} unique article links initially")
+                    print(f"✅ Page loaded successfully")
                 
-                # Try to click "Load More" to get more stories and process articles after each click
-                load_more_result = click_load_more(
-                    driver, 
-                    articles=articles, 
-                    articles_count=articles_count,
-                    process_after_click=True
-                )
+                    # Find initial article links
+                    article_links = get_article_links(driver)
+                    print(f"✅ Found {len(article_links)} unique article links initially")
                 
-                if isinstance(load_more_result, tuple):
-                    # Unpack the new results
-                    new_links_found, updated_articles_count, processed_urls_in_batch = load_more_result
+                    # Try to click "Load More" to get more stories and process articles after each click
+                    load_more_result = click_load_more(
+                        driver, 
+                        articles_count=articles_count,
+                        process_after_click=True,
+                        resume_clicks=get_discovery_position()
+                    )
+                
+                    if isinstance(load_more_result, tuple):
+                        # Unpack the new results
+                        new_links_found, updated_articles_count, processed_urls_in_batch = load_more_result
                     
-                    # Update our variables with the new counts
-                    articles_count = updated_articles_count
-                    new_articles_count += len(processed_urls_in_batch)
+                        # Update our variables with the new counts
+                        articles_count = updated_articles_count
+                        new_articles_count += len(processed_urls_in_batch)
                     
-                    print(f"✅ Processed {len(processed_urls_in_batch)} new articles during 'Load More' clicks")
-                    print(f"📊 Total articles: {articles_count} (added {new_articles_count} in this session)")
+                        print(f"✅ Processed {len(processed_urls_in_batch)} new articles during 'Load More' clicks")
+                        print(f"📊 Total articles: {articles_count} (added {new_articles_count} in this session)")
                     
-                    # Since we've already processed articles during load more, we can skip processing again
-                    # But we'll still get updated article links for any final processing
-                    article_links = get_article_links(driver)
-                    print(f"✅ Total article links after 'Load More': {len(article_links)}")
-                else:
-                    # Get updated article links after clicking Load More (old behavior)
-                    article_links = get_article_links(driver)
-                    print(f"✅ Total article links after 'Load More': {len(article_links)}")
+                        # Since we've already processed articles during load more, we can skip processing again
+                        # But we'll still get updated article links for any final processing
+                        article_links = get_article_links(driver)
+                        print(f"✅ Total article links after 'Load More': {len(article_links)}")
+                    else:
+                        # Get updated article links after clicking Load More (old behavior)
+                        article_links = get_article_links(driver)
+                        print(f"✅ Total article links after 'Load More': {len(article_links)}")
                 
-                # Get list of URLs processed during Load More
-                processed_during_load_more = []
-                if isinstance(load_more_result, tuple) and len(load_more_result) > 2:
-                    processed_during_load_more = load_more_result[2]
+                    # Get list of URLs processed during Load More
+                    processed_during_load_more = []
+                    if isinstance(load_more_result, tuple) and len(load_more_result) > 2:
+                        processed_during_load_more = load_more_result[2]
                 
                 # Process any remaining article links that weren't handled during Load More
                 print(f"🔍 Processing any remaining articles not handled during Load More...")
@@ -1282,10 +1188,10 @@ def main():
                         continue
                     
                     # Add to processed URLs set
-                    processed_urls.add(link)
+                    mark_processed(link)
                     
                     # Extract article data
-                    article_data = extract_article_content(driver, link)
+                    article_data = fetch_article(driver, link)
                     
                     if article_data:
                         # Process the date
@@ -1315,8 +1221,7 @@ def main():
                                 print(f"⚠️ Using estimated date for article - including for now, but needs date verification")
                                 
                             if in_date_range or (TEST_MODE and new_articles_count < MAX_TEST_ARTICLES):
-                                # Add to our collection
-                                articles.append(article_data)
+                                # Count it; the article itself goes to the store below, not into memory
                                 articles_count += 1
                                 new_articles_count += 1
                                 
@@ -1330,7 +1235,7 @@ def main():
                                 print(f"✅ [{new_articles_count}] Got: {article_data['title']} - {time_indicator} {display_date}{test_mode_note}{content_note}")
                                 
                                 # Save after each article to ensure we don't lose data
-                                save_data(articles)
+                                save_article(article_data)
                                 
                                 # Save checkpoint every 5 articles
                                 if new_articles_count % 5 == 0:
@@ -1343,17 +1248,27 @@ def main():
                             logging.error(f"Error processing date for {link}: {str(e)}")
                             print(f"❌ Error processing date: {str(e)}")
                     
+                    # Swap the browser for a fresh one when it got too heavy / slow
+                    driver = recycle_if_needed(driver)
+                    
                     # Wait between requests
                     if i < len(article_links) - 1 and (new_articles_count < MAX_TEST_ARTICLES if TEST_MODE else True):
-                        wait_time = random.uniform(MIN_WAIT, MAX_WAIT)
+                        wait_time = article_wait()
                         print(f"💤 Sleeping {wait_time:.1f}s before next article...")
                         time.sleep(wait_time)
                 
                 batch_num += 1
+                fetch_stats.report()
+                browser_health.report()
+                driver = recycle_if_needed(driver)
                 
                 # Check if we should continue or if we're in test mode and have enough articles
                 if TEST_MODE and new_articles_count >= MAX_TEST_ARTICLES:
                     break
+                
+                # The sitemap pass already covered the whole date range
+                if from_sitemap:
+                    break
                     
                 # Continue loading more pages regardless of article dates
                 if not TEST_MODE:
@@ -1379,8 +1294,7 @@ def main():
                 print("🔄 Recreating browser...")
                 driver = setup_browser()
         
-        # Final save
-        save_data(articles)
+        # Final save (articles are already in the store; only the counters are left)
         save_checkpoint(articles_count)  # Use articles_count instead
         
         # Calculate runtime statistics
@@ -1391,9 +1305,9 @@ def main():
         print(f"📈 Results: Crawled {new_articles_count} new articles, total {articles_count} overall")
         print(f"📊 Total articles collected: {articles_count} articles")
         print(f"⏰ Runtime: {runtime_seconds:.1f} seconds ({runtime_minutes:.1f} minutes)")
+        fetch_stats.report()
         print(f"\n💾 Data saved to:")
-        print(f"  - CSV: {os.path.abspath(OUTPUT_CSV)}")
-        print(f"  - JSON: {os.path.abspath(OUTPUT_JSON)}")
+        print(f"  - Store: {os.path.abspath(ARTICLE_STORE)} (run 'python crawl_coindesk_data.py compact' for JSON/CSV)")
         print(f"  - Log: {os.path.abspath(ERROR_LOG)}")
     
     except Exception as e:
@@ -1412,10 +1326,9 @@ def main():
 
 def verify_time_extraction():
     """Verify if the time extraction is working by checking existing data"""
-    if os.path.exists(OUTPUT_JSON):
+    if os.path.exists(ARTICLE_STORE) or os.path.exists(OUTPUT_JSON):
         try:
-            with open(OUTPUT_JSON, 'r', encoding='utf-8') as f:
-                articles = json.load(f)
+            articles = list(open_article_log().iter_articles())
                 
             print(f"\n🔍 Verifying time extraction in {len(articles)} articles:")
             
@@ -1504,12 +1417,17 @@ def verify_time_extraction():
         except Exception as e:
             print(f"Error verifying time extraction: {str(e)}")
     else:
-        print(f"No existing data found in {OUTPUT_JSON}")
+        print(f"No existing data found in {ARTICLE_STORE}")
 
 if __name__ == "__main__":
     # Uncomment this line to verify time extraction in existing data
     # verify_time_extraction()
     
+    # python crawl_coindesk_data.py compact -> rewrite coindesk_raw.json / coindesk_filtered.csv from the store
+    if len(sys.argv) > 1 and sys.argv[1] == "compact":
+        export_data()
+        sys.exit(0)
+    
     start_time = time.time()
     main()
 # Debug statement
@@ -0,0 +1,132 @@
+"""
+Resumable tweet crawl state (SQLite, stdlib only).
+
+Tables:
+    windows   one row per search query (a day or an hour window): next cursor,
+              pages fetched, tweets collected, done flag
+    seen      every tweet id ever collected, INTEGER PRIMARY KEY WITHOUT ROWID
+              (8-byte keys in one B-tree, indexed membership checks)
+    pending   tweets collected for a day that has not been written out yet
+
+Each fetched page is committed in one transaction: its new ids go into
+`seen`, its tweets into `pending` and the cursor of the *next* page into
+`windows`. After a crash the crawl restarts at exactly the page that was
+not committed, with the earlier pages of the day still in `pending`. Once a
+day is written to the TweetStore / CSV, `flush(day)` drops its pending rows.
+
+The seen index is global, so a tweet returned for two neighbouring days (or
+two overlapping windows) is only kept once.
+"""
+
+import json
+import sqlite3
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS windows (
+    query     TEXT PRIMARY KEY,
+    day       TEXT NOT NULL,
+    cursor    TEXT,
+    pages     INTEGER NOT NULL DEFAULT 0,
+    collected INTEGER NOT NULL DEFAULT 0,
+    done      INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS seen (
+    id INTEGER PRIMARY KEY
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS pending (
+    day   TEXT NOT NULL,
+    tweet TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS pending_day ON pending (day);
+"""
+
+
+def tweet_id(tweet):
+    """Numeric tweet id, or None when missing / not numeric."""
+    try:
+        return int(tweet.get("id"))
+    except (TypeError, ValueError):
+        return None
+
+
+class CrawlState:
+    def __init__(self, path="crawl_state.sqlite"):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+
+    # ------------------------------------------------------------------
+    # Seen ids
+    # ------------------------------------------------------------------
+    def __contains__(self, tid):
+        try:
+            tid = int(tid)
+        except (TypeError, ValueError):
+            return False
+        return self.conn.execute("SELECT 1 FROM seen WHERE id = ?", (tid,)).fetchone() is not None
+
+    def __len__(self):
+        return self.conn.execute("SELECT COUNT(*) FROM seen").fetchone()[0]
+
+    def seed(self, ids):
+        """Add ids already stored elsewhere (e.g. TweetStore.ids) to the index."""
+        with self.conn:
+            self.conn.executemany("INSERT OR IGNORE INTO seen (id) VALUES (?)",
+                                  ((int(i),) for i in ids if str(i).isdigit()))
+
+    def unseen(self, tweets):
+        """Tweets whose id is neither in the index nor repeated earlier in the list."""
+        fresh, batch = [], set()
+        for t in tweets:
+            tid = tweet_id(t)
+            if tid is None or tid in batch or tid in self:
+                continue
+            batch.add(tid)
+            fresh.append(t)
+        return fresh
+
+    # ------------------------------------------------------------------
+    # Windows
+    # ------------------------------------------------------------------
+    def window(self, query):
+        """Progress of one query: {"cursor", "pages", "collected", "done"} (zeros if never started)."""
+        row = self.conn.execute("SELECT cursor, pages, collected, done FROM windows WHERE query = ?",
+                                (query,)).fetchone()
+        if row is None:
+            return {"cursor": None, "pages": 0, "collected": 0, "done": False}
+        return {"cursor": row[0], "pages": row[1], "collected": row[2], "done": bool(row[3])}
+
+    def checkpoint(self, day, query, tweets, cursor, done):
+        """
+        Commit one page: `tweets` (already filtered with unseen()) become seen
+        and pending for `day`, and `cursor` is where the next page starts.
+        """
+        with self.conn:
+            self.conn.executemany("INSERT OR IGNORE INTO seen (id) VALUES (?)",
+                                  ((tweet_id(t),) for t in tweets))
+            self.conn.executemany("INSERT INTO pending (day, tweet) VALUES (?, ?)",
+                                  ((day, json.dumps(t, ensure_ascii=False)) for t in tweets))
+            self.conn.execute(
+                "INSERT INTO windows (query, day, cursor, pages, collected, done) VALUES (?, ?, ?, 1, ?, ?) "
+                "ON CONFLICT (query) DO UPDATE SET cursor = excluded.cursor, pages = pages + 1, "
+                "collected = collected + excluded.collected, done = excluded.done",
+                (query, day, cursor, len(tweets), int(done)),
+            )
+
+    # ------------------------------------------------------------------
+    # Pending tweets
+    # ------------------------------------------------------------------
+    def pending(self, day):
+        """Tweets collected for `day` and not flushed yet, in collection order."""
+        rows = self.conn.execute("SELECT tweet FROM pending WHERE day = ? ORDER BY rowid", (day,))
+        return [json.loads(r[0]) for r in rows]
+
+    def flush(self, day):
+        """Forget the pending tweets of `day` once they are safely written out."""
+        with self.conn:
+            self.conn.execute("DELETE FROM pending WHERE day = ?", (day,))
+
+    def close(self):
+        self.conn.close()
@@ -0,0 +1,225 @@
+"""
+Universe crawler: 1m klines and order book snapshots for many symbols at once.
+
+Symbols come from a text file (one per line) or an exchangeInfo JSON dump.
+Each symbol's work is cut into small jobs (a few kline pages, or one depth
+snapshot) that a thread pool runs round-robin across symbols, so every symbol
+gets an equal share of the single BinanceClient weight budget. Klines go to the
+per-symbol partitions of an OHLCVStore, snapshots to per-symbol daily CSVs, and
+per-symbol progress is kept in <root>/state/<SYMBOL>.json so a restart resumes.
+"""
+
+import json
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import datetime, timezone
+
+import pandas as pd
+
+from binance_client import get_client
+from crawl_btc_data import (INTERVAL_MS, KLINES_LIMIT, _to_ms, fetch_orderbook_snapshot, fill_store_range,
+                            last_closed_open_ms)
+from ohlcv_store import OHLCVStore
+
+# ======= Cấu hình =======
+SYMBOLS_FILE = "symbols.txt"          # one symbol per line, or an exchangeInfo .json dump
+OUTPUT_ROOT = "universe_store"
+QUOTE_ASSET = "USDT"
+INTERVAL = "1m"
+START_DATE = datetime(2025, 7, 1, tzinfo=timezone.utc)
+END_DATE = datetime(2025, 9, 30, 23, 59, tzinfo=timezone.utc)
+WORKERS = 8
+PAGES_PER_JOB = 5                     # kline pages per job before the symbol yields its turn
+ORDERBOOK_LIMIT = 20                  # depth levels per snapshot
+
+
+def load_symbols(path, quote_asset=QUOTE_ASSET):
+    """Read symbols from a text list or a /api/v3/exchangeInfo JSON dump."""
+    if path.endswith(".json"):
+        with open(path, "r", encoding="utf-8") as f:
+            info = json.load(f)
+        return symbols_from_exchange_info(info, quote_asset)
+
+    with open(path, "r", encoding="utf-8") as f:
+        symbols = [line.strip().upper() for line in f if line.strip() and not line.startswith("#")]
+    return list(dict.fromkeys(symbols))
+
+
+def symbols_from_exchange_info(info, quote_asset=QUOTE_ASSET):
+    return [s["symbol"] for s in info.get("symbols", [])
+            if s.get("status") == "TRADING" and s.get("quoteAsset") == quote_asset]
+
+
+def fetch_universe(client=None, quote_asset=QUOTE_ASSET):
+    """Live universe from /api/v3/exchangeInfo (weight 20)."""
+    client = client or get_client()
+    return symbols_from_exchange_info(client.get("/api/v3/exchangeInfo", weight=20), quote_asset)
+
+
+class SymbolState:
+    """Per-symbol progress file, rewritten after every job (it is tiny)."""
+
+    def __init__(self, root, symbol):
+        self.path = os.path.join(root, "state", f"{symbol}.json")
+        self.data = {"symbol": symbol, "kline_rows": 0, "kline_jobs": 0, "failed_jobs": 0,
+                     "orderbook_snapshots": 0, "klines_done": False, "updated_at": None}
+        if os.path.exists(self.path):
+            with open(self.path, "r", encoding="utf-8") as f:
+                self.data.update(json.load(f))
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self.data["updated_at"] = datetime.now(timezone.utc).isoformat()
+        tmp = f"{self.path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.data, f, indent=2)
+        os.replace(tmp, self.path)
+
+
+class UniverseCrawler:
+    def __init__(self, symbols, root=OUTPUT_ROOT, interval=INTERVAL, start_time=START_DATE,
+                 end_time=END_DATE, workers=WORKERS, pages_per_job=PAGES_PER_JOB,
+                 orderbook_limit=ORDERBOOK_LIMIT, client=None):
+        self.symbols = symbols
+        self.root = root
+        self.interval = interval
+        self.step_ms = INTERVAL_MS[interval]
+        self.start_ms = _to_ms(start_time)
+        self.end_ms = _to_ms(end_time)
+        self.workers = workers
+        self.job_span_ms = pages_per_job * KLINES_LIMIT * self.step_ms
+        self.orderbook_limit = orderbook_limit
+        self.client = client or get_client()
+
+        self.store = OHLCVStore(os.path.join(root, "ohlcv"))
+        self.states = {s: SymbolState(root, s) for s in symbols}
+        self.csv_lock = threading.Lock()
+
+    # ------------------------------------------------------------------
+    # Jobs
+    # ------------------------------------------------------------------
+    def next_kline_job(self, symbol):
+        """The next slice of the symbol's first gap, or None when it is complete."""
+        # fill_store_range never marks the open candle (or anything later) as fetched,
+        # so a range ending in the future would stay a gap forever
+        end_ms = min(self.end_ms, last_closed_open_ms(self.step_ms))
+        if end_ms < self.start_ms:
+            return None
+        gaps = self.store.missing_ranges(symbol, self.interval, self.start_ms, end_ms, self.step_ms)
+        if not gaps:
+            return None
+        lo, hi = gaps[0]
+        return lo, min(hi, lo + self.job_span_ms - self.step_ms)
+
+    def run_kline_job(self, symbol, lo, hi):
+        rows = fill_store_range(self.store, symbol, self.interval, lo, hi, self.client)
+        state = self.states[symbol].data
+        state["kline_jobs"] += 1
+        if rows is None:
+            state["failed_jobs"] += 1
+        else:
+            state["kline_rows"] += rows
+        return rows is not None
+
+    def run_orderbook_job(self, symbol):
+        snapshot = fetch_orderbook_snapshot(symbol, limit=self.orderbook_limit, client=self.client)
+        if snapshot is None:
+            return False
+
+        day = snapshot["timestamp"].strftime("%Y-%m-%d")
+        folder = os.path.join(self.root, "orderbook", symbol)
+        path = os.path.join(folder, f"{day}.csv")
+        os.makedirs(folder, exist_ok=True)
+        row = pd.DataFrame([snapshot]).drop(columns=["symbol"])
+        row["snapshot_time"] = row["timestamp"]
+        with self.csv_lock:
+            row.to_csv(path, mode="a", header=not os.path.exists(path), index=False)
+        self.states[symbol].data["orderbook_snapshots"] += 1
+        return True
+
+    def _job_for(self, symbol, pending_orderbook):
+        """Pick the symbol's next unit of work; None when the symbol is finished."""
+        if symbol in pending_orderbook:
+            pending_orderbook.discard(symbol)
+            return ("orderbook",)
+        job = self.next_kline_job(symbol)
+        if job is None:
+            return None
+        return ("klines",) + job
+
+    def _run(self, symbol, job):
+        ok = self.run_orderbook_job(symbol) if job[0] == "orderbook" else self.run_kline_job(symbol, *job[1:])
+        return symbol, job, ok
+
+    # ------------------------------------------------------------------
+    # Scheduler
+    # ------------------------------------------------------------------
+    def run(self, with_orderbook=True, max_failures_per_symbol=3):
+        """
+        Round-robin scheduler: at most one in-flight job per symbol, and a
+        symbol re-enters the back of the queue only after its job finished.
+        """
+        pending_orderbook = set(self.symbols) if with_orderbook else set()
+        ready = deque(self.symbols)
+        failures = {s: 0 for s in self.symbols}
+        done = 0
+        started = last_report = time.time()
+
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            running = set()
+            while ready or running:
+                while ready and len(running) < self.workers:
+                    symbol = ready.popleft()
+                    job = self._job_for(symbol, pending_orderbook)
+                    if job is None:
+                        self._finish(symbol)
+                        done += 1
+                        continue
+                    running.add(pool.submit(self._run, symbol, job))
+
+                if not running:
+                    break
+                finished, running = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    symbol, job, ok = future.result()
+                    self.states[symbol].save()
+                    if not ok:
+                        failures[symbol] += 1
+                    if failures[symbol] >= max_failures_per_symbol:
+                        print(f"⛔ {symbol}: {failures[symbol]} failed jobs, leaving it for the next run")
+                        done += 1
+                        continue
+                    ready.append(symbol)
+
+                if time.time() - last_report >= 10:
+                    last_report = time.time()
+                    print(f"📊 {done}/{len(self.symbols)} symbols complete, {len(running)} jobs running, "
+                          f"{time.time() - started:.0f}s elapsed, client {self.client.stats}")
+
+        print(f"✅ {done}/{len(self.symbols)} symbols complete in {time.time() - started:.0f}s")
+        return {s: st.data for s, st in self.states.items()}
+
+    def _finish(self, symbol):
+        state = self.states[symbol]
+        state.data["klines_done"] = True
+        state.save()
+
+
+def main():
+    if os.path.exists(SYMBOLS_FILE):
+        symbols = load_symbols(SYMBOLS_FILE)
+    else:
+        print(f"⚠️ {SYMBOLS_FILE} not found, loading {QUOTE_ASSET} pairs from exchangeInfo")
+        symbols = fetch_universe()
+
+    print(f"🚀 Crawling {len(symbols)} symbols {START_DATE:%Y-%m-%d} → {END_DATE:%Y-%m-%d} "
+          f"with {WORKERS} workers into {OUTPUT_ROOT}/")
+    UniverseCrawler(symbols).run()
+    print("🎉 Universe crawl finished")
+
+
+if __name__ == "__main__":
+    main()
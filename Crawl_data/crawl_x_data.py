@@ -1,9 +1,11 @@
 import requests
-import pandas as pd
 from datetime import datetime, timedelta
+import random
 import time
-import os
-import json
+
+from crawl_state import CrawlState
+from tweet_parquet import parse_created_ms, write_day
+from tweet_store import TweetStore
 
 # ======= Cấu hình =======
 API_KEY = " "  # Thay bằng API key thật
@@ -40,9 +42,13 @@ KEYWORDS = (
 )
 
 QUERY_TYPE = "Latest"
-TWEETS_PER_DAY = 100  # Mục tiêu tweets mỗi ngày
-OUTPUT_CSV = "tweets_2025Q3_crypto.csv"
-OUTPUT_JSON = "tweets_2025Q3_crypto.json"
+RATE_LIMIT_WAIT = 60  # giây chờ khi bị 429 (nếu API không gửi Retry-After)
+MAX_RETRIES = 5  # số lần thử lại tối đa cho 1 trang
+TWEETS_PER_DAY = 100  # Mục tiêu tweets mỗi ngày (chế độ "daily")
+CRAWL_MODE = "windows"  # "windows": cửa sổ 1 giờ chạy song song (crawl_x_windows.py), "daily": 1 query/ngày tuần tự
+OUTPUT_PARQUET = "tweets_2025Q3_crypto_parquet"  # schema cố định (tweet_parquet.py), mỗi ngày một file
+OUTPUT_DIR = "tweets_2025Q3_crypto"  # append-only JSONL shards, mỗi ngày một thư mục
+STATE_DB = "tweets_2025Q3_crypto.state.sqlite"  # cursor từng cửa sổ + index id toàn cục (resume sau crash)
 
 # Debug mode - Bật để xem tweets API trả về
 DEBUG_MODE = True  # Đặt False sau khi test xong
@@ -56,6 +62,8 @@ def fetch_page(query_string, cursor=None):
     """
     Fetch một trang tweets từ API
     API tự động trả max 20 tweets/page
+    429 / 5xx / JSON lỗi / lỗi kết nối: thử lại tối đa MAX_RETRIES lần (vòng lặp, không đệ quy),
+    chờ backoff như crawl_x_windows (429 thì theo Retry-After)
     """
     params = {
         "query": query_string,  # since/until phải nằm TRONG query string
@@ -65,55 +73,90 @@ def fetch_page(query_string, cursor=None):
     if cursor:
         params["cursor"] = cursor
 
-    try:
-        resp = requests.get(BASE_URL, headers=HEADERS, params=params, timeout=30)
-        
+    for attempt in range(MAX_RETRIES + 1):
+        backoff = random.uniform(0, min(30, 0.5 * 2 ** attempt))
+        try:
+            resp = requests.get(BASE_URL, headers=HEADERS, params=params, timeout=30)
+        except requests.RequestException as e:
+            print(f"⚠️ Lỗi kết nối: {e} - thử lại sau {backoff:.1f}s ({attempt + 1}/{MAX_RETRIES})...")
+            time.sleep(backoff)
+            continue
+
         if resp.status_code == 200:
-            return resp.json()
+            try:
+                return resp.json()
+            except ValueError:
+                print(f"⚠️ JSON lỗi, thử lại sau {backoff:.1f}s ({attempt + 1}/{MAX_RETRIES})...")
+                time.sleep(backoff)
+                continue
         elif resp.status_code == 429:
-            print(f"⚠️ Rate limit! Chờ 60s...")
-            time.sleep(60)
-            return fetch_page(query_string, cursor)  # Retry
+            retry_after = resp.headers.get("Retry-After")
+            wait = float(retry_after) if retry_after else RATE_LIMIT_WAIT
+            print(f"⚠️ Rate limit! Chờ {wait:g}s ({attempt + 1}/{MAX_RETRIES})...")
+            time.sleep(wait)
+            continue
         elif resp.status_code == 401:
             print(f"❌ API key không hợp lệ!")
             return None
+        elif resp.status_code >= 500:
+            print(f"⚠️ API lỗi {resp.status_code}, thử lại sau {backoff:.1f}s ({attempt + 1}/{MAX_RETRIES})...")
+            time.sleep(backoff)
+            continue
         else:
             print(f"❌ API lỗi: {resp.status_code} - {resp.text}")
             return None
-            
-    except requests.RequestException as e:
-        print(f"❌ Lỗi kết nối: {e}")
-        return None
+
+    print(f"❌ Bỏ cuộc sau {MAX_RETRIES} lần thử")
+    return None
+
+# ⚠️ GỌN HƠN: Chỉ dùng coin symbols + since/until
+# Query phức tạp làm API bỏ qua filter thời gian!
+SIMPLE_CRYPTO = '($BTC OR $ETH OR $SOL OR #Bitcoin OR #Ethereum OR #Crypto)'
+
+def build_query(since, until):
+    """
+    Query đơn giản: coin + time + language
+    since/until: "YYYY-MM-DD" hoặc "YYYY-MM-DD_HH:MM:SS_UTC" (cửa sổ theo giờ)
+    """
+    return (
+        f'{SIMPLE_CRYPTO} '
+        f'lang:en -is:retweet -is:quote '
+        f'since:{since} until:{until}'
+    )
 
 # ======= Crawl tweet cho 1 ngày =======
-def fetch_tweets_for_day(day):
+def fetch_tweets_for_day(day, state=None):
     """
     Lấy tweets cho một ngày cụ thể
     Sử dụng since/until TRONG query string theo format Twitter API
+
+    state: CrawlState -> mỗi trang được checkpoint (cursor + id + tweets),
+    chạy lại sẽ tiếp tục đúng trang đang dở và bỏ tweet đã lấy ở ngày khác.
+    Không truyền state: dùng state tạm trong RAM (như trước, chỉ dedup trong ngày).
     """
-    all_tweets = []
-    seen_ids = set()
-    cursor = None
-    page = 0
+    if state is None:
+        state = CrawlState(":memory:")
     
     # Format ngày: YYYY-MM-DD (format ngắn gọn - đã test work!)
     date_str = day.strftime("%Y-%m-%d")
     next_day_str = (day + timedelta(days=1)).strftime("%Y-%m-%d")
     
-    # ⚠️ GỌN HƠN: Chỉ dùng coin symbols + since/until
-    # Query phức tạp làm API bỏ qua filter thời gian!
-    SIMPLE_CRYPTO = '($BTC OR $ETH OR $SOL OR #Bitcoin OR #Ethereum OR #Crypto)'
+    query_string = build_query(date_str, next_day_str)
     
-    # ✅ Query đơn giản: coin + time + language
-    query_string = (
-        f'{SIMPLE_CRYPTO} '
-        f'lang:en -is:retweet -is:quote '
-        f'since:{date_str} until:{next_day_str}'
-    )
+    # Tiếp tục từ checkpoint (nếu có)
+    progress = state.window(query_string)
+    all_tweets = state.pending(date_str)
+    cursor = progress["cursor"]
+    page = progress["pages"]
     
     print(f"\n📅 Đang crawl ngày {date_str}...")
     print(f"📝 Query: {query_string}")  # In TOÀN BỘ query để debug
     print(f"📏 Query length: {len(query_string)} chars")
+    if page:
+        print(f"♻️ Tiếp tục từ trang {page + 1} ({len(all_tweets)} tweets chưa ghi)")
+    if progress["done"]:
+        print(f"✅ Ngày {date_str}: đã crawl xong trước đó")
+        return all_tweets
     
     while len(all_tweets) < TWEETS_PER_DAY:
         page += 1
@@ -130,6 +173,7 @@ def fetch_tweets_for_day(day):
         next_cursor = data.get("next_cursor")
         
         if not tweets:
+            state.checkpoint(date_str, query_string, [], None, done=True)
             print(f"✓ Không còn tweets (total: {len(all_tweets)})")
             break
         
@@ -143,44 +187,35 @@ def fetch_tweets_for_day(day):
                 print(f"        \"{text_preview}...\"")
             print(f"  ", end="")
         
-        # Lọc và thêm tweets
-        new_count = 0
+        # Lọc và thêm tweets (bỏ id đã có trong index toàn cục)
+        page_tweets = []
         skipped_count = 0
-        for t in tweets:
-            tid = t.get("id")
-            if tid and tid not in seen_ids:
-                # Kiểm tra thời gian (nhưng KHÔNG skip nếu API đã filter)
-                tweet_date_ok = True
-                try:
-                    created_at_str = t.get("createdAt", "")
-                    if created_at_str:
-                        created_at = datetime.strptime(created_at_str, "%a %b %d %H:%M:%S %z %Y")
-                        created_at_utc = created_at.astimezone(None).replace(tzinfo=None)
-                        
-                        # So sánh ngày (cho phép sai lệch 1 ngày do timezone)
-                        date_diff = abs((created_at_utc.date() - day.date()).days)
-                        if date_diff > 1:
-                            tweet_date_ok = False
-                            skipped_count += 1
-                except Exception as e:
-                    # Nếu parse lỗi, vẫn lấy (tin tưởng API filter)
-                    pass
-                
-                if tweet_date_ok:
-                    seen_ids.add(tid)
-                    all_tweets.append(t)
-                    new_count += 1
-                    
-                    if len(all_tweets) >= TWEETS_PER_DAY:
-                        break
+        fresh = state.unseen(tweets)
+        # Parse createdAt cả trang một lần (UTC), parse lỗi -> None
+        created_days = [ms // 86_400_000 if ms is not None else None
+                        for ms in parse_created_ms([t.get("createdAt") for t in fresh]).to_pylist()]
+        day_no = (day - datetime(1970, 1, 1)).days
+        for t, created_day in zip(fresh, created_days):
+            # Kiểm tra thời gian (nhưng KHÔNG skip nếu API đã filter)
+            # So sánh ngày (cho phép sai lệch 1 ngày do timezone); parse lỗi thì vẫn lấy (tin tưởng API filter)
+            if created_day is not None and abs(created_day - day_no) > 1:
+                skipped_count += 1
+                continue
+            
+            page_tweets.append(t)
+            if len(all_tweets) + len(page_tweets) >= TWEETS_PER_DAY:
+                break
         
+        all_tweets.extend(page_tweets)
         if skipped_count > 0:
             print(f"(skipped {skipped_count} wrong date)", end=" ")
         
-        print(f"✓ +{new_count} tweets (total: {len(all_tweets)})")
+        print(f"✓ +{len(page_tweets)} tweets (total: {len(all_tweets)})")
         
-        # Kiểm tra có trang tiếp theo không
-        if not has_next or not next_cursor or len(all_tweets) >= TWEETS_PER_DAY:
+        # Kiểm tra có trang tiếp theo không, rồi checkpoint trang này
+        done = not has_next or not next_cursor or len(all_tweets) >= TWEETS_PER_DAY
+        state.checkpoint(date_str, query_string, page_tweets, next_cursor, done)
+        if done:
             break
             
         cursor = next_cursor
@@ -189,48 +224,23 @@ def fetch_tweets_for_day(day):
     print(f"✅ Ngày {date_str}: Lấy được {len(all_tweets)} tweets")
     return all_tweets
 
-# ======= Lưu CSV =======
-def save_csv(tweets, file_path):
-    """Lưu tweets vào CSV (append mode)"""
+# ======= Lưu Parquet =======
+def save_parquet(tweets, root, day):
+    """Lưu tweets của ngày vào <root>/<YYYY-MM-DD>.parquet theo schema cố định (gộp + dedup nếu đã có)"""
     if not tweets:
         return
     
-    df = pd.json_normalize(tweets)
-    
-    # Kiểm tra file đã tồn tại chưa
-    file_exists = os.path.exists(file_path)
-    
-    # Append nếu file đã có, create mới nếu chưa
-    df.to_csv(
-        file_path,
-        index=False,
-        mode='a' if file_exists else 'w',
-        header=not file_exists,
-        encoding='utf-8'
-    )
-    
-    print(f"💾 Đã lưu {len(tweets)} tweets vào {file_path}")
+    total = write_day(root, day, tweets)
+    print(f"💾 Đã lưu {len(tweets)} tweets vào {root}/ (ngày này: {total})")
 
 # ======= Lưu JSON =======
-def save_json(tweets, file_path):
-    """Lưu tweets vào JSON (merge với data cũ)"""
+def save_json(tweets, store, day):
+    """Ghi tweets mới của ngày thành một shard JSONL (không đọc/ghi lại dữ liệu cũ)"""
     if not tweets:
         return
-    
-    existing = []
-    if os.path.exists(file_path):
-        try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                existing = json.load(f)
-        except json.JSONDecodeError:
-            print(f"⚠️ File JSON bị lỗi, sẽ tạo mới")
-    
-    all_data = existing + tweets
-    
-    with open(file_path, 'w', encoding='utf-8') as f:
-        json.dump(all_data, f, ensure_ascii=False, indent=2)
-    
-    print(f"💾 Đã lưu tổng {len(all_data)} tweets vào {file_path}")
+
+    written = store.append(day, tweets)
+    print(f"💾 Đã lưu {written} tweets mới vào {store.root}/ (tổng {len(store)})")
 
 # ======= Hàm kiểm tra API key =======
 def check_api_key():
@@ -269,24 +279,46 @@ def main():
     
     # Xác nhận
     print(f"\n⚠️  Lưu ý: Dữ liệu sẽ được lưu vào:")
-    print(f"   - {OUTPUT_CSV}")
-    print(f"   - {OUTPUT_JSON}")
+    print(f"   - {OUTPUT_PARQUET}/")
+    print(f"   - {OUTPUT_DIR}/")
     
     input("\n👉 Nhấn Enter để bắt đầu crawl...")
     
     # Bắt đầu crawl
+    store = TweetStore(OUTPUT_DIR)
+    state = CrawlState(STATE_DB)
+    if len(state) == 0 and len(store.ids):
+        state.seed(store.ids)  # index id toàn cục bắt đầu từ dữ liệu đã lưu
+
+    if CRAWL_MODE == "windows":
+        from crawl_x_windows import crawl_range
+
+        per_day, stats = crawl_range(START_DATE, END_DATE, store, state=state,
+                                     on_day=lambda day, tweets: save_parquet(tweets, OUTPUT_PARQUET, day))
+        total_tweets = sum(per_day.values())
+        success_days = sum(1 for n in per_day.values() if n)
+        print("\n" + "=" * 70)
+        print(f"🎉 HOÀN THÀNH! {success_days}/{len(per_day)} ngày, {total_tweets} tweets")
+        print(f"📊 {stats['pages']} pages, {stats['duplicates']} trùng lặp, {stats['rate_limited']} lần 429, "
+              f"{stats['failed_windows']} cửa sổ lỗi")
+        print(f"📁 Parquet: {OUTPUT_PARQUET}/")
+        print(f"📁 JSONL shards: {OUTPUT_DIR}/")
+        print("=" * 70)
+        return
+
     current_day = START_DATE
     total_tweets = 0
     success_days = 0
     
     while current_day <= END_DATE:
-        tweets = fetch_tweets_for_day(current_day)
+        tweets = fetch_tweets_for_day(current_day, state)
         
         if tweets:
-            save_csv(tweets, OUTPUT_CSV)
-            save_json(tweets, OUTPUT_JSON)
+            save_parquet(tweets, OUTPUT_PARQUET, current_day)
+            save_json(tweets, store, current_day)
             total_tweets += len(tweets)
             success_days += 1
+        state.flush(current_day.strftime("%Y-%m-%d"))  # tweets của ngày đã ghi ra file
         
         current_day += timedelta(days=1)
         
@@ -301,8 +333,8 @@ def main():
     print(f"✅ Crawl thành công: {success_days}/{(END_DATE - START_DATE).days + 1} ngày")
     print(f"📊 Tổng số tweets: {total_tweets}")
     print(f"📈 Trung bình: {total_tweets // success_days if success_days > 0 else 0} tweets/ngày")
-    print(f"📁 File CSV: {OUTPUT_CSV}")
-    print(f"📁 File JSON: {OUTPUT_JSON}")
+    print(f"📁 Parquet: {OUTPUT_PARQUET}/")
+    print(f"📁 JSONL shards: {OUTPUT_DIR}/")
     print("=" * 70)
 
 if __name__ == "__main__":
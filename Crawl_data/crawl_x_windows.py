@@ -0,0 +1,252 @@
+"""
+Concurrent time-sliced tweet crawl (twitterapi.io advanced_search).
+
+Each day is cut into WINDOW_MINUTES slices (since:/until: with
+YYYY-MM-DD_HH:MM:SS_UTC bounds) and many slices are paged at once:
+
+- one shared token bucket paces every request at RATE_PER_SECOND, and a
+  429 drains it so all workers back off together,
+- at most CONCURRENCY windows run at the same time; a slow page only holds
+  up its own window,
+- tweet ids are deduplicated across all windows and runs through the
+  CrawlState id index, and every page is checkpointed there (cursor + tweets),
+  so a restarted crawl resumes each window at the page where it stopped,
+- a day is written to the TweetStore as soon as all of its windows finish.
+
+Requests are blocking `requests` calls run in a thread pool under asyncio
+(same HTTP stack as crawl_x_data.fetch_page). Connection settings and the
+query come from crawl_x_data, so patching its BASE_URL / HEADERS points
+this crawler at the offline stand-in too.
+"""
+
+import asyncio
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+
+import requests
+from requests.adapters import HTTPAdapter
+
+import crawl_x_data
+from crawl_state import CrawlState
+from tweet_store import TweetStore
+
+# ======= Cấu hình =======
+WINDOW_MINUTES = 60          # mỗi ngày chia thành 24 cửa sổ 1 giờ
+TWEETS_PER_WINDOW = 500      # ~12k tweets/ngày thay vì 100
+RATE_PER_SECOND = 10         # QPS tối đa của API key
+BURST = 10
+CONCURRENCY = 16             # số cửa sổ chạy song song
+MAX_RETRIES = 6
+
+
+def _window_bound(dt):
+    return dt.strftime("%Y-%m-%d_%H:%M:%S_UTC")
+
+
+def day_windows(day, window_minutes=WINDOW_MINUTES):
+    """[since, until) UTC windows covering one day."""
+    start = datetime(day.year, day.month, day.day, tzinfo=timezone.utc)
+    step = timedelta(minutes=window_minutes)
+    windows = []
+    lo = start
+    while lo < start + timedelta(days=1):
+        hi = min(lo + step, start + timedelta(days=1))
+        windows.append((lo, hi))
+        lo = hi
+    return windows
+
+
+class TokenBucket:
+    """Shared asyncio rate limiter: `rate` tokens per second, up to `burst` saved."""
+
+    def __init__(self, rate, burst=None):
+        self.rate = rate
+        self.capacity = burst or rate
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.resume_at = 0.0
+        self.lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self):
+        async with self.lock:  # waiters are served in arrival order
+            while True:
+                wait = self.resume_at - time.monotonic()
+                if wait > 0:
+                    await asyncio.sleep(wait)
+                    continue
+                self._refill()
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+    def pause(self, seconds):
+        """Stop every worker for `seconds`; overlapping pauses do not add up."""
+        self.resume_at = max(self.resume_at, time.monotonic() + seconds)
+        self.tokens = 0
+        self.updated = self.resume_at
+
+
+class WindowedTweetCrawler:
+    def __init__(self, store=None, state=None, window_minutes=WINDOW_MINUTES, tweets_per_window=TWEETS_PER_WINDOW,
+                 rate_per_second=RATE_PER_SECOND, burst=BURST, concurrency=CONCURRENCY,
+                 max_retries=MAX_RETRIES):
+        self.store = store
+        self.window_minutes = window_minutes
+        self.tweets_per_window = tweets_per_window
+        self.rate_per_second = rate_per_second
+        self.burst = burst
+        self.concurrency = concurrency
+        self.max_retries = max_retries
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=concurrency, pool_maxsize=concurrency)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.pool = ThreadPoolExecutor(max_workers=concurrency)
+
+        # Global dedup + cursors; without a state file everything lives in RAM for this run
+        self.state = state if state is not None else CrawlState(":memory:")
+        if store is not None and len(self.state) == 0:
+            self.state.seed(store.ids)
+        self.stats = {"windows": 0, "failed_windows": 0, "pages": 0, "tweets": 0, "duplicates": 0,
+                      "rate_limited": 0, "retries": 0}
+
+    # ------------------------------------------------------------------
+    # Requests
+    # ------------------------------------------------------------------
+    def _get(self, params):
+        return self.session.get(crawl_x_data.BASE_URL, headers=crawl_x_data.HEADERS, params=params, timeout=30)
+
+    async def fetch_page(self, query, cursor=None):
+        """One advanced_search page, retried in a loop on 429 / 5xx / bad JSON / connection errors."""
+        params = {"query": query, "queryType": crawl_x_data.QUERY_TYPE}
+        if cursor:
+            params["cursor"] = cursor
+        loop = asyncio.get_running_loop()
+
+        for attempt in range(self.max_retries + 1):
+            await self.bucket.acquire()
+            backoff = random.uniform(0, min(30, 0.5 * 2 ** attempt))
+            try:
+                resp = await loop.run_in_executor(self.pool, self._get, params)
+            except requests.RequestException as e:
+                print(f"⚠️ Lỗi kết nối: {e}")
+                self.stats["retries"] += 1
+                await asyncio.sleep(backoff)
+                continue
+
+            if resp.status_code == 200:
+                try:
+                    self.stats["pages"] += 1
+                    return resp.json()
+                except ValueError:
+                    self.stats["retries"] += 1
+                    await asyncio.sleep(backoff)
+                    continue
+            if resp.status_code == 429:
+                self.stats["rate_limited"] += 1
+                self.stats["retries"] += 1
+                retry_after = resp.headers.get("Retry-After")
+                self.bucket.pause(float(retry_after) if retry_after else max(backoff, 1.0))
+                continue
+            if resp.status_code == 401:
+                print("❌ API key không hợp lệ!")
+                return None
+            if resp.status_code >= 500:
+                self.stats["retries"] += 1
+                await asyncio.sleep(backoff)
+                continue
+            print(f"❌ API lỗi: {resp.status_code} - {resp.text[:200]}")
+            return None
+        return None
+
+    # ------------------------------------------------------------------
+    # Windows
+    # ------------------------------------------------------------------
+    async def crawl_window(self, day, since, until):
+        """
+        Page one [since, until) window from its checkpoint until it is done or
+        holds tweets_per_window tweets; new tweets land in state.pending(day).
+        """
+        async with self.semaphore:
+            query = crawl_x_data.build_query(_window_bound(since), _window_bound(until))
+            progress = self.state.window(query)
+            cursor, collected, done = progress["cursor"], progress["collected"], progress["done"]
+            while not done:
+                data = await self.fetch_page(query, cursor)
+                if data is None:
+                    self.stats["failed_windows"] += 1
+                    break
+                page = data.get("tweets", [])
+                fresh = self.state.unseen(page)[:self.tweets_per_window - collected]
+                self.stats["duplicates"] += len(page) - len(fresh)
+                collected += len(fresh)
+                cursor = data.get("next_cursor")
+                done = not page or not data.get("has_next_page") or not cursor or collected >= self.tweets_per_window
+                self.state.checkpoint(day, query, fresh, cursor, done)
+            self.stats["windows"] += 1
+
+    async def crawl_days(self, start_day, end_day, on_day=None):
+        """
+        Crawl every day in [start_day, end_day]; returns {YYYY-MM-DD: n_tweets}.
+        Each finished day goes to the store, then to on_day(day, tweets), and
+        is then flushed from the crawl state.
+        """
+        self.bucket = TokenBucket(self.rate_per_second, self.burst)
+        self.semaphore = asyncio.Semaphore(self.concurrency)
+
+        days = []
+        day = start_day
+        while day <= end_day:
+            days.append(day)
+            day += timedelta(days=1)
+
+        # Every window is scheduled up front; days are collected in order
+        tasks = {d: [asyncio.create_task(self.crawl_window(d.strftime("%Y-%m-%d"), lo, hi))
+                     for lo, hi in day_windows(d, self.window_minutes)]
+                 for d in days}
+        per_day = {}
+        started = time.perf_counter()
+        for d in days:
+            await asyncio.gather(*tasks[d])
+            key = d.strftime("%Y-%m-%d")
+            tweets = self.state.pending(key)
+            per_day[key] = len(tweets)
+            self.stats["tweets"] += len(tweets)
+            if self.store is not None and tweets:
+                self.store.append(key, tweets)
+            if on_day is not None and tweets:
+                on_day(d, tweets)
+            self.state.flush(key)
+            print(f"✅ Ngày {key}: {len(tweets)} tweets ({self.stats['pages']} pages, "
+                  f"{self.stats['tweets'] / (time.perf_counter() - started):.0f} tweets/s)")
+        return per_day
+
+    def close(self):
+        self.session.close()
+        self.pool.shutdown()
+
+
+def crawl_range(start_day, end_day, store=None, on_day=None, state=None, **kwargs):
+    """Blocking entry point: run the windowed crawl and return (per-day counts, stats)."""
+    crawler = WindowedTweetCrawler(store=store, state=state, **kwargs)
+    try:
+        per_day = asyncio.run(crawler.crawl_days(start_day, end_day, on_day))
+    finally:
+        crawler.close()
+    return per_day, crawler.stats
+
+
+if __name__ == "__main__":
+    store = TweetStore(crawl_x_data.OUTPUT_DIR)
+    per_day, stats = crawl_range(crawl_x_data.START_DATE, crawl_x_data.END_DATE, store,
+                                 state=CrawlState(crawl_x_data.STATE_DB))
+    print(f"🎉 {sum(per_day.values())} tweets over {len(per_day)} days, stats {stats}")
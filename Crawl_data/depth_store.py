@@ -0,0 +1,163 @@
+"""
+Columnar multi-level order book store.
+
+Layout:
+    <root>/<SYMBOL>/<YYYY-MM-DD>.npz   one file per symbol and UTC day
+
+Each file holds T snapshots as plain arrays:
+    tick_ms      (T,)          scheduled snapshot time
+    exchange_ms  (T,)          time the exchange served the book
+    bids, asks   (T, L, 2)     [price, qty] per level, best level first,
+                               NaN-padded when the book had fewer levels
+
+so months of snapshots load as a few contiguous arrays that the vectorized
+features in Prepare_data/depth_features.py consume directly.
+
+    python depth_store.py orderbook_recorder/*.jsonl.gz    # ingest recorder output
+"""
+
+import glob
+import gzip
+import json
+import os
+import sys
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+DEPTH_LEVELS = 20
+
+DepthBlock = namedtuple("DepthBlock", ["tick_ms", "exchange_ms", "bids", "asks"])
+
+
+def _empty_block(levels):
+    return DepthBlock(np.empty(0, np.int64), np.empty(0, np.int64),
+                      np.empty((0, levels, 2)), np.empty((0, levels, 2)))
+
+
+def levels_to_array(sides, levels):
+    """List of per-snapshot [[price, qty], ...] lists -> (T, levels, 2) NaN-padded array."""
+    out = np.full((len(sides), levels, 2), np.nan)
+    for i, side in enumerate(sides):
+        n = min(len(side), levels)
+        if n:
+            out[i, :n] = np.asarray(side[:n], dtype=np.float64)
+    return out
+
+
+def concat_blocks(blocks, levels):
+    blocks = [b for b in blocks if len(b.tick_ms)]
+    if not blocks:
+        return _empty_block(levels)
+    return DepthBlock(*(np.concatenate([getattr(b, f) for b in blocks]) for f in DepthBlock._fields))
+
+
+class DepthStore:
+    """Day-partitioned .npz store of (T, levels, 2) depth arrays."""
+
+    def __init__(self, root="depth_store", levels=DEPTH_LEVELS):
+        self.root = root
+        self.levels = levels
+        os.makedirs(root, exist_ok=True)
+
+    def partition_path(self, symbol, day):
+        return os.path.join(self.root, symbol.upper(), f"{day}.npz")
+
+    def _load(self, path):
+        with np.load(path) as f:
+            block = DepthBlock(f["tick_ms"], f["exchange_ms"], f["bids"], f["asks"])
+        return self._fit_levels(block)
+
+    def _fit_levels(self, block):
+        """Cut or NaN-pad the level axis to self.levels."""
+        have = block.bids.shape[1]
+        if have == self.levels:
+            return block
+        if have > self.levels:
+            return block._replace(bids=block.bids[:, :self.levels], asks=block.asks[:, :self.levels])
+        pad = ((0, 0), (0, self.levels - have), (0, 0))
+        return block._replace(bids=np.pad(block.bids, pad, constant_values=np.nan),
+                              asks=np.pad(block.asks, pad, constant_values=np.nan))
+
+    def write(self, symbol, block):
+        """
+        Merge snapshots into their day partitions.
+
+        Snapshots already stored for the same tick_ms are replaced (the new one wins).
+        """
+        block = self._fit_levels(block)
+        if len(block.tick_ms) == 0:
+            return
+        folder = os.path.join(self.root, symbol.upper())
+        os.makedirs(folder, exist_ok=True)
+
+        days = pd.to_datetime(block.tick_ms, unit="ms").strftime("%Y-%m-%d").to_numpy()
+        for day in np.unique(days):
+            mask = days == day
+            part = DepthBlock(*(a[mask] for a in block))
+            path = self.partition_path(symbol, day)
+            if os.path.exists(path):
+                part = concat_blocks([part, self._load(path)], self.levels)
+            # np.unique keeps the first occurrence: the newly written rows
+            _, first = np.unique(part.tick_ms, return_index=True)
+            part = DepthBlock(*(a[first] for a in part))
+
+            tmp = f"{path}.tmp.npz"
+            np.savez_compressed(tmp, **part._asdict())
+            os.replace(tmp, path)
+
+    def read(self, symbol, start_ms=None, end_ms=None):
+        """All snapshots with tick_ms in [start_ms, end_ms] as one DepthBlock sorted by tick."""
+        folder = os.path.join(self.root, symbol.upper())
+        if not os.path.isdir(folder):
+            return _empty_block(self.levels)
+
+        files = sorted(f for f in os.listdir(folder) if f.endswith(".npz"))
+        if start_ms is not None:
+            first_day = pd.to_datetime(start_ms, unit="ms").strftime("%Y-%m-%d")
+            files = [f for f in files if f[:10] >= first_day]
+        if end_ms is not None:
+            last_day = pd.to_datetime(end_ms, unit="ms").strftime("%Y-%m-%d")
+            files = [f for f in files if f[:10] <= last_day]
+
+        block = concat_blocks([self._load(os.path.join(folder, f)) for f in files], self.levels)
+        mask = np.ones(len(block.tick_ms), dtype=bool)
+        if start_ms is not None:
+            mask &= block.tick_ms >= start_ms
+        if end_ms is not None:
+            mask &= block.tick_ms <= end_ms
+        return DepthBlock(*(a[mask] for a in block))
+
+    def ingest_records(self, records):
+        """Write recorder records (dicts with symbol, tick_ms, exchange_ms, bids, asks)."""
+        by_symbol = {}
+        for r in records:
+            by_symbol.setdefault(r["symbol"], []).append(r)
+
+        for symbol, rows in by_symbol.items():
+            block = DepthBlock(
+                np.array([r["tick_ms"] for r in rows], dtype=np.int64),
+                np.array([r.get("exchange_ms", r["tick_ms"]) for r in rows], dtype=np.int64),
+                levels_to_array([r["bids"] for r in rows], self.levels),
+                levels_to_array([r["asks"] for r in rows], self.levels),
+            )
+            self.write(symbol, block)
+        return {s: len(rows) for s, rows in by_symbol.items()}
+
+    def ingest_recorder_files(self, paths):
+        """Load rolling orderbook_recorder files into the store, one file at a time."""
+        total = {}
+        for path in paths:
+            with gzip.open(path, "rt", encoding="utf-8") as f:
+                counts = self.ingest_records(json.loads(line) for line in f)
+            for symbol, n in counts.items():
+                total[symbol] = total.get(symbol, 0) + n
+        return total
+
+
+if __name__ == "__main__":
+    patterns = sys.argv[1:] or [os.path.join("orderbook_recorder", "*.jsonl.gz")]
+    paths = sorted(p for pattern in patterns for p in glob.glob(pattern))
+    counts = DepthStore().ingest_recorder_files(paths)
+    print(f"✅ Ingested {sum(counts.values())} snapshots from {len(paths)} files: {counts}")
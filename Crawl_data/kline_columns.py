@@ -0,0 +1,162 @@
+"""
+Typed columnar accumulator for Binance klines.
+
+Each page returned by /api/v3/klines (a list of 12-field lists, prices as
+strings) is parsed straight into preallocated numpy columns, so a months-long
+crawl never holds the raw JSON rows of more than one page. All 12 Binance
+fields are kept: taker-buy volume and trade count are pump signals too.
+"""
+
+import numpy as np
+import pandas as pd
+
+# Binance kline field order with the dtype each column is stored in
+KLINE_FIELDS = [
+    ("open_time", np.int64),
+    ("open", np.float64),
+    ("high", np.float64),
+    ("low", np.float64),
+    ("close", np.float64),
+    ("volume", np.float64),
+    ("close_time", np.int64),
+    ("quote_asset_volume", np.float64),
+    ("num_trades", np.int64),
+    ("taker_buy_base", np.float64),
+    ("taker_buy_quote", np.float64),
+    ("ignore", np.float64),
+]
+
+PRICE_FIELDS = ("open", "high", "low", "close")
+
+# Columns exposed by to_frame(); `ignore` is always "0" and stays internal
+FRAME_COLUMNS = ["open_time", "symbol", "open", "high", "low", "close", "volume",
+                 "close_time", "quote_asset_volume", "num_trades",
+                 "taker_buy_base", "taker_buy_quote"]
+
+
+class KlineAccumulator:
+    """Growable fixed-dtype columns, filled page by page."""
+
+    def __init__(self, capacity=1024, price_dtype=np.float64):
+        self.dtypes = {name: (price_dtype if name in PRICE_FIELDS else dtype)
+                       for name, dtype in KLINE_FIELDS}
+        self.columns = {name: np.empty(max(1, capacity), dtype=dtype)
+                        for name, dtype in self.dtypes.items()}
+        self.size = 0
+
+    def __len__(self):
+        return self.size
+
+    @property
+    def capacity(self):
+        return len(self.columns["open_time"])
+
+    def reserve(self, needed):
+        """Grow every column (amortized doubling) so it holds at least `needed` rows."""
+        if needed <= self.capacity:
+            return
+        new_capacity = max(needed, self.capacity * 2)
+        for name, col in self.columns.items():
+            grown = np.empty(new_capacity, dtype=col.dtype)
+            grown[:self.size] = col[:self.size]
+            self.columns[name] = grown
+
+    def append_page(self, page):
+        """Parse one klines page (list of 12-field rows) into the columns."""
+        n = len(page)
+        if n == 0:
+            return
+        self.reserve(self.size + n)
+        lo, hi = self.size, self.size + n
+        for j, (name, _) in enumerate(KLINE_FIELDS):
+            # numpy parses the decimal strings while filling the typed slice
+            self.columns[name][lo:hi] = [row[j] for row in page]
+        self.size = hi
+
+    def extend(self, other):
+        """Append all rows of another accumulator."""
+        self.reserve(self.size + other.size)
+        for name in self.columns:
+            self.columns[name][self.size:self.size + other.size] = other.columns[name][:other.size]
+        self.size += other.size
+
+    def view(self, name):
+        return self.columns[name][:self.size]
+
+    def sort_dedup(self):
+        """Sort on open_time and drop repeated open_times in place (first one wins)."""
+        _, first = np.unique(self.view("open_time"), return_index=True)
+        if len(first) == self.size and np.all(first == np.arange(self.size)):
+            return
+        for name in self.columns:
+            kept = self.view(name)[first]
+            self.columns[name][:len(kept)] = kept
+        self.size = len(first)
+
+    def to_frame(self, symbol):
+        """DataFrame with open_time as datetime64[ms] and every field except `ignore`."""
+        data = {name: self.view(name) for name in FRAME_COLUMNS if name != "symbol"}
+        data["open_time"] = data["open_time"].astype("datetime64[ms]")
+        data["symbol"] = np.full(self.size, symbol, dtype=object)
+        return pd.DataFrame({name: data[name] for name in FRAME_COLUMNS}, copy=False)
+
+
+def _legacy_to_frame(rows, symbol):
+    """The list-of-lists path fetch_ohlcv_binance used before the accumulator."""
+    columns = [name for name, _ in KLINE_FIELDS]
+    df = pd.DataFrame(rows, columns=columns)
+    df["open_time"] = pd.to_datetime(df["open_time"], unit="ms")
+    df["symbol"] = symbol
+    float_cols = ["open", "high", "low", "close", "volume"]
+    df[float_cols] = df[float_cols].astype(float)
+    return df[["open_time", "symbol", "open", "high", "low", "close", "volume"]]
+
+
+def _synthetic_pages(n_rows, page_size=1000, start_ms=1751328000000):
+    """Pages shaped like the JSON Binance returns, generated lazily like network reads."""
+    for lo in range(0, n_rows, page_size):
+        page = []
+        for i in range(lo, min(lo + page_size, n_rows)):
+            t = start_ms + i * 60_000
+            # Distinct string objects per row, as json.loads produces them
+            p = 107000 + (i % 997) / 100
+            page.append([t, f"{p:.8f}", f"{p + 50:.8f}", f"{p - 50:.8f}", f"{p + 10:.8f}",
+                         f"{12 + i % 89 / 7:.8f}", t + 59_999, f"{1320000 + i % 991 / 3:.8f}",
+                         1234 + i % 50, f"{6 + i % 83 / 11:.8f}", f"{660000 + i % 977 / 9:.8f}", "0"])
+        yield page
+
+
+def compare_peak_memory(n_rows=130_000):
+    """Report tracemalloc peak of the old list-of-lists path vs the accumulator."""
+    import tracemalloc
+
+    tracemalloc.start()
+    rows = []
+    for page in _synthetic_pages(n_rows):
+        rows += page
+    legacy = _legacy_to_frame(rows, "BTCUSDT")
+    del rows
+    _, legacy_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    legacy_size = legacy.memory_usage(deep=True).sum()
+    del legacy
+
+    tracemalloc.start()
+    acc = KlineAccumulator(capacity=n_rows)
+    for page in _synthetic_pages(n_rows):
+        acc.append_page(page)
+    typed = acc.to_frame("BTCUSDT")
+    _, typed_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    typed_size = typed.memory_usage(deep=True).sum()
+
+    mb = 1024 * 1024
+    print(f"Rows: {n_rows}")
+    print(f"  list-of-lists : peak {legacy_peak / mb:8.1f} MB, final frame {legacy_size / mb:6.1f} MB (7 columns)")
+    print(f"  accumulator   : peak {typed_peak / mb:8.1f} MB, final frame {typed_size / mb:6.1f} MB (12 columns)")
+    return legacy_peak, typed_peak
+
+
+if __name__ == "__main__":
+    # ~3 months of 1m bars
+    compare_peak_memory(130_000)
@@ -0,0 +1,352 @@
+"""
+Single-pass OHLCV + order book merge.
+
+Replaces the CSV rewrite chain that used to sit at the bottom of
+crawl_btc_data.py (drop `symbol` from both files, drop `timestamp`, normalize
+`snapshot_time`, merge_asof, drop `snapshot_time`, each step re-reading and
+re-writing a full CSV). Here both inputs are read once, only the needed
+columns and with fixed dtypes, timestamps are normalized in memory, the
+backward as-of join runs once and a single typed Parquet file is written.
+
+For inputs that do not fit in RAM (years of bars across a universe),
+chunked_asof_join streams both sides in time order and writes one Parquet
+file per UTC day, with memory bounded by the chunk size.
+
+    python merge_market_data.py btc_ohlcv_1m_2025_Q3.csv btc_orderbook_snapshot_5m_2025_Q3.csv
+    python merge_market_data.py --chunked ohlcv_store/BTCUSDT/1m orderbook.csv merged_by_day/
+    python merge_market_data.py --benchmark
+    python merge_market_data.py --check-chunked
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+OHLCV_COLUMNS = {"open_time": None, "open": "float64", "high": "float64", "low": "float64",
+                 "close": "float64", "volume": "float64"}
+ORDERBOOK_COLUMNS = {"snapshot_time": None, "top_bid_price": "float64", "top_ask_price": "float64",
+                     "spread": "float64", "bid_ask_ratio": "float64"}
+OUTPUT_FILE = "merged_btc_ohlcv_orderbook.parquet"
+
+
+def normalize_time(values):
+    """Any ISO string / datetime column (with or without offset) -> naive UTC datetime64[ms], whole seconds."""
+    ts = pd.to_datetime(values, utc=True, format="ISO8601")
+    return ts.dt.tz_localize(None).dt.floor("s").astype("datetime64[ms]")
+
+
+def read_columns(path, columns):
+    """Read only `columns` (name -> dtype, None for timestamps) from a CSV or Parquet file."""
+    names = list(columns)
+    if path.endswith(".parquet"):
+        df = pd.read_parquet(path, columns=names)
+    else:
+        dtypes = {name: dtype for name, dtype in columns.items() if dtype}
+        df = pd.read_csv(path, usecols=names, dtype=dtypes, engine="pyarrow")
+    return df[names]
+
+
+def merge_ohlcv_orderbook(ohlcv_path, orderbook_path, output_path=OUTPUT_FILE,
+                          ohlcv_columns=OHLCV_COLUMNS, orderbook_columns=ORDERBOOK_COLUMNS):
+    """
+    Attach to every OHLCV bar the latest order book snapshot at or before its
+    open_time and write one Parquet file. Returns (merged frame, report dict).
+    """
+    started = time.perf_counter()
+
+    ohlcv = read_columns(ohlcv_path, ohlcv_columns)
+    ohlcv["open_time"] = normalize_time(ohlcv["open_time"])
+    orderbook = read_columns(orderbook_path, orderbook_columns)
+    orderbook["snapshot_time"] = normalize_time(orderbook["snapshot_time"])
+
+    merged = pd.merge_asof(
+        ohlcv.sort_values("open_time", kind="stable"),
+        orderbook.sort_values("snapshot_time", kind="stable"),
+        left_on="open_time",
+        right_on="snapshot_time",
+        direction="backward",  # snapshot gần nhất trước đó (hoặc đúng bằng open_time)
+    ).drop(columns=["snapshot_time"])
+
+    merged.to_parquet(output_path, index=False)
+    report = {
+        "rows": len(merged),
+        "seconds": time.perf_counter() - started,
+        "bytes_read": os.path.getsize(ohlcv_path) + os.path.getsize(orderbook_path),
+        "bytes_written": os.path.getsize(output_path),
+    }
+    return merged, report
+
+
+# ----------------------------------------------------------------------
+# Out-of-core join
+# ----------------------------------------------------------------------
+def iter_chunks(source, columns, time_col, chunk_rows=500_000):
+    """
+    Yield frames of at most `chunk_rows` rows with `columns` only and
+    `time_col` normalized, from a CSV file, a Parquet file or a folder of
+    Parquet partitions (read in file-name order, e.g. an OHLCVStore day folder).
+    """
+    import pyarrow.parquet as pq
+
+    names = list(columns)
+    if os.path.isdir(source):
+        files = [os.path.join(source, f) for f in sorted(os.listdir(source)) if f.endswith(".parquet")]
+    else:
+        files = [source]
+
+    for path in files:
+        if path.endswith(".parquet"):
+            batches = (b.to_pandas() for b in pq.ParquetFile(path).iter_batches(batch_size=chunk_rows, columns=names))
+        else:
+            dtypes = {name: dtype for name, dtype in columns.items() if dtype}
+            batches = pd.read_csv(path, usecols=names, dtype=dtypes, chunksize=chunk_rows)
+        for chunk in batches:
+            chunk = chunk[names]
+            chunk[time_col] = normalize_time(chunk[time_col])
+            yield chunk
+
+
+class DayPartitionWriter:
+    """Appends time-ordered frames to <root>/<YYYY-MM-DD>.parquet, one open file at a time."""
+
+    def __init__(self, root, time_col):
+        self.root = root
+        self.time_col = time_col
+        self.day = None
+        self.writer = None
+        self.schema = None
+        self.rows = 0
+        self.files = []
+        os.makedirs(root, exist_ok=True)
+
+    def write(self, df):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        days = df[self.time_col].dt.strftime("%Y-%m-%d").to_numpy()
+        # Rows are time ordered, so each day is one contiguous slice
+        bounds = np.flatnonzero(days[1:] != days[:-1]) + 1
+        for lo, hi in zip(np.r_[0, bounds], np.r_[bounds, len(df)]):
+            if lo == hi:
+                continue
+            day = days[lo]
+            if day != self.day:
+                self.close()
+                self.day = day
+                path = os.path.join(self.root, f"{day}.parquet")
+                self.files.append(path)
+                self.writer = None
+            table = pa.Table.from_pandas(df.iloc[lo:hi], preserve_index=False)
+            if self.schema is None:
+                self.schema = table.schema
+            if self.writer is None:
+                self.writer = pq.ParquetWriter(self.files[-1], self.schema)
+            self.writer.write_table(table.cast(self.schema))
+            self.rows += hi - lo
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            self.writer = None
+
+
+def chunked_asof_join(left_chunks, right_chunks, output_dir, left_on="open_time", right_on="snapshot_time",
+                      tolerance=None, drop_right_key=True):
+    """
+    Backward as-of join of two time-ordered chunk streams, written per day.
+
+    For each left chunk, right chunks are pulled until the right side passes
+    the chunk's last key; after the join only the right rows still ahead of
+    that key are kept, plus the last row at or before it, which is carried
+    into the next chunk (it is what the first rows there match against).
+    Memory is bounded by one left chunk, the right rows inside its time span
+    and one right chunk ahead, whatever the total size of either side.
+    """
+    right_iter = iter(right_chunks)
+    buffer = None         # carried row + right rows not yet passed by the left side
+    right_done = False
+    last_left = None
+    writer = DayPartitionWriter(output_dir, left_on)
+    started = time.perf_counter()
+
+    for left in left_chunks:
+        if left.empty:
+            continue
+        keys = left[left_on]
+        if not keys.is_monotonic_increasing or (last_left is not None and keys.iloc[0] < last_left):
+            raise ValueError(f"Left side is not sorted on {left_on}")
+        last_left = keys.iloc[-1]
+
+        while not right_done and (buffer is None or buffer.empty or buffer[right_on].iloc[-1] <= last_left):
+            try:
+                chunk = next(right_iter)
+            except StopIteration:
+                right_done = True
+                break
+            if buffer is not None and not buffer.empty and chunk[right_on].iloc[0] < buffer[right_on].iloc[-1]:
+                raise ValueError(f"Right side is not sorted on {right_on}")
+            buffer = chunk if buffer is None else pd.concat([buffer, chunk], ignore_index=True)
+
+        if buffer is None:
+            # Right side is empty: nothing to attach
+            writer.write(left)
+            continue
+        merged = pd.merge_asof(left, buffer, left_on=left_on, right_on=right_on,
+                               direction="backward", tolerance=tolerance)
+        if drop_right_key:
+            merged = merged.drop(columns=[right_on])
+        writer.write(merged)
+
+        if buffer is not None and not buffer.empty:
+            passed = int(np.searchsorted(buffer[right_on].to_numpy(), np.datetime64(last_left), side="right"))
+            buffer = buffer.iloc[max(passed - 1, 0):].reset_index(drop=True)
+
+    writer.close()
+    return {"rows": writer.rows, "files": writer.files, "seconds": time.perf_counter() - started}
+
+
+def check_chunked(n_minutes=130_000, left_chunk=7_777, right_chunk=1_234):
+    """Chunked join vs in-memory merge_asof on the same inputs: rows, values and peak memory."""
+    import tracemalloc
+
+    folder = tempfile.mkdtemp(prefix="asof_check_")
+    try:
+        ohlcv_csv, orderbook_csv = _synthetic_inputs(folder, n_minutes)
+        out_dir = os.path.join(folder, "merged_by_day")
+
+        tracemalloc.start()
+        expected, _ = merge_ohlcv_orderbook(ohlcv_csv, orderbook_csv, os.path.join(folder, OUTPUT_FILE))
+        _, memory_peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        tracemalloc.start()
+        report = chunked_asof_join(iter_chunks(ohlcv_csv, OHLCV_COLUMNS, "open_time", left_chunk),
+                                   iter_chunks(orderbook_csv, ORDERBOOK_COLUMNS, "snapshot_time", right_chunk),
+                                   out_dir)
+        _, chunked_peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        got = pd.concat([pd.read_parquet(f) for f in report["files"]], ignore_index=True)
+        pd.testing.assert_frame_equal(got, expected.reset_index(drop=True))
+
+        mb = 1024 * 1024
+        print(f"Rows: {report['rows']} in {len(report['files'])} day files")
+        print(f"  in-memory : peak {memory_peak / mb:6.1f} MB")
+        print(f"  chunked   : peak {chunked_peak / mb:6.1f} MB (chunks of {left_chunk} / {right_chunk} rows), "
+              f"{report['seconds']:.2f}s")
+        print("✅ Chunked join matches the in-memory merge_asof row for row")
+    finally:
+        shutil.rmtree(folder, ignore_errors=True)
+
+
+# ----------------------------------------------------------------------
+# Comparison with the old CSV chain
+# ----------------------------------------------------------------------
+def _legacy_chain(ohlcv_csv, orderbook_csv, workdir):
+    """The five rewrite steps crawl_btc_data.py used to run, with their I/O counted."""
+    io = {"read": 0, "written": 0}
+
+    def read(path, **kwargs):
+        io["read"] += os.path.getsize(path)
+        return pd.read_csv(path, **kwargs)
+
+    def write(df, path):
+        df.to_csv(path, index=False)
+        io["written"] += os.path.getsize(path)
+
+    started = time.perf_counter()
+    ohlcv_new = os.path.join(workdir, "btc_ohlcv_new.csv")
+    orderbook_new = os.path.join(workdir, "btc_orderbook_new.csv")
+    merged_csv = os.path.join(workdir, "merged_btc_ohlcv_orderbook_new.csv")
+    official = os.path.join(workdir, "merged_btc_ohlcv_orderbook_official_new.csv")
+
+    df = read(orderbook_csv)
+    write(df.drop(columns=["timestamp"]), orderbook_csv)
+    df = read(orderbook_csv)
+    df["snapshot_time"] = pd.to_datetime(df["snapshot_time"]).dt.strftime("%Y-%m-%d %H:%M:%S")
+    write(df, orderbook_csv)
+    write(read(ohlcv_csv).drop(columns=["symbol"]), ohlcv_new)
+    write(read(orderbook_csv).drop(columns=["symbol"]), orderbook_new)
+
+    ohlcv = read(ohlcv_new, parse_dates=["open_time"])
+    orderbook = read(orderbook_new, parse_dates=["snapshot_time"])
+    merged = pd.merge_asof(ohlcv.sort_values("open_time"), orderbook.sort_values("snapshot_time"),
+                           left_on="open_time", right_on="snapshot_time", direction="backward")
+    write(merged, merged_csv)
+    write(read(merged_csv).drop(columns=["snapshot_time"]), official)
+    return official, time.perf_counter() - started, io
+
+
+def _synthetic_inputs(folder, n_minutes, freq_minutes=5, start="2025-07-01"):
+    """CSV files shaped like the crawler outputs (12-field OHLCV, 5m snapshots)."""
+    rng = np.random.default_rng(0)
+    open_time = pd.date_range(start, periods=n_minutes, freq="1min")
+    close = 100000 + np.cumsum(rng.normal(0, 20, n_minutes))
+    ohlcv = pd.DataFrame({
+        "open_time": open_time, "symbol": "BTCUSDT", "open": close - 3, "high": close + 15,
+        "low": close - 15, "close": close, "volume": rng.uniform(1, 50, n_minutes),
+        "close_time": open_time.astype("int64") // 10**6 + 59_999,
+        "quote_asset_volume": rng.uniform(1e5, 5e6, n_minutes), "num_trades": rng.integers(100, 5000, n_minutes),
+        "taker_buy_base": rng.uniform(0, 25, n_minutes), "taker_buy_quote": rng.uniform(5e4, 2.5e6, n_minutes),
+    })
+
+    snaps = pd.date_range(start, periods=n_minutes // freq_minutes, freq=f"{freq_minutes}min", tz="UTC")
+    bid = 100000 + np.cumsum(rng.normal(0, 40, len(snaps)))
+    orderbook = pd.DataFrame({
+        "timestamp": pd.Timestamp.now(tz="UTC") + pd.to_timedelta(np.arange(len(snaps)) * 500, unit="ms"),
+        "symbol": "BTCUSDT", "top_bid_price": bid, "top_ask_price": bid + 0.01, "spread": 0.01,
+        "bid_ask_ratio": rng.uniform(0.01, 20, len(snaps)), "snapshot_time": snaps,
+    })
+
+    ohlcv_csv = os.path.join(folder, "btc_ohlcv_1m.csv")
+    orderbook_csv = os.path.join(folder, "btc_orderbook_snapshot_5m.csv")
+    ohlcv.to_csv(ohlcv_csv, index=False)
+    orderbook.to_csv(orderbook_csv, index=False)
+    return ohlcv_csv, orderbook_csv
+
+
+def benchmark(n_minutes=130_000):
+    folder = tempfile.mkdtemp(prefix="merge_bench_")
+    try:
+        ohlcv_csv, orderbook_csv = _synthetic_inputs(folder, n_minutes)
+        merged, report = merge_ohlcv_orderbook(ohlcv_csv, orderbook_csv, os.path.join(folder, OUTPUT_FILE))
+        official, legacy_seconds, legacy_io = _legacy_chain(ohlcv_csv, orderbook_csv, folder)
+
+        legacy = pd.read_csv(official, parse_dates=["open_time"])[merged.columns]
+        legacy["open_time"] = legacy["open_time"].astype("datetime64[ms]")
+        pd.testing.assert_frame_equal(merged.reset_index(drop=True), legacy, check_exact=False)
+
+        mb = 1024 * 1024
+        print(f"Rows: {report['rows']}")
+        print(f"  CSV chain   : {legacy_seconds:6.2f}s, read {legacy_io['read'] / mb:7.1f} MB, "
+              f"written {legacy_io['written'] / mb:7.1f} MB")
+        print(f"  single pass : {report['seconds']:6.2f}s, read {report['bytes_read'] / mb:7.1f} MB, "
+              f"written {report['bytes_written'] / mb:7.1f} MB")
+        print("✅ Same rows and values as the CSV chain")
+    finally:
+        shutil.rmtree(folder, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    if sys.argv[1:2] == ["--benchmark"]:
+        benchmark()
+    elif sys.argv[1:2] == ["--check-chunked"]:
+        check_chunked()
+    elif sys.argv[1:2] == ["--chunked"] and len(sys.argv) >= 5:
+        report = chunked_asof_join(iter_chunks(sys.argv[2], OHLCV_COLUMNS, "open_time"),
+                                   iter_chunks(sys.argv[3], ORDERBOOK_COLUMNS, "snapshot_time"),
+                                   sys.argv[4])
+        print(f"✅ {report['rows']} rows -> {len(report['files'])} day files in {sys.argv[4]} "
+              f"({report['seconds']:.2f}s)")
+    elif len(sys.argv) >= 3:
+        output = sys.argv[3] if len(sys.argv) > 3 else OUTPUT_FILE
+        _, report = merge_ohlcv_orderbook(sys.argv[1], sys.argv[2], output)
+        print(f"✅ {report['rows']} rows -> {output} in {report['seconds']:.2f}s "
+              f"(read {report['bytes_read']:,} B, wrote {report['bytes_written']:,} B)")
+    else:
+        print(__doc__)
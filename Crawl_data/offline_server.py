@@ -0,0 +1,477 @@
+"""
+Local stand-in for the Binance REST API and the twitterapi.io search endpoint.
+
+Serves /api/v3/klines, /api/v3/depth, /api/v3/time and the advanced_search
+endpoint, keeps a per-window REQUEST_WEIGHT counter, reports it in
+X-MBX-USED-WEIGHT-1M and answers 429 + Retry-After once the limit is
+exceeded, like the exchange.
+Point a BinanceClient (or crawl_x_data.BASE_URL) at `server.base_url` to
+measure the crawlers without network access.
+
+Responses are replayed from recorded fixtures when they exist:
+    <fixtures>/klines_<SYMBOL>_<interval>.jsonl   one kline row per line
+    <fixtures>/depth_<SYMBOL>.jsonl               one depth response per line
+    Sample_data/tweets_sentiment_roberta.csv      tweets, paged 20 at a time
+and generated deterministically otherwise. Faults can be injected: fixed
+latency, bursts of 429 and truncated (malformed) JSON bodies.
+SyntheticDepthFeed stands in for the diff-depth websocket stream.
+
+    python offline_server.py                     # BinanceClient throughput/backoff
+    python offline_server.py serve 8765          # run until Ctrl+C
+    python offline_server.py record BTCUSDT 2025-07-01 2025-07-02   # needs network
+"""
+
+import bisect
+import csv
+import json
+import math
+import os
+import re
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from binance_client import depth_weight
+
+KLINES_WEIGHT = 2
+INTERVAL_MS = {"1m": 60_000, "5m": 300_000, "15m": 900_000, "1h": 3_600_000, "1d": 86_400_000}
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+FIXTURES_DIR = os.path.join(HERE, "..", "Sample_data", "api_fixtures")
+SAMPLE_TWEETS_CSV = os.path.join(HERE, "..", "Sample_data", "tweets_sentiment_roberta.csv")
+SEARCH_PATH = "/twitter/tweet/advanced_search"
+TWEETS_PER_PAGE = 20  # twitterapi.io page size
+TWITTER_TIME_FORMAT = "%a %b %d %H:%M:%S %z %Y"
+
+
+def synthetic_kline(open_ms, interval_ms):
+    """Deterministic kline row (Binance field order, decimals as strings)."""
+    i = open_ms // interval_ms
+    price = 100000 + 2000 * math.sin(i / 500) + (i % 17)
+    volume = 10 + (i % 31)
+    return [open_ms, f"{price:.2f}", f"{price + 15:.2f}", f"{price - 15:.2f}", f"{price + 3:.2f}",
+            f"{volume:.5f}", open_ms + interval_ms - 1, f"{price * volume:.4f}", 100 + i % 50,
+            f"{volume / 2:.5f}", f"{price * volume / 2:.4f}", "0"]
+
+
+def synthetic_depth(limit, now_ms):
+    mid = 100000 + 2000 * math.sin(now_ms / 60_000 / 500)
+    bids = [[f"{mid - 0.5 - k:.2f}", f"{1 + (k % 7) / 3:.5f}"] for k in range(limit)]
+    asks = [[f"{mid + 0.5 + k:.2f}", f"{1 + (k % 5) / 3:.5f}"] for k in range(limit)]
+    return {"lastUpdateId": now_ms, "bids": bids, "asks": asks}
+
+
+def _read_jsonl(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def _sample_tweets(path):
+    """Tweets of the sample CSV as advanced_search dicts, sorted by creation time."""
+    with open(path, "r", encoding="utf-8-sig", newline="") as f:
+        rows = list(csv.DictReader(f))
+    tweets = []
+    for i, row in enumerate(rows):
+        created_ms = int(datetime.strptime(row["created_at"], TWITTER_TIME_FORMAT).timestamp() * 1000)
+        tweets.append((created_ms, {
+            # The sample keeps no ids or counters; derive stable ones
+            "id": str((created_ms - 1288834974657) << 22 | i),
+            "createdAt": row["created_at"],
+            "text": row["content"],
+            "lang": "en",
+            "likeCount": i % 40, "retweetCount": i % 7, "replyCount": i % 5, "quoteCount": i % 3,
+            "author": {"id": str(1000 + i % 257), "userName": f"user{i % 257}", "followers": 50 * (i % 311)},
+        }))
+    tweets.sort(key=lambda t: t[0])
+    return tweets
+
+
+class Fixtures:
+    """Recorded responses, loaded once and indexed for pagination."""
+
+    def __init__(self, fixtures_dir=FIXTURES_DIR, tweets_csv=SAMPLE_TWEETS_CSV):
+        self.klines = {}   # (SYMBOL, interval) -> (open_times, rows)
+        self.depth = {}    # SYMBOL -> [depth responses]
+        self.tweets = []   # [(created_ms, tweet)] sorted
+        self.tweet_times = []
+
+        if fixtures_dir and os.path.isdir(fixtures_dir):
+            for name in sorted(os.listdir(fixtures_dir)):
+                path = os.path.join(fixtures_dir, name)
+                m = re.match(r"klines_([A-Z0-9]+)_(\w+)\.jsonl$", name)
+                if m:
+                    rows = sorted(_read_jsonl(path), key=lambda r: r[0])
+                    self.klines[(m.group(1), m.group(2))] = ([r[0] for r in rows], rows)
+                m = re.match(r"depth_([A-Z0-9]+)\.jsonl$", name)
+                if m:
+                    self.depth[m.group(1)] = _read_jsonl(path)
+
+        if tweets_csv and os.path.exists(tweets_csv):
+            self.tweets = _sample_tweets(tweets_csv)
+            self.tweet_times = [t for t, _ in self.tweets]
+
+    def klines_page(self, symbol, interval, start_ms, end_ms, limit):
+        """Rows with open_time in [start_ms, end_ms], at most `limit` (both bounds inclusive)."""
+        recorded = self.klines.get((symbol, interval))
+        if recorded:
+            times, rows = recorded
+            lo = bisect.bisect_left(times, start_ms)
+            hi = bisect.bisect_right(times, end_ms)
+            return rows[lo:min(hi, lo + limit)]
+        interval_ms = INTERVAL_MS[interval]
+        start = -(-start_ms // interval_ms) * interval_ms
+        last = min(end_ms, start + (limit - 1) * interval_ms)
+        return [synthetic_kline(t, interval_ms) for t in range(start, last + 1, interval_ms)]
+
+    def depth_snapshot(self, symbol, limit, n):
+        recorded = self.depth.get(symbol)
+        if recorded:
+            snap = recorded[n % len(recorded)]
+            return {"lastUpdateId": snap["lastUpdateId"], "bids": snap["bids"][:limit], "asks": snap["asks"][:limit]}
+        return synthetic_depth(limit, int(time.time() * 1000))
+
+    def tweets_between(self, since_ms, until_ms):
+        """Tweets created in [since_ms, until_ms), newest first like queryType=Latest."""
+        lo = bisect.bisect_left(self.tweet_times, since_ms)
+        hi = bisect.bisect_left(self.tweet_times, until_ms)
+        return [t for _, t in reversed(self.tweets[lo:hi])]
+
+
+def parse_search_window(query):
+    """since:/until: bounds of a search query, as YYYY-MM-DD or YYYY-MM-DD_HH:MM:SS_UTC."""
+    def bound(tag, default):
+        m = re.search(tag + r":(\d{4}-\d{2}-\d{2})(?:_(\d{2}:\d{2}:\d{2})_UTC)?", query)
+        if not m:
+            return default
+        dt = datetime.strptime(f"{m.group(1)} {m.group(2) or '00:00:00'}", "%Y-%m-%d %H:%M:%S")
+        return int(dt.replace(tzinfo=timezone.utc).timestamp() * 1000)
+
+    return bound("since", 0), bound("until", int(time.time() * 1000))
+
+
+class SyntheticDepthFeed:
+    """
+    Stand-in diff-depth stream (the @depth@100ms websocket payloads).
+
+    Keeps a true book in integer ticks, mutates it with random level changes
+    around a drifting mid and emits Binance depthUpdate events
+    {"e", "E", "s", "U", "u", "b", "a"}. `snapshot()` returns the true book
+    at the current update id like /api/v3/depth. With `drop_every` set, every
+    n-th event is applied but not emitted, which is a sequence gap.
+    """
+
+    def __init__(self, symbol="BTCUSDT", levels=500, tick=0.01, mid_price=100000.0, seed=0,
+                 start_ms=1751328000000, events_per_second=1000, changes_per_event=8, drop_every=0):
+        import random
+
+        self.symbol = symbol
+        self.tick = tick
+        self.decimals = max(0, -int(math.floor(math.log10(tick))))
+        self.rng = random.Random(seed)
+        self.mid = int(round(mid_price / tick))
+        self.event_ms = start_ms
+        self.step_ms = 1000 / events_per_second
+        self.changes_per_event = changes_per_event
+        self.drop_every = drop_every
+        self.update_id = 1_000_000
+        self.emitted = 0
+        self.dropped = 0
+        self.bids = {self.mid - k: self._qty() for k in range(1, levels + 1)}
+        self.asks = {self.mid + k: self._qty() for k in range(1, levels + 1)}
+
+    def _qty(self):
+        return round(self.rng.expovariate(1.0), 5)
+
+    def _fmt(self, ticks):
+        return f"{ticks * self.tick:.{self.decimals}f}"
+
+    def _next_event(self):
+        rng = self.rng
+        changes = {"b": {}, "a": {}}
+
+        # Mid drifts one tick now and then; the crossed level on that side is removed
+        r = rng.random()
+        if r < 0.05:
+            self.mid += 1
+            if self.mid in self.asks:
+                del self.asks[self.mid]
+                changes["a"][self.mid] = 0.0
+        elif r < 0.10:
+            self.mid -= 1
+            if self.mid in self.bids:
+                del self.bids[self.mid]
+                changes["b"][self.mid] = 0.0
+
+        for _ in range(self.changes_per_event):
+            side = "b" if rng.random() < 0.5 else "a"
+            book = self.bids if side == "b" else self.asks
+            # Most activity sits near the top of the book
+            k = 1 + int(rng.expovariate(0.05))
+            price = self.mid - k if side == "b" else self.mid + k
+            qty = 0.0 if rng.random() < 0.3 else self._qty()
+            if qty == 0.0:
+                book.pop(price, None)
+            else:
+                book[price] = qty
+            changes[side][price] = qty
+
+        first = self.update_id + 1
+        self.update_id += max(1, len(changes["b"]) + len(changes["a"]))
+        self.event_ms += self.step_ms
+        return {
+            "e": "depthUpdate", "E": int(self.event_ms), "s": self.symbol,
+            "U": first, "u": self.update_id,
+            "b": [[self._fmt(p), f"{q:.5f}"] for p, q in changes["b"].items()],
+            "a": [[self._fmt(p), f"{q:.5f}"] for p, q in changes["a"].items()],
+        }
+
+    def events(self, n):
+        """Yield the next `n` emitted events (dropped ones are not counted)."""
+        while n > 0:
+            event = self._next_event()
+            if self.drop_every and (self.emitted + self.dropped + 1) % self.drop_every == 0:
+                self.dropped += 1
+                continue
+            self.emitted += 1
+            n -= 1
+            yield event
+
+    def snapshot(self, limit=1000):
+        bids = sorted(self.bids.items(), reverse=True)[:limit]
+        asks = sorted(self.asks.items())[:limit]
+        return {"lastUpdateId": self.update_id,
+                "bids": [[self._fmt(p), f"{q:.5f}"] for p, q in bids],
+                "asks": [[self._fmt(p), f"{q:.5f}"] for p, q in asks]}
+
+
+class StandInState:
+    """Shared server state: weight window, injected faults, fixtures and counters."""
+
+    def __init__(self, weight_limit=6000, window_seconds=60, latency=0.0, retry_after=1,
+                 burst_every=0, burst_length=0, malformed_every=0, fixtures=None):
+        self.weight_limit = weight_limit
+        self.window_seconds = window_seconds
+        self.latency = latency
+        self.retry_after = retry_after
+        # Of every `burst_every` requests the last `burst_length` get a 429
+        self.burst_every = burst_every
+        self.burst_length = burst_length
+        # Every `malformed_every`-th request gets a truncated JSON body
+        self.malformed_every = malformed_every
+        self.fixtures = fixtures if fixtures is not None else Fixtures()
+
+        self.lock = threading.Lock()
+        self.window = None
+        self.used_weight = 0
+        self.request_no = 0
+        self.counts = {"ok": 0, "rate_limited": 0, "injected_429": 0, "malformed": 0}
+
+    def next_fault(self):
+        """Count the request and decide whether it gets an injected fault."""
+        with self.lock:
+            self.request_no += 1
+            n = self.request_no
+            if self.burst_every and (n - 1) % self.burst_every >= self.burst_every - self.burst_length:
+                self.counts["injected_429"] += 1
+                return "429"
+            if self.malformed_every and n % self.malformed_every == 0:
+                self.counts["malformed"] += 1
+                return "malformed"
+            return None
+
+    def charge(self, weight):
+        """Add `weight` to the current window; return (allowed, used_weight)."""
+        with self.lock:
+            window = int(time.time() // self.window_seconds)
+            if window != self.window:
+                self.window = window
+                self.used_weight = 0
+            self.used_weight += weight
+            allowed = self.used_weight <= self.weight_limit
+            self.counts["ok" if allowed else "rate_limited"] += 1
+            return allowed, self.used_weight
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, so pooled sessions are exercised
+    disable_nagle_algorithm = True  # headers and body go out in separate writes
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status, body, headers=None, truncate=False):
+        payload = json.dumps(body).encode()
+        if truncate:
+            payload = payload[:len(payload) // 2]
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, str(value))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_GET(self):
+        state = self.server.state
+        url = urlparse(self.path)
+        params = {k: v[0] for k, v in parse_qs(url.query).items()}
+
+        if url.path == "/api/v3/klines":
+            weight = KLINES_WEIGHT
+        elif url.path == "/api/v3/depth":
+            weight = depth_weight(int(params.get("limit", 100)))
+        elif url.path == "/api/v3/time":
+            weight = 1
+        elif url.path == SEARCH_PATH:
+            weight = 0  # twitterapi.io bills per tweet, no weight header
+        else:
+            self._send(404, {"code": -1, "msg": "unknown endpoint"})
+            return
+
+        if state.latency:
+            time.sleep(state.latency)
+
+        fault = state.next_fault()
+        if fault == "429":
+            self._send(429, {"code": -1003, "msg": "Too many requests"}, {"Retry-After": state.retry_after})
+            return
+
+        headers = {}
+        if weight:
+            allowed, used = state.charge(weight)
+            headers["X-MBX-USED-WEIGHT-1M"] = used
+            if not allowed:
+                headers["Retry-After"] = state.retry_after
+                self._send(429, {"code": -1003, "msg": "Too many requests"}, headers)
+                return
+        else:
+            with state.lock:
+                state.counts["ok"] += 1
+
+        if url.path == "/api/v3/klines":
+            body = self._klines(state.fixtures, params)
+        elif url.path == "/api/v3/time":
+            body = {"serverTime": int(time.time() * 1000)}
+        elif url.path == "/api/v3/depth":
+            body = state.fixtures.depth_snapshot(params["symbol"].upper(), int(params.get("limit", 100)),
+                                                 state.request_no)
+        else:
+            body = self._search(state.fixtures, params)
+        self._send(200, body, headers, truncate=fault == "malformed")
+
+    @staticmethod
+    def _klines(fixtures, params):
+        interval = params.get("interval", "1m")
+        limit = min(int(params.get("limit", 500)), 1000)
+        start = int(params.get("startTime", 0))
+        end = int(params.get("endTime", start + limit * INTERVAL_MS[interval]))
+        return fixtures.klines_page(params["symbol"].upper(), interval, start, end, limit)
+
+    @staticmethod
+    def _search(fixtures, params):
+        """advanced_search page; the cursor is the offset into the window's tweets."""
+        since_ms, until_ms = parse_search_window(params.get("query", ""))
+        tweets = fixtures.tweets_between(since_ms, until_ms)
+        offset = int(params.get("cursor") or 0)
+        has_next = offset + TWEETS_PER_PAGE < len(tweets)
+        return {"tweets": tweets[offset:offset + TWEETS_PER_PAGE], "has_next_page": has_next,
+                "next_cursor": str(offset + TWEETS_PER_PAGE) if has_next else ""}
+
+
+class StandInServer:
+    """ThreadingHTTPServer on 127.0.0.1 running in a daemon thread."""
+
+    def __init__(self, port=0, handler=StandInHandler, **state_kwargs):
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", port), handler)
+        self.httpd.daemon_threads = True
+        self.httpd.state = StandInState(**state_kwargs)
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    @property
+    def state(self):
+        return self.httpd.state
+
+    @property
+    def base_url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+def record_fixtures(symbol, start_time, end_time, interval="1m", depth_snapshots=20,
+                    out_dir=FIXTURES_DIR, client=None):
+    """Record live klines for [start_time, end_time] and a few depth snapshots as fixtures."""
+    from binance_client import get_client
+    from crawl_btc_data import _iter_kline_pages, _to_ms
+
+    client = client or get_client()
+    os.makedirs(out_dir, exist_ok=True)
+
+    path = os.path.join(out_dir, f"klines_{symbol}_{interval}.jsonl")
+    rows = 0
+    with open(path, "w", encoding="utf-8") as f:
+        for page in _iter_kline_pages(symbol, interval, _to_ms(start_time), _to_ms(end_time), client):
+            f.writelines(json.dumps(row) + "\n" for row in page)
+            rows += len(page)
+    print(f"💾 {rows} klines -> {path}")
+
+    path = os.path.join(out_dir, f"depth_{symbol}.jsonl")
+    with open(path, "w", encoding="utf-8") as f:
+        for _ in range(depth_snapshots):
+            snap = client.get("/api/v3/depth", {"symbol": symbol, "limit": 100}, weight=depth_weight(100))
+            f.write(json.dumps(snap) + "\n")
+            time.sleep(1)
+    print(f"💾 {depth_snapshots} depth snapshots -> {path}")
+
+
+def measure_client(n_requests=400, workers=8, weight_limit=600, window_seconds=2, latency=0.005):
+    """
+    Hammer the stand-in with a BinanceClient and report throughput and backoff.
+
+    A small weight limit and a short window make the limiter bite within seconds.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+    from binance_client import BinanceClient
+
+    with StandInServer(weight_limit=weight_limit, window_seconds=window_seconds, latency=latency) as server:
+        client = BinanceClient(base_url=server.base_url, weight_limit=weight_limit,
+                               window_seconds=window_seconds, pool_size=workers)
+        params = {"symbol": "BTCUSDT", "interval": "1m", "startTime": 1751328000000, "limit": 50}
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            list(pool.map(lambda _: client.get("/api/v3/klines", params, weight=KLINES_WEIGHT),
+                          range(n_requests)))
+        elapsed = time.perf_counter() - started
+
+        ceiling = weight_limit / KLINES_WEIGHT / window_seconds
+        print(f"{n_requests} requests with {workers} workers in {elapsed:.2f}s "
+              f"-> {n_requests / elapsed:.1f} req/s (server ceiling {ceiling:.1f} req/s)")
+        print(f"client stats: {client.stats}")
+        print(f"server counts: {server.state.counts}")
+        client.close()
+
+
+if __name__ == "__main__":
+    if sys.argv[1:2] == ["serve"]:
+        with StandInServer(port=int(sys.argv[2]) if len(sys.argv) > 2 else 8765) as server:
+            print(f"🌐 Stand-in API on {server.base_url} (Ctrl+C to stop)")
+            try:
+                server.thread.join()
+            except KeyboardInterrupt:
+                pass
+    elif sys.argv[1:2] == ["record"]:
+        day = lambda s: datetime.strptime(s, "%Y-%m-%d").replace(tzinfo=timezone.utc)
+        record_fixtures(sys.argv[2], day(sys.argv[3]), day(sys.argv[4]))
+    else:
+        measure_client()
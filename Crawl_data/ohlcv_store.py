@@ -0,0 +1,163 @@
+"""
+Resumable on-disk OHLCV store.
+
+Layout:
+    <root>/<SYMBOL>/<interval>/<YYYY-MM-DD>.parquet   one file per symbol and UTC day
+    <root>/manifest.json                               fetched ranges per SYMBOL/interval
+
+The manifest records which [start_ms, end_ms] ranges of open_time have already
+been requested from the exchange, so a new crawl only asks for the gaps. The
+coverage bitmap is computed from the rows actually on disk, so minutes the
+exchange never traded show up as missing without being refetched forever.
+"""
+
+import json
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+def merge_ranges(ranges, step_ms):
+    """Merge inclusive [lo, hi] ranges that overlap or touch (hi + step == next lo)."""
+    merged = []
+    for lo, hi in sorted(ranges):
+        if merged and lo <= merged[-1][1] + step_ms:
+            merged[-1][1] = max(merged[-1][1], hi)
+        else:
+            merged.append([lo, hi])
+    return merged
+
+
+def subtract_ranges(lo, hi, held, step_ms):
+    """Return the parts of [lo, hi] not covered by the merged `held` ranges."""
+    gaps = []
+    cursor = lo
+    for h_lo, h_hi in held:
+        if h_hi < cursor or h_lo > hi:
+            continue
+        if h_lo > cursor:
+            gaps.append((cursor, h_lo - step_ms))
+        cursor = max(cursor, h_hi + step_ms)
+        if cursor > hi:
+            break
+    if cursor <= hi:
+        gaps.append((cursor, hi))
+    return gaps
+
+
+def _atomic_write_json(path, obj):
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(obj, f, indent=2)
+    os.replace(tmp, path)
+
+
+class OHLCVStore:
+    """Day-partitioned Parquet store with a manifest of fetched ranges."""
+
+    def __init__(self, root="ohlcv_store"):
+        self.root = root
+        self.manifest_path = os.path.join(root, "manifest.json")
+        os.makedirs(root, exist_ok=True)
+
+        # Workers crawling different symbols share one manifest file
+        self.lock = threading.Lock()
+        self.manifest = {}
+        if os.path.exists(self.manifest_path):
+            with open(self.manifest_path, "r", encoding="utf-8") as f:
+                self.manifest = json.load(f)
+
+    @staticmethod
+    def _key(symbol, interval):
+        return f"{symbol.upper()}/{interval}"
+
+    def partition_dir(self, symbol, interval):
+        return os.path.join(self.root, symbol.upper(), interval)
+
+    def partition_path(self, symbol, interval, day):
+        return os.path.join(self.partition_dir(symbol, interval), f"{day}.parquet")
+
+    # ------------------------------------------------------------------
+    # Manifest
+    # ------------------------------------------------------------------
+    def held_ranges(self, symbol, interval):
+        with self.lock:
+            return [tuple(r) for r in self.manifest.get(self._key(symbol, interval), [])]
+
+    def mark_fetched(self, symbol, interval, lo_ms, hi_ms, step_ms):
+        key = self._key(symbol, interval)
+        with self.lock:
+            ranges = self.manifest.get(key, []) + [[lo_ms, hi_ms]]
+            self.manifest[key] = merge_ranges(ranges, step_ms)
+            _atomic_write_json(self.manifest_path, self.manifest)
+
+    def missing_ranges(self, symbol, interval, start_ms, end_ms, step_ms):
+        """Inclusive [lo, hi] open_time ranges inside [start_ms, end_ms] not fetched yet."""
+        return subtract_ranges(start_ms, end_ms, self.held_ranges(symbol, interval), step_ms)
+
+    # ------------------------------------------------------------------
+    # Data
+    # ------------------------------------------------------------------
+    def write_page(self, symbol, interval, df):
+        """
+        Merge one page of klines into its day partitions.
+
+        `df` must have a datetime64 `open_time` column. Rows already on disk are
+        replaced by the new ones (keep="last"), so a re-fetched open candle wins.
+        """
+        if df.empty:
+            return
+        os.makedirs(self.partition_dir(symbol, interval), exist_ok=True)
+
+        days = df["open_time"].dt.strftime("%Y-%m-%d")
+        for day, part in df.groupby(days, sort=False):
+            path = self.partition_path(symbol, interval, day)
+            if os.path.exists(path):
+                part = pd.concat([pd.read_parquet(path), part], ignore_index=True)
+            part = (part.drop_duplicates(subset="open_time", keep="last")
+                        .sort_values("open_time")
+                        .reset_index(drop=True))
+            tmp = f"{path}.tmp"
+            part.to_parquet(tmp, index=False)
+            os.replace(tmp, path)
+
+    def read(self, symbol, interval, start_ms=None, end_ms=None, columns=None):
+        """Load the stored rows with open_time in [start_ms, end_ms] as one sorted frame."""
+        folder = self.partition_dir(symbol, interval)
+        if not os.path.isdir(folder):
+            return pd.DataFrame()
+
+        files = sorted(f for f in os.listdir(folder) if f.endswith(".parquet"))
+        if start_ms is not None:
+            first_day = pd.to_datetime(start_ms, unit="ms").strftime("%Y-%m-%d")
+            files = [f for f in files if f[:10] >= first_day]
+        if end_ms is not None:
+            last_day = pd.to_datetime(end_ms, unit="ms").strftime("%Y-%m-%d")
+            files = [f for f in files if f[:10] <= last_day]
+        if not files:
+            return pd.DataFrame()
+
+        df = pd.concat([pd.read_parquet(os.path.join(folder, f), columns=columns) for f in files],
+                       ignore_index=True)
+        ts = df["open_time"].astype("datetime64[ms]").astype("int64")
+        mask = np.ones(len(df), dtype=bool)
+        if start_ms is not None:
+            mask &= ts.to_numpy() >= start_ms
+        if end_ms is not None:
+            mask &= ts.to_numpy() <= end_ms
+        return df[mask].reset_index(drop=True)
+
+    def coverage_bitmap(self, symbol, interval, start_ms, end_ms, step_ms):
+        """
+        Boolean array with one entry per bar in [start_ms, end_ms]:
+        True where no row is stored for that open_time.
+        """
+        n_bars = (end_ms - start_ms) // step_ms + 1
+        missing = np.ones(n_bars, dtype=bool)
+
+        df = self.read(symbol, interval, start_ms, end_ms, columns=["open_time"])
+        if not df.empty:
+            ts = df["open_time"].astype("datetime64[ms]").astype("int64").to_numpy()
+            missing[(ts - start_ms) // step_ms] = False
+        return missing
@@ -0,0 +1,241 @@
+"""
+Wall-clock-aligned order book recorder.
+
+Runs as a daemon and takes a live /api/v3/depth snapshot of every symbol on
+exact UTC boundaries (every TICK_SECONDS, 1m or finer). Unlike
+crawl_orderbook_over_period, nothing is back-dated: each record keeps the
+scheduled tick next to the time the exchange actually served the book.
+
+- Ticks are computed from an absolute schedule on the exchange clock (offset
+  measured with /api/v3/time), so sleep overshoot never accumulates; ticks
+  missed while the process was stalled are counted and skipped, not replayed.
+- All symbols of a tick are requested concurrently through the shared
+  BinanceClient, which keeps the weight budget. A symbol whose previous
+  request is still in flight skips the tick (counted as an overrun).
+- Records are buffered and appended as gzip members to rolling files
+  <OUTPUT_DIR>/depth_<YYYYMMDD_HHMM>.jsonl.gz (one per ROTATE_SECONDS), so a
+  crash loses at most one flush interval.
+
+Spot REST depth carries no timestamp (only lastUpdateId), so `exchange_ms` is
+the request/response midpoint translated to the exchange clock.
+
+    python orderbook_recorder.py
+"""
+
+import asyncio
+import gzip
+import json
+import os
+import signal
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+from binance_client import depth_weight, get_client
+
+# ======= Cấu hình =======
+SYMBOLS = ["BTCUSDT", "ETHUSDT", "SOLUSDT", "BNBUSDT", "XRPUSDT", "DOGEUSDT"]
+TICK_SECONDS = 60          # 60 = every minute boundary; 1, 5, 10, 15, 30 also divide a minute
+DEPTH_LIMIT = 20           # levels per side
+OUTPUT_DIR = "orderbook_recorder"
+FLUSH_SECONDS = 60
+ROTATE_SECONDS = 3600      # one file per UTC hour
+CLOCK_SYNC_SECONDS = 600   # re-measure the exchange clock offset every 10 minutes
+
+
+def measure_clock_offset(client, samples=3):
+    """Exchange clock minus local clock in ms, from the lowest-RTT /api/v3/time sample."""
+    best = None
+    for _ in range(samples):
+        sent = time.time() * 1000
+        server = client.get("/api/v3/time", weight=1)["serverTime"]
+        recv = time.time() * 1000
+        rtt = recv - sent
+        if best is None or rtt < best[0]:
+            best = (rtt, server - (sent + recv) / 2)
+    return best[1]
+
+
+class RollingWriter:
+    """Buffers records and appends them to one gzip JSONL file per rotation window."""
+
+    def __init__(self, root=OUTPUT_DIR, rotate_seconds=ROTATE_SECONDS):
+        self.root = root
+        self.rotate_ms = rotate_seconds * 1000
+        self.buffers = {}
+        self.written = 0
+        os.makedirs(root, exist_ok=True)
+
+    def path_for(self, tick_ms):
+        start = tick_ms - tick_ms % self.rotate_ms
+        stamp = datetime.fromtimestamp(start / 1000, tz=timezone.utc).strftime("%Y%m%d_%H%M")
+        return os.path.join(self.root, f"depth_{stamp}.jsonl.gz")
+
+    def add(self, record):
+        self.buffers.setdefault(self.path_for(record["tick_ms"]), []).append(record)
+
+    def flush(self):
+        """Append each buffer as a new gzip member (concatenated members read back as one stream)."""
+        for path, records in self.buffers.items():
+            payload = "".join(json.dumps(r, separators=(",", ":")) + "\n" for r in records)
+            with gzip.open(path, "at", encoding="utf-8") as f:
+                f.write(payload)
+            self.written += len(records)
+        self.buffers = {}
+
+
+def read_records(path):
+    """Load one rolling file back as a list of records."""
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+
+class OrderBookRecorder:
+    def __init__(self, symbols=SYMBOLS, tick_seconds=TICK_SECONDS, depth_limit=DEPTH_LIMIT,
+                 root=OUTPUT_DIR, flush_seconds=FLUSH_SECONDS, rotate_seconds=ROTATE_SECONDS,
+                 clock_sync_seconds=CLOCK_SYNC_SECONDS, client=None):
+        self.symbols = [s.upper() for s in symbols]
+        self.tick_ms = int(tick_seconds * 1000)
+        self.depth_limit = depth_limit
+        self.flush_seconds = flush_seconds
+        self.clock_sync_seconds = clock_sync_seconds
+        self.client = client or get_client()
+        self.writer = RollingWriter(root, rotate_seconds)
+        self.pool = ThreadPoolExecutor(max_workers=min(32, len(self.symbols)))
+
+        self.offset_ms = 0.0
+        self.in_flight = set()
+        self.stats = {"ticks": 0, "snapshots": 0, "failed": 0, "skipped_ticks": 0,
+                      "overruns": 0, "max_lateness_ms": 0.0, "sum_lateness_ms": 0.0}
+
+        weight_per_minute = len(self.symbols) * depth_weight(depth_limit) * 60_000 / self.tick_ms
+        if weight_per_minute > self.client.weight_budget:
+            print(f"⚠️ {weight_per_minute:.0f} weight/min exceeds the client budget "
+                  f"({self.client.weight_budget:.0f}); snapshots will be late")
+
+    def exchange_now_ms(self):
+        return time.time() * 1000 + self.offset_ms
+
+    # ------------------------------------------------------------------
+    # Snapshots
+    # ------------------------------------------------------------------
+    def _fetch(self, symbol, tick_ms):
+        """Blocking depth request, run in the thread pool."""
+        params = {"symbol": symbol, "limit": self.depth_limit}
+        sent = time.time() * 1000
+        data = self.client.get("/api/v3/depth", params, weight=depth_weight(self.depth_limit))
+        recv = time.time() * 1000
+        return {
+            "symbol": symbol,
+            "tick_ms": tick_ms,
+            "exchange_ms": int((sent + recv) / 2 + self.offset_ms),
+            "latency_ms": round(recv - sent, 1),
+            "last_update_id": data["lastUpdateId"],
+            "bids": [[float(p), float(q)] for p, q in data["bids"]],
+            "asks": [[float(p), float(q)] for p, q in data["asks"]],
+        }
+
+    async def _snapshot(self, symbol, tick_ms):
+        loop = asyncio.get_running_loop()
+        try:
+            record = await loop.run_in_executor(self.pool, self._fetch, symbol, tick_ms)
+        except Exception as e:
+            self.stats["failed"] += 1
+            print(f"⚠️ {symbol} @ {tick_ms}: {e}")
+            return
+        finally:
+            self.in_flight.discard(symbol)
+
+        lateness = record["exchange_ms"] - tick_ms
+        self.stats["snapshots"] += 1
+        self.stats["sum_lateness_ms"] += lateness
+        self.stats["max_lateness_ms"] = max(self.stats["max_lateness_ms"], lateness)
+        self.writer.add(record)
+
+    def _fire(self, tick_ms, tasks):
+        self.stats["ticks"] += 1
+        for symbol in self.symbols:
+            if symbol in self.in_flight:
+                self.stats["overruns"] += 1
+                continue
+            self.in_flight.add(symbol)
+            task = asyncio.create_task(self._snapshot(symbol, tick_ms))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+
+    # ------------------------------------------------------------------
+    # Scheduler
+    # ------------------------------------------------------------------
+    async def _sync_clock(self):
+        loop = asyncio.get_running_loop()
+        try:
+            self.offset_ms = await loop.run_in_executor(self.pool, measure_clock_offset, self.client)
+        except Exception as e:
+            print(f"⚠️ Clock sync failed, keeping offset {self.offset_ms:.1f} ms: {e}")
+
+    async def run(self, max_ticks=None):
+        """Record until SIGINT/SIGTERM (or `max_ticks` ticks), then flush and return the stats."""
+        stop = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(sig, stop.set)
+            except (NotImplementedError, RuntimeError):
+                pass  # Windows / not the main thread
+
+        await self._sync_clock()
+        last_sync = last_flush = time.monotonic()
+        next_tick = (int(self.exchange_now_ms()) // self.tick_ms + 1) * self.tick_ms
+        tasks = set()
+        print(f"🚀 Recording {len(self.symbols)} symbols every {self.tick_ms / 1000:g}s "
+              f"(clock offset {self.offset_ms:+.1f} ms) into {self.writer.root}/")
+
+        while not stop.is_set():
+            # Sleep against the absolute schedule, so overshoot does not accumulate
+            delay = (next_tick - self.exchange_now_ms()) / 1000
+            if delay > 0:
+                try:
+                    await asyncio.wait_for(stop.wait(), timeout=delay)
+                    break
+                except asyncio.TimeoutError:
+                    pass
+
+            behind = int(self.exchange_now_ms()) - next_tick
+            if behind >= self.tick_ms:
+                # Stalled past whole ticks: skip them rather than firing late bursts
+                missed = behind // self.tick_ms
+                self.stats["skipped_ticks"] += missed
+                next_tick += missed * self.tick_ms
+
+            self._fire(next_tick, tasks)
+            next_tick += self.tick_ms
+            if max_ticks is not None and self.stats["ticks"] >= max_ticks:
+                break
+
+            now = time.monotonic()
+            if now - last_flush >= self.flush_seconds:
+                self.writer.flush()
+                last_flush = now
+            if now - last_sync >= self.clock_sync_seconds:
+                await self._sync_clock()
+                last_sync = now
+
+        if tasks:
+            await asyncio.gather(*tasks)
+        self.writer.flush()
+        self.pool.shutdown()
+
+        done = max(1, self.stats["snapshots"])
+        print(f"✅ {self.stats['snapshots']} snapshots over {self.stats['ticks']} ticks, "
+              f"{self.stats['failed']} failed, {self.stats['overruns']} overruns, "
+              f"{self.stats['skipped_ticks']} skipped ticks, lateness "
+              f"mean {self.stats['sum_lateness_ms'] / done:.1f} ms / max {self.stats['max_lateness_ms']:.1f} ms")
+        return self.stats
+
+
+def main():
+    asyncio.run(OrderBookRecorder().run())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,191 @@
+"""
+Append-only tweet storage.
+
+Layout:
+    <root>/<YYYY-MM-DD>/part-<NNNNN>.jsonl   one shard per saved batch, one tweet per line
+    <root>/index.json                         per-shard metadata (count, id and createdAt ranges)
+    <root>/ids.txt                            every stored tweet id, one per line
+
+Saving a batch writes one new shard (tmp file + fsync + os.replace), then
+appends (and fsyncs) its ids, then rewrites the small index, so the cost of a
+save depends only on the batch and a crash can never damage tweets already
+stored. The index is written last: a shard it lists always has its ids in
+ids.txt, and shards found on disk but missing from the index (crash before
+the index write) are picked up again on open.
+"""
+
+import json
+import os
+from datetime import datetime
+
+TWITTER_TIME_FORMAT = "%a %b %d %H:%M:%S %z %Y"
+
+
+def _fsync_replace(tmp, path):
+    with open(tmp, "rb+") as f:
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+def _created_ms(tweet):
+    try:
+        return int(datetime.strptime(tweet.get("createdAt", ""), TWITTER_TIME_FORMAT).timestamp() * 1000)
+    except (TypeError, ValueError):
+        return None
+
+
+class TweetStore:
+    def __init__(self, root="tweets_store"):
+        self.root = root
+        self.index_path = os.path.join(root, "index.json")
+        self.ids_path = os.path.join(root, "ids.txt")
+        os.makedirs(root, exist_ok=True)
+
+        self.shards = {}   # relative shard path -> metadata
+        if os.path.exists(self.index_path):
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                self.shards = {s["path"]: s for s in json.load(f)["shards"]}
+
+        self.ids = set()
+        if os.path.exists(self.ids_path):
+            with open(self.ids_path, "r", encoding="utf-8") as f:
+                self.ids = {line.strip() for line in f if line.strip()}
+        self._recover()
+
+    # ------------------------------------------------------------------
+    # Index
+    # ------------------------------------------------------------------
+    def _shard_files(self):
+        for day in sorted(os.listdir(self.root)):
+            folder = os.path.join(self.root, day)
+            if os.path.isdir(folder):
+                for name in sorted(os.listdir(folder)):
+                    if name.endswith(".jsonl"):
+                        yield f"{day}/{name}"
+
+    @staticmethod
+    def _describe(rel_path, tweets):
+        ids = [str(t["id"]) for t in tweets]
+        times = [ms for ms in map(_created_ms, tweets) if ms is not None]
+        return {
+            "path": rel_path,
+            "day": rel_path.split("/")[0],
+            "count": len(tweets),
+            "min_id": min(ids, key=int) if ids else None,
+            "max_id": max(ids, key=int) if ids else None,
+            "min_created_ms": min(times) if times else None,
+            "max_created_ms": max(times) if times else None,
+        }
+
+    def _write_index(self):
+        tmp = f"{self.index_path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"shards": sorted(self.shards.values(), key=lambda s: s["path"])}, f, indent=1)
+        _fsync_replace(tmp, self.index_path)
+
+    def _append_ids(self, ids):
+        with open(self.ids_path, "a+b") as f:
+            # A crash mid-append can leave a line without its newline; never glue onto it
+            torn = False
+            if f.seek(0, os.SEEK_END) > 0:
+                f.seek(-1, os.SEEK_END)
+                torn = f.read(1) != b"\n"
+            f.write(("\n" if torn else "").encode() + "".join(f"{i}\n" for i in ids).encode("utf-8"))
+            f.flush()
+            os.fsync(f.fileno())
+
+    def _recover(self):
+        """Index shards written before a crash cut the index/ids update short."""
+        missing = [p for p in self._shard_files() if p not in self.shards]
+        for rel_path in missing:
+            tweets = list(self._read_shard(rel_path))
+            self.shards[rel_path] = self._describe(rel_path, tweets)
+            new_ids = [str(t["id"]) for t in tweets if str(t["id"]) not in self.ids]
+            self.ids.update(new_ids)
+            self._append_ids(new_ids)
+        if missing:
+            self._write_index()
+            print(f"♻️ Recovered {len(missing)} shard(s) missing from {self.index_path}")
+
+    # ------------------------------------------------------------------
+    # Write
+    # ------------------------------------------------------------------
+    def append(self, day, tweets):
+        """
+        Store the tweets not seen before as a new shard under `day`
+        (a date or "YYYY-MM-DD"). Returns the number of tweets written.
+        """
+        day = day if isinstance(day, str) else day.strftime("%Y-%m-%d")
+        fresh, batch_ids = [], set()
+        for t in tweets:
+            tid = str(t.get("id", ""))
+            if tid and tid not in self.ids and tid not in batch_ids:
+                batch_ids.add(tid)
+                fresh.append(t)
+        if not fresh:
+            return 0
+
+        folder = os.path.join(self.root, day)
+        os.makedirs(folder, exist_ok=True)
+        n = sum(1 for p in self.shards if p.startswith(f"{day}/"))
+        rel_path = f"{day}/part-{n:05d}.jsonl"
+        while os.path.exists(os.path.join(self.root, rel_path)):
+            n += 1
+            rel_path = f"{day}/part-{n:05d}.jsonl"
+
+        path = os.path.join(self.root, rel_path)
+        tmp = f"{path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.writelines(json.dumps(t, ensure_ascii=False) + "\n" for t in fresh)
+        _fsync_replace(tmp, path)
+
+        # ids before the index: an indexed shard must never have ids missing from ids.txt
+        self._append_ids(t["id"] for t in fresh)
+        self.ids.update(batch_ids)
+        self.shards[rel_path] = self._describe(rel_path, fresh)
+        self._write_index()
+        return len(fresh)
+
+    # ------------------------------------------------------------------
+    # Read
+    # ------------------------------------------------------------------
+    def _read_shard(self, rel_path):
+        with open(os.path.join(self.root, rel_path), "r", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+    def __len__(self):
+        return sum(s["count"] for s in self.shards.values())
+
+    def __contains__(self, tweet_id):
+        return str(tweet_id) in self.ids
+
+    def iter_tweets(self, start_ms=None, end_ms=None):
+        """
+        Stream stored tweets shard by shard in day order. With bounds, shards
+        whose createdAt range falls outside [start_ms, end_ms] are not opened
+        and tweets outside it are skipped.
+        """
+        for meta in sorted(self.shards.values(), key=lambda s: s["path"]):
+            if start_ms is not None and meta["max_created_ms"] is not None and meta["max_created_ms"] < start_ms:
+                continue
+            if end_ms is not None and meta["min_created_ms"] is not None and meta["min_created_ms"] > end_ms:
+                continue
+            for tweet in self._read_shard(meta["path"]):
+                if start_ms is None and end_ms is None:
+                    yield tweet
+                    continue
+                ms = _created_ms(tweet)
+                if ms is None or ((start_ms is None or ms >= start_ms) and (end_ms is None or ms <= end_ms)):
+                    yield tweet
+
+    def export_json(self, path):
+        """Write every stored tweet to one JSON array, streaming (the old OUTPUT_JSON format)."""
+        tmp = f"{path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write("[\n")
+            for i, tweet in enumerate(self.iter_tweets()):
+                f.write((",\n" if i else "") + json.dumps(tweet, ensure_ascii=False))
+            f.write("\n]\n")
+        _fsync_replace(tmp, path)
@@ -5,6 +5,8 @@ Label Pump/Dump với features đa khung thời gian (1m, 5m, 15m)
 import pandas as pd
 import numpy as np
 
+from depth_features import depth_feature_frame
+
 # ==============================
 # 🔧 HÀM TÍNH Z-SCORE ROLLING
 # ==============================
@@ -55,7 +57,23 @@ def calculate_features_for_df(df, window_suffix, base_window=360):
 # ==============================
 # 🧠 GÁN NHÃN PUMP / DUMP
 # ==============================
-def label_anomaly_pump_dump(df):
+def attach_depth_features(df, depth, tolerance="5min"):
+    """
+    Gắn features order book nhiều tầng (depth_feature_frame) vào từng nến 1m:
+    snapshot gần nhất <= open_time, bỏ qua nếu cũ hơn `tolerance`.
+    """
+    depth = depth.sort_values('snapshot_time')
+    df = df.sort_values('open_time')
+    return pd.merge_asof(df, depth, left_on='open_time', right_on='snapshot_time',
+                         direction='backward', tolerance=pd.Timedelta(tolerance))
+
+
+def label_anomaly_pump_dump(df, depth=None):
+    """
+    `depth`: tuỳ chọn, DataFrame từ depth_feature_frame (hoặc DepthBlock từ
+    Crawl_data/depth_store.py); khi có, các features depth được thêm vào và
+    depth imbalance tham gia điều kiện pump/dump.
+    """
     df = df.copy()
     
     # Kiểm tra cột bắt buộc
@@ -70,11 +88,22 @@ def label_anomaly_pump_dump(df):
     
     df['open_time'] = pd.to_datetime(df['open_time'])
     df = df.sort_values('open_time').reset_index(drop=True)
+
+    # ===== FEATURES ORDER BOOK NHIỀU TẦNG (nếu có) =====
+    if depth is not None:
+        if not isinstance(depth, pd.DataFrame):
+            depth = depth_feature_frame(depth.tick_ms, depth.bids, depth.asks)
+        df['open_time'] = df['open_time'].astype('datetime64[ns]')
+        depth = depth.assign(snapshot_time=depth['snapshot_time'].astype('datetime64[ns]'))
+        df = attach_depth_features(df, depth).drop(columns=['snapshot_time']).reset_index(drop=True)
+    depth_cols = [c for c in df.columns if c.startswith(('depth_imbalance_', 'bid_depth_', 'ask_depth_'))]
+    depth_cols += [c for c in ('mid_price', 'microprice', 'microprice_premium', 'bid_slope', 'ask_slope')
+                   if c in df.columns]
     
     # Điền NaN
     numeric_cols = ['open', 'high', 'low', 'close', 'volume', 
                     'top_bid_price', 'top_ask_price', 'spread',
-                    'bid_ask_ratio', 'final_sentiment_score']
+                    'bid_ask_ratio', 'final_sentiment_score'] + depth_cols
     for col in numeric_cols:
         df[col] = df[col].ffill().bfill().fillna(0)
     
@@ -90,8 +119,8 @@ def label_anomaly_pump_dump(df):
     resample_rules = {
         'open': 'first', 'high': 'max', 'low': 'min', 'close': 'last', 'volume': 'sum'
     }
-    df_5m = df_1m.resample('5T').agg(resample_rules).dropna()
-    df_15m = df_1m.resample('15T').agg(resample_rules).dropna()
+    df_5m = df_1m.resample('5min').agg(resample_rules).dropna()
+    df_15m = df_1m.resample('15min').agg(resample_rules).dropna()
     
     # Tạo features 5m & 15m
     features_5m = calculate_features_for_df(df_5m, '_5m')
@@ -120,6 +149,12 @@ def label_anomaly_pump_dump(df):
                              (df['top_bid_price'] + df['top_ask_price'] + 1e-8)
     df['spread_pct'] = df['spread'] / (df['close'] + 1e-8)
     df['volume_imbalance'] = df['order_imbalance'] * df['volume']
+
+    # Depth nhiều tầng: imbalance cộng dồn 5 tầng & microprice lệch khỏi mid
+    has_depth = 'depth_imbalance_5' in df.columns
+    if has_depth:
+        df['z_depth_imbalance'] = calculate_rolling_zscore(df['depth_imbalance_5'], window)
+        df['z_microprice_premium'] = calculate_rolling_zscore(df['microprice_premium'], window)
     
     # ===== ĐIỀU KIỆN PUMP / DUMP NÂNG CẤP ĐA KHUNG THỜI GIAN =====
     cond_1m_return_pump = df['z_return_1m'] > 2.5
@@ -155,6 +190,9 @@ def label_anomaly_pump_dump(df):
         cond_5m_return_dump, cond_5m_volume_dump,
         cond_15m_return_dump, cond_ob_dump, cond_sentiment_dump
     ]
+    if has_depth:
+        pump_conditions.append(df['z_depth_imbalance'] > 1.5)
+        dump_conditions.append(df['z_depth_imbalance'] < -1.5)
 
     pump_sum = sum(cond.astype(int) for cond in pump_conditions)
     dump_sum = sum(cond.astype(int) for cond in dump_conditions)
@@ -196,7 +234,10 @@ if __name__ == "__main__":
         "z_spread", "z_top_bid", "close_position",
         'order_imbalance', 'spread_pct', 'volume_imbalance',
         'price_return_5m', 'z_return_5m', 'z_volume_5m', 'close_position_5m',
-        'price_return_15m', 'z_return_15m', 'z_volume_15m', 'close_position_15m'
+        'price_return_15m', 'z_return_15m', 'z_volume_15m', 'close_position_15m',
+        'depth_imbalance_1', 'depth_imbalance_5', 'depth_imbalance_10',
+        'bid_depth_10bps', 'ask_depth_10bps', 'bid_depth_50bps', 'ask_depth_50bps',
+        'bid_slope', 'ask_slope', 'microprice_premium', 'z_depth_imbalance', 'z_microprice_premium'
     ]
     
     available_base_cols = [col for col in base_cols if col in df_labeled.columns]
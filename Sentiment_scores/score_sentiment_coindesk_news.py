@@ -1,135 +1,396 @@
+import hashlib
 import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
 import torch
 from transformers import AutoModelForSequenceClassification, AutoTokenizer
 from tqdm import tqdm
 from pathlib import Path
 
-def analyze_sentiment_with_finbert(input_file, output_file):
+MODEL_NAME = "ProsusAI/finbert"
+MAX_LENGTH = 512       # FinBERT max sequence length (tokens)
+TOKEN_BUDGET = 16384   # max padded tokens per forward pass (batch size x longest sequence in the batch)
+MAX_BATCH = 64         # max articles per forward pass
+CHUNK_SIZE = 500       # articles per chunk: tokenized together (the next one while this one runs), then appended to the results
+
+
+def load_finbert():
+    """(tokenizer, model, device) with the model in eval mode"""
+    device = "cuda" if torch.cuda.is_available() else "cpu"
+    print(f"Using device: {device}")
+    tokenizer = AutoTokenizer.from_pretrained(MODEL_NAME)
+    model = AutoModelForSequenceClassification.from_pretrained(MODEL_NAME)
+    model.to(device)
+    model.eval()
+    return tokenizer, model, device
+
+
+def prepare_text(article):
+    """Enriched text FinBERT sees for one article, or None for articles without content"""
+    if 'content' not in article or not article['content'].strip():
+        return None
+    
+    # Create enriched text with context as suggested
+    # This helps FinBERT understand the financial context better
+    is_hype = article.get('is_hype', 0) == 1
+    enriched_text = f"{article['content']} This article is about {'market hype' if is_hype else 'fundamental analysis'}."
+    
+    # Truncate if too long
+    return enriched_text[:2000]
+
+
+def score_text(text, tokenizer, model, device):
+    """Softmax scores [positive, negative, neutral] of one text (the original one-article-per-pass path)"""
+    inputs = tokenizer(text, return_tensors="pt", truncation=True,
+                       max_length=MAX_LENGTH, padding=True).to(device)
+    with torch.no_grad():
+        outputs = model(**inputs)
+        scores = torch.nn.functional.softmax(outputs.logits, dim=1)
+    return scores[0].cpu().numpy().tolist()
+
+
+def length_buckets(lengths, token_budget=TOKEN_BUDGET, max_batch=MAX_BATCH):
+    """
+    Indices grouped into batches of similar token length: sorted by length, each batch
+    grows while (batch size x its longest sequence) stays within token_budget.
+    """
+    order = sorted(range(len(lengths)), key=lambda k: lengths[k])
+    batches, batch = [], []
+    for k in order:
+        # sorted ascending, so the newest item is the longest of the batch
+        if batch and ((len(batch) + 1) * lengths[k] > token_budget or len(batch) >= max_batch):
+            batches.append(batch)
+            batch = []
+        batch.append(k)
+    if batch:
+        batches.append(batch)
+    return batches
+
+
+def _score_encoded(encoded, tokenizer, model, device, token_budget, max_batch):
+    """Softmax scores of one tokenized (unpadded) chunk, in its input order"""
+    scores = [None] * len(encoded["input_ids"])
+    lengths = [len(ids) for ids in encoded["input_ids"]]
+    for batch in length_buckets(lengths, token_budget, max_batch):
+        features = [{key: encoded[key][k] for key in encoded.keys()} for k in batch]
+        inputs = tokenizer.pad(features, return_tensors="pt").to(device)
+        with torch.inference_mode():
+            logits = model(**inputs).logits
+            probs = torch.nn.functional.softmax(logits, dim=1).cpu().numpy().tolist()
+        # Scatter back to the original positions
+        for k, p in zip(batch, probs):
+            scores[k] = p
+    return scores
+
+
+def score_chunks(chunks, tokenizer, model, device, token_budget=TOKEN_BUDGET, max_batch=MAX_BATCH):
+    """
+    For an iterable of (payload, texts) yield (payload, softmax scores of texts) in order.
+    Each chunk is tokenized in one (fast, Rust) tokenizer call without padding, split into
+    length buckets and padded only within a bucket; tokenizing chunk k+1 runs in a
+    background thread while the model scores chunk k.
+    """
+    def tokenize(texts):
+        if not texts:
+            return {"input_ids": []}
+        return tokenizer(texts, truncation=True, max_length=MAX_LENGTH)
+
+    chunks = iter(chunks)
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        current = next(chunks, None)
+        pending = pool.submit(tokenize, current[1]) if current is not None else None
+        while current is not None:
+            encoded = pending.result()
+            following = next(chunks, None)
+            if following is not None:
+                pending = pool.submit(tokenize, following[1])
+            yield current[0], _score_encoded(encoded, tokenizer, model, device, token_budget, max_batch)
+            current = following
+
+
+def score_texts_batched(texts, tokenizer, model, device, token_budget=TOKEN_BUDGET, max_batch=MAX_BATCH,
+                        chunk_size=CHUNK_SIZE):
+    """Softmax scores for every text, in the input order (score_chunks over CHUNK_SIZE slices)"""
+    chunks = ((start, texts[start:start + chunk_size]) for start in range(0, len(texts), chunk_size))
+    scores = []
+    for _, chunk_scores in score_chunks(chunks, tokenizer, model, device, token_budget, max_batch):
+        scores.extend(chunk_scores)
+    return scores
+
+
+def iter_records(path):
+    """
+    Articles of a JSONL file (one per line) or a JSON array, read incrementally:
+    the array is decoded object by object from a rolling buffer, never loaded whole.
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        if str(path).endswith(".jsonl"):
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+            return
+        
+        decoder = json.JSONDecoder()
+        buf, pos, eof = "", 0, False
+        started = False
+        while True:
+            # skip whitespace, the opening bracket and separators
+            while pos < len(buf) and (buf[pos].isspace() or buf[pos] == ',' or (buf[pos] == '[' and not started)):
+                started = started or buf[pos] == '['
+                pos += 1
+            if pos < len(buf) and buf[pos] == ']':
+                return
+            if pos >= len(buf) and eof:
+                return
+            try:
+                obj, end = decoder.raw_decode(buf, pos)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+                chunk = f.read(1 << 20)
+                eof = not chunk
+                buf, pos = buf[pos:] + chunk, 0
+                continue
+            yield obj
+            pos = end
+
+
+def article_id(article):
+    """Stable id used to skip already scored articles: the URL, else a hash of title + content"""
+    if article.get('url'):
+        return article['url']
+    key = f"{article.get('title', '')}\n{article.get('content', '')}"
+    return "sha1:" + hashlib.sha1(key.encode('utf-8')).hexdigest()
+
+
+class ScoreLog:
+    """
+    Append-only JSONL of scored articles plus a small state file with the running
+    aggregates (scored, total_score, label counts) and the byte offset of the last
+    committed chunk. On open, lines past that offset (a chunk cut short by a crash)
+    are dropped and the ids of everything committed are loaded for skipping. A
+    state file that does not match the results (file deleted or shorter than the
+    offset) is discarded and the totals rebuilt from the results that exist.
+    """
+
+    def __init__(self, path):
+        self.path = str(path)
+        self.state_path = self.path + ".state.json"
+        self.state = self._empty_state()
+        has_state = os.path.exists(self.state_path)
+        discarded = False
+        if has_state:
+            with open(self.state_path, 'r', encoding='utf-8') as f:
+                self.state.update(json.load(f))
+        size = os.path.getsize(self.path) if os.path.exists(self.path) else 0
+        if has_state and size < self.state["offset"]:
+            print(f"⚠️ {self.state_path} covers {self.state['offset']} bytes but {self.path} has {size}: "
+                  f"discarding the saved totals")
+            self.state = self._empty_state()
+            has_state, discarded = False, True
+        if not has_state and size:
+            self._rebuild_state()
+        
+        self.ids = set()
+        if os.path.exists(self.path):
+            with open(self.path, 'r+b') as f:
+                f.truncate(self.state["offset"])
+            with open(self.path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    if line.strip():
+                        self.ids.add(article_id(json.loads(line)))
+        self._out = open(self.path, 'a', encoding='utf-8')
+        if discarded or (not has_state and size):
+            self._save_state()   # the totals now describe what is on disk
+
+    @staticmethod
+    def _empty_state():
+        return {"offset": 0, "scored": 0, "total_score": 0.0,
+                "counts": {"positive": 0, "negative": 0, "neutral": 0}}
+
+    def _rebuild_state(self):
+        """Aggregates from an existing results file without a usable state file (labels are not stored)"""
+        offset = 0
+        with open(self.path, 'rb') as f:
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break
+                offset += len(line)
+                if line.strip():
+                    self.state["scored"] += 1
+                    self.state["total_score"] += json.loads(line).get('sentiment_score', 0)
+        self.state["offset"] = offset
+        print(f"ℹ️ No usable state file next to {self.path}: rebuilt totals from {self.state['scored']} results "
+              f"(label counts start at zero)")
+
+    def commit(self, rows):
+        """Append one chunk of (article, label) and save the aggregates; O(len(rows))"""
+        for article, label in rows:
+            self._out.write(json.dumps(article, ensure_ascii=False) + "\n")
+            self.ids.add(article_id(article))
+            self.state["scored"] += 1
+            self.state["total_score"] += article['sentiment_score']
+            self.state["counts"][label] += 1
+        self._out.flush()
+        os.fsync(self._out.fileno())
+        self.state["offset"] = self._out.tell()
+        self._save_state()
+
+    def _save_state(self):
+        tmp = self.state_path + ".tmp"
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(self.state, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.state_path)
+
+    @property
+    def average(self):
+        return self.state["total_score"] / self.state["scored"] if self.state["scored"] else 0.0
+
+    def close(self):
+        self._out.close()
+
+    def export_json(self, json_path):
+        """The results as one JSON array (old output format), streamed line by line"""
+        tmp = str(json_path) + ".tmp"
+        with open(self.path, 'r', encoding='utf-8') as src, open(tmp, 'w', encoding='utf-8') as out:
+            out.write("[\n")
+            first = True
+            for line in src:
+                if not line.strip():
+                    continue
+                out.write(("" if first else ",\n") + json.dumps(json.loads(line), indent=2, ensure_ascii=False))
+                first = False
+            out.write("\n]\n")
+        os.replace(tmp, json_path)
+
+
+def _chunks(records, log, chunk_size):
+    """(articles, texts) chunks of the articles not scored yet; texts only for articles with content"""
+    articles, queued = [], set()
+    for article in records:
+        # also skip repeats inside the input (chunks are read ahead of their commit)
+        aid = article_id(article)
+        if aid in log.ids or aid in queued:
+            continue
+        queued.add(aid)
+        articles.append(article)
+        if len(articles) == chunk_size:
+            yield articles, [t for t in map(prepare_text, articles) if t is not None]
+            articles = []
+    if articles:
+        yield articles, [t for t in map(prepare_text, articles) if t is not None]
+
+
+def analyze_sentiment_with_finbert(input_file, output_file, chunk_size=CHUNK_SIZE):
     """
     Analyze sentiment in articles using FinBERT and save results to a new file.
     
+    Articles are streamed from the input and every scored chunk is appended to
+    <output>.jsonl; a rerun skips the articles already there (by URL). A .json
+    output_file additionally gets the whole result as one JSON array at the end.
+    
     Args:
-        input_file (str): Path to input JSON file with labeled articles
-        output_file (str): Path to output JSON file with sentiment analysis added
+        input_file (str): Path to input JSON / JSONL file with labeled articles
+        output_file (str): Path to output JSON or JSONL file with sentiment analysis added
     """
-    print(f"Loading data from {input_file}...")
-    
-    # Load the labeled JSON data
-    with open(input_file, 'r', encoding='utf-8') as f:
-        data = json.load(f)
-    
-    total_articles = len(data)
-    print(f"Total articles to analyze: {total_articles}")
+    results_path = Path(output_file).with_suffix(".jsonl")
+    log = ScoreLog(results_path)
+    if log.state["scored"]:
+        print(f"♻️ Resuming: {log.state['scored']} articles already scored in {results_path}")
     
     # Load FinBERT model and tokenizer
     print("Loading FinBERT model...")
-    device = "cuda" if torch.cuda.is_available() else "cpu"
-    print(f"Using device: {device}")
-    
-    model_name = "ProsusAI/finbert"
-    tokenizer = AutoTokenizer.from_pretrained(model_name)
-    model = AutoModelForSequenceClassification.from_pretrained(model_name)
-    model.to(device)
+    tokenizer, model, device = load_finbert()
     print("FinBERT model loaded successfully")
     
-    # Process each article
-    sentiment_counts = {
-        "positive": 0,
-        "negative": 0,
-        "neutral": 0
-    }
-    
-    # Add save interval to periodically save results when processing large datasets
-    save_interval = 500  # Save results every 500 articles
-    last_save = 0
-    
-    for i, article in tqdm(enumerate(data), total=total_articles, desc="Processing articles"):
-        # Skip articles without content
-        if 'content' not in article or not article['content'].strip():
-            article['sentiment_score'] = 0.0  # Neutral sentiment score
-            sentiment_counts["neutral"] += 1
-            continue
-        
-        # Get content and hype/fundamental label
-        content = article['content']
-        is_hype = article.get('is_hype', 0) == 1
-        
-        # Create enriched text with context as suggested
-        # This helps FinBERT understand the financial context better
-        enriched_text = f"{content} This article is about {'market hype' if is_hype else 'fundamental analysis'}."
-        
-        # Truncate if too long
-        if len(enriched_text) > 2000:
-            enriched_text = enriched_text[:2000]
-        
-        # Tokenize and prepare for model
-        inputs = tokenizer(enriched_text, return_tensors="pt", truncation=True, 
-                          max_length=512, padding=True).to(device)
-        
-        # Get sentiment prediction
-        with torch.no_grad():
-            outputs = model(**inputs)
-            scores = torch.nn.functional.softmax(outputs.logits, dim=1)
-            scores = scores[0].cpu().numpy().tolist()  # Convert to regular list
-        
-        # Calculate a more nuanced sentiment score regardless of the dominant class
-        # This creates a score from -1 to +1 based on the relative strength of positive vs negative
-        sentiment_score = round(scores[0] - scores[1], 3)
-        
-        # Still determine the dominant class for counting/classification purposes
-        max_index = scores.index(max(scores))
-        if max_index == 0:
-            sentiment_label = "positive"
-        elif max_index == 1:
-            sentiment_label = "negative"
-        else:
-            sentiment_label = "neutral"
-        
-        # Add just the sentiment score to article
-        article['sentiment_score'] = sentiment_score
-        
-        # Update sentiment counts (for reporting only)
-        sentiment_counts[sentiment_label] += 1
-        
-        # Periodically save results
-        if (i + 1) % save_interval == 0 and i + 1 > last_save:
-            print(f"\nIntermediate save at {i + 1}/{total_articles} articles")
-            
-            # Calculate current average sentiment score
-            current_avg_score = sum(data[j].get('sentiment_score', 0) for j in range(i+1)) / (i+1)
-            
-            print(f"Current average sentiment score: {current_avg_score:.3f} (scale -1 to +1)")
-            
-            # Save intermediate results
-            temp_output_file = str(output_file).replace(".json", f"_partial_{i+1}.json")
-            with open(temp_output_file, 'w', encoding='utf-8') as f:
-                json.dump(data[:i+1], f, indent=2, ensure_ascii=False)
-            print(f"Intermediate results saved to {temp_output_file}")
-            last_save = i + 1
+    print(f"Streaming articles from {input_file}...")
+    started = time.perf_counter()
+    new = 0
+    progress = tqdm(desc="Processing articles", unit="article")
+    chunks = _chunks(iter_records(input_file), log, chunk_size)
+    for articles, scores in score_chunks(chunks, tokenizer, model, device):
+        rows, scores = [], iter(scores)
+        for article in articles:
+            if prepare_text(article) is None:
+                # Articles without content: neutral
+                article['sentiment_score'] = 0.0
+                rows.append((article, "neutral"))
+                continue
+            s = next(scores)
+            # Calculate a more nuanced sentiment score regardless of the dominant class
+            # This creates a score from -1 to +1 based on the relative strength of positive vs negative
+            article['sentiment_score'] = round(s[0] - s[1], 3)
+            # Still determine the dominant class for counting/classification purposes
+            rows.append((article, ("positive", "negative", "neutral")[s.index(max(s))]))
+        log.commit(rows)
+        new += len(rows)
+        progress.update(len(rows))
+        progress.set_postfix(avg=f"{log.average:.3f}")
+    progress.close()
+    elapsed = time.perf_counter() - started
     
     # Print summary statistics
     print(f"\nSentiment analysis complete:")
+    print(f"Scored {new} new articles in {elapsed:.1f}s ({new / elapsed if elapsed else 0:.1f} articles/s), "
+          f"{log.state['scored']} in total")
+    print(f"Average sentiment score: {log.average:.3f} (on a scale from -1 to +1)")
+    log.close()
     
-    # Calculate average normalized score
-    total_score = sum(article.get('sentiment_score', 0) for article in data)
-    avg_score = total_score / total_articles if total_articles > 0 else 0
-    print(f"Average sentiment score: {avg_score:.3f} (on a scale from -1 to +1)")
+    if str(output_file).endswith(".json"):
+        print(f"Saving results to {output_file}...")
+        log.export_json(output_file)
+    print(f"Sentiment analysis complete. Results saved to {results_path}"
+          + (f" and {output_file}" if str(output_file).endswith(".json") else ""))
     
-    # Save the labeled data
-    print(f"Saving results to {output_file}...")
-    with open(output_file, 'w', encoding='utf-8') as f:
-        json.dump(data, f, indent=2, ensure_ascii=False)
+    # Return sentiment distribution for quick reference
+    return dict(log.state["counts"])
+
+
+def benchmark_scoring(input_file, n=128):
+    """
+    Per-article vs batched scoring on the first n articles with content: articles/s of both
+    and the largest score difference (must stay within float tolerance).
+    """
+    texts = []
+    for article in iter_records(input_file):
+        text = prepare_text(article)
+        if text is not None:
+            texts.append(text)
+        if len(texts) == n:
+            break
+    tokenizer, model, device = load_finbert()
     
-    print(f"Sentiment analysis complete. Results saved to {output_file}")
+    score_text(texts[0], tokenizer, model, device)  # warm-up
+    started = time.perf_counter()
+    single = [score_text(t, tokenizer, model, device) for t in tqdm(texts, desc="Per-article")]
+    single_s = time.perf_counter() - started
     
-    # Return sentiment distribution for quick reference
-    return sentiment_counts
+    started = time.perf_counter()
+    batched = score_texts_batched(texts, tokenizer, model, device)
+    batched_s = time.perf_counter() - started
+    
+    max_diff = max(abs(a - b) for s1, s2 in zip(single, batched) for a, b in zip(s1, s2))
+    print(f"Per-article: {len(texts) / single_s:.1f} articles/s | batched: {len(texts) / batched_s:.1f} articles/s "
+          f"({single_s / batched_s:.1f}x) | max score difference {max_diff:.2e}")
+    if max_diff > 1e-4:
+        print("⚠️ Batched scores differ from the per-article path by more than 1e-4")
+    return single_s, batched_s, max_diff
 
 if __name__ == "__main__":
     # File paths
     input_file = Path("coindesk_jul_sep_2025_labeled.json")
     output_file = Path("coindesk_jul_sep_2025_sentiment.json")
     
+    # python score_sentiment_coindesk_news.py bench -> per-article vs batched speed and score agreement
+    if len(sys.argv) > 1 and sys.argv[1] == "bench":
+        benchmark_scoring(input_file, int(sys.argv[2]) if len(sys.argv) > 2 else 128)
+        sys.exit(0)
+    
     # Run sentiment analysis
     analyze_sentiment_with_finbert(input_file, output_file)
     print("Done!")
\ No newline at end of file
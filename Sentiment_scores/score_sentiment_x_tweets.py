@@ -9,9 +9,11 @@ import emoji
 # ==========================
 # ⚙️ Cấu hình file
 # ==========================
-INPUT_FILE = "tweets_two_fields.csv"   # chứa cột created_at, content
+INPUT_FILE = "tweets_2025Q3_crypto_parquet"   # thư mục Parquet của crawl_x_data (hoặc CSV cũ có created_at, content)
 OUTPUT_CSV = "tweets_sentiment_roberta.csv"
 OUTPUT_JSONL = "tweets_sentiment_roberta.jsonl"
+OUTPUT_PARQUET = "tweets_sentiment_roberta.parquet"  # created_at int64 ms UTC, cho sentiment_minutes.py
+TWITTER_TIME_FORMAT = "%a %b %d %H:%M:%S %z %Y"
 
 # ==========================
 # 🚀 Load model & tokenizer
@@ -71,8 +73,14 @@ def roberta_sentiment(texts):
 # ==========================
 # 📥 Đọc dữ liệu
 # ==========================
-df = pd.read_csv(INPUT_FILE)
-df = df[["created_at", "content"]].dropna()
+if INPUT_FILE.endswith(".csv"):
+    df = pd.read_csv(INPUT_FILE, usecols=["created_at", "content"]).dropna()
+    df["created_at"] = pd.to_datetime(df["created_at"], format=TWITTER_TIME_FORMAT, utc=True)
+    df["created_at"] = df["created_at"].astype("datetime64[ms, UTC]").astype("int64")
+else:
+    # Chỉ đọc 2 cột cần thiết, không đọc author/counters
+    df = pd.read_parquet(INPUT_FILE, columns=["created_at", "text"]).rename(columns={"text": "content"})
+    df = df.dropna()
 print(f"Loaded {len(df)} tweets from {INPUT_FILE}")
 
 # ==========================
@@ -99,6 +107,12 @@ for i in tqdm(range(0, len(df), batch_size), desc="Scoring sentiment"):
 # 💾 Lưu kết quả
 # ==========================
 out_df = pd.DataFrame(results)
+out_df.astype({"created_at": "int64", "neg": "float32", "neu": "float32", "pos": "float32"}).to_parquet(
+    OUTPUT_PARQUET, index=False)
+
+# CSV/JSONL giữ định dạng createdAt của Twitter như trước
+out_df["created_at"] = pd.to_datetime(out_df["created_at"], unit="ms", utc=True).dt.strftime(TWITTER_TIME_FORMAT)
+results = out_df.to_dict("records")
 out_df.to_csv(OUTPUT_CSV, index=False, encoding="utf-8-sig")
 
 with open(OUTPUT_JSONL, "w", encoding="utf-8") as f:
@@ -106,4 +120,4 @@ with open(OUTPUT_JSONL, "w", encoding="utf-8") as f:
         json.dump(item, f, ensure_ascii=False)
         f.write("\n")
 
-print(f"\n✅ Saved sentiment results to:\n- {OUTPUT_CSV}\n- {OUTPUT_JSONL}")
+print(f"\n✅ Saved sentiment results to:\n- {OUTPUT_PARQUET}\n- {OUTPUT_CSV}\n- {OUTPUT_JSONL}")